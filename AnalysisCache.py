@@ -0,0 +1,112 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import glob
+import hashlib
+import os
+import tempfile
+import typing
+
+CACHE_DIRECTORY_NAME = ".jackcache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def analyzer_fingerprint() -> str:
+    """
+    Returns:
+        str: a hash of the analyzer's own source files, so that changing the
+        analyzer invalidates everything it cached before.
+    """
+    digest = hashlib.sha256()
+    analyzer_directory = os.path.dirname(os.path.abspath(__file__))
+    for path in sorted(glob.glob(os.path.join(analyzer_directory, "*.py"))):
+        with open(path, 'rb') as source_file:
+            digest.update(source_file.read())
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """An on-disk cache of analysis results, keyed by a hash of the source
+    and of the analyzer itself.
+
+    Each result is a file in the cache directory. Reading a result touches
+    its modification time, so prune() can evict the least recently used
+    results once the cache grows past its size limit.
+    """
+
+    def __init__(self, directory: str,
+                 max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        """
+        :param directory: Where the results are kept; created when needed.
+        :param max_bytes: How large prune() lets the cache grow.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.fingerprint = analyzer_fingerprint()
+
+    def key(self, source: bytes, variant: str = "") -> str:
+        """Returns the key of the result of analyzing the given source.
+
+        :param source: The source, as read from its file.
+        :param variant: Tells apart different kinds of results for the same
+            source, e.g. "tokens" for a token stream.
+        """
+        digest = hashlib.sha256(self.fingerprint.encode())
+        digest.update(variant.encode() + b"\0")
+        digest.update(source)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> typing.Optional[str]:
+        """Returns the cached result for a key, or None if there is none."""
+        path = os.path.join(self.directory, key + ".xml")
+        try:
+            with open(path, 'r', encoding="utf-8", newline="") as cached_file:
+                result = cached_file.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return result
+
+    def put(self, key: str, result: str) -> None:
+        """Caches the result for a key. The file is written under a temporary
+        name and then renamed, so concurrent readers never see half of it.
+        The temporary name is unique, so threads and processes caching the
+        same result at once never write to the same file.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, key + ".xml")
+        descriptor, temporary_path = tempfile.mkstemp(
+            suffix=".tmp", prefix=key + ".", dir=self.directory)
+        try:
+            with open(descriptor, 'w', encoding="utf-8",
+                      newline="") as cached_file:
+                cached_file.write(result)
+            os.replace(temporary_path, path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+    def prune(self) -> None:
+        """Evicts the least recently used results until the cache fits in
+        max_bytes.
+        """
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.name.endswith(".xml")]
+        except OSError:
+            return
+        stats = {entry.path: entry.stat() for entry in entries}
+        total = sum(stat.st_size for stat in stats.values())
+        for path in sorted(stats, key=lambda path: stats[path].st_mtime):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= stats[path].st_size
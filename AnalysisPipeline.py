@@ -0,0 +1,170 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import asyncio
+import concurrent.futures
+import typing
+
+from AnalysisCache import AnalysisCache
+
+# How many sources may wait for each analysis job by default, and how many
+# outputs for the writers.
+QUEUED_FILES_PER_JOB = 4
+
+# Tells the tasks of a stage that no more work is coming.
+_DONE = None
+
+
+def read_file(input_path: str) -> bytes:
+    with open(input_path, 'rb') as input_file:
+        return input_file.read()
+
+
+def _describe(error: Exception) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+class AnalysisPipeline:
+    """Analyzes many files in three stages that run at the same time:
+    readers read sources ahead of the analysis, a pool of jobs analyzes
+    them, and writers write the outputs out.
+
+    The stages are connected by bounded queues, so the readers never get
+    more than queue_size sources ahead of the analysis and finished outputs
+    wait for the writers in bounded numbers too. Reading and writing happen
+    on a pool of I/O threads, so while some files wait for a slow or network
+    disk, others are analyzed: with enough I/O threads, the analysis rather
+    than the disk's round trips limits the throughput.
+    """
+
+    def __init__(self, analyze: typing.Callable[[bytes], str],
+                 write: typing.Callable[[str, str], None],
+                 jobs: int = 1, io_threads: int = 8,
+                 queue_size: typing.Optional[int] = None,
+                 cache: typing.Optional[AnalysisCache] = None,
+                 variant: str = "") -> None:
+        """
+        :param analyze: Returns the output of a source, given its bytes.
+            With several jobs it runs in worker processes, so it has to be
+            picklable.
+        :param write: Writes the output of a source, given the source's path
+            and the output.
+        :param jobs: How many sources to analyze at once. With 1, they are
+            analyzed on a thread of this process.
+        :param io_threads: How many files to read or write at once.
+        :param queue_size: How many sources may wait for the analysis, and
+            how many outputs for the writers; QUEUED_FILES_PER_JOB per job
+            by default.
+        :param cache: If given, sources whose output is cached are not
+            analyzed again, and new outputs are cached.
+        :param variant: The variant the outputs are cached under, see
+            AnalysisCache.key.
+        """
+        self.analyze = analyze
+        self.write = write
+        self.jobs = jobs
+        self.io_threads = io_threads
+        self.queue_size = queue_size or QUEUED_FILES_PER_JOB * jobs
+        self.cache = cache
+        self.variant = variant
+
+    async def run(self, input_paths: typing.List[str]
+                  ) -> typing.Dict[str, typing.Optional[str]]:
+        """Analyzes files, writing the output of each one.
+
+        Returns:
+            typing.Dict[str, typing.Optional[str]]: for every input path,
+            None on success, otherwise a description of the error that
+            stopped its analysis.
+        """
+        paths = asyncio.Queue()
+        for input_path in input_paths:
+            paths.put_nowait(input_path)
+        sources = asyncio.Queue(self.queue_size)
+        outputs = asyncio.Queue(self.queue_size)
+        errors = {}
+        io_executor = concurrent.futures.ThreadPoolExecutor(self.io_threads)
+        if self.jobs == 1:
+            analysis_executor = concurrent.futures.ThreadPoolExecutor(1)
+        else:
+            analysis_executor = concurrent.futures.ProcessPoolExecutor(
+                self.jobs)
+        with io_executor, analysis_executor:
+            readers = [asyncio.create_task(self._read(
+                           paths, sources, outputs, errors, io_executor))
+                       for _ in range(self.io_threads)]
+            analyzers = [asyncio.create_task(self._analyze(
+                             sources, outputs, errors, analysis_executor))
+                         for _ in range(self.jobs)]
+            writers = [asyncio.create_task(self._write(
+                           outputs, errors, io_executor))
+                       for _ in range(self.io_threads)]
+            await asyncio.gather(*readers)
+            for _ in analyzers:
+                await sources.put(_DONE)
+            await asyncio.gather(*analyzers)
+            for _ in writers:
+                await outputs.put(_DONE)
+            await asyncio.gather(*writers)
+        return errors
+
+    async def _read(self, paths: asyncio.Queue, sources: asyncio.Queue,
+                    outputs: asyncio.Queue, errors: dict,
+                    executor: concurrent.futures.Executor) -> None:
+        loop = asyncio.get_running_loop()
+        while not paths.empty():
+            input_path = paths.get_nowait()
+            try:
+                source = await loop.run_in_executor(
+                    executor, read_file, input_path)
+                key = output = None
+                if self.cache is not None:
+                    key = self.cache.key(source, self.variant)
+                    output = await loop.run_in_executor(
+                        executor, self.cache.get, key)
+            except Exception as error:
+                errors[input_path] = _describe(error)
+                continue
+            if output is None:
+                await sources.put((input_path, source, key))
+            else:
+                await outputs.put((input_path, output, None))
+
+    async def _analyze(self, sources: asyncio.Queue, outputs: asyncio.Queue,
+                       errors: dict,
+                       executor: concurrent.futures.Executor) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await sources.get()
+            if item is _DONE:
+                return
+            input_path, source, key = item
+            try:
+                output = await loop.run_in_executor(
+                    executor, self.analyze, source)
+            except Exception as error:
+                errors[input_path] = _describe(error)
+                continue
+            await outputs.put((input_path, output, key))
+
+    async def _write(self, outputs: asyncio.Queue, errors: dict,
+                     executor: concurrent.futures.Executor) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await outputs.get()
+            if item is _DONE:
+                return
+            input_path, output, key = item
+            try:
+                await loop.run_in_executor(
+                    executor, self.write, input_path, output)
+                if key is not None:
+                    await loop.run_in_executor(
+                        executor, self.cache.put, key, output)
+                errors[input_path] = None
+            except Exception as error:
+                errors[input_path] = _describe(error)
@@ -0,0 +1,34 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import contextlib
+import os
+import threading
+import typing
+
+
+@contextlib.contextmanager
+def open_atomically(output_path: str,
+                    mode: str = 'w') -> typing.Iterator[typing.IO]:
+    """Opens a file for writing under a temporary name, and renames it to
+    output_path once it is closed. Readers of output_path thus see either
+    its previous contents or the complete new ones, and an analysis that
+    fails halfway leaves the previous output in place. The mode is 'w', or
+    'wb' for binary output. The temporary name is unique to the calling
+    thread, so threads of one process writing the same output at once (as
+    JackAnalyzerServer's may) never share it.
+    """
+    temporary_path = \
+        f"{output_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temporary_path, mode) as output_file:
+            yield output_file
+        os.replace(temporary_path, output_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
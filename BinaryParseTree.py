@@ -0,0 +1,334 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+
+A compact binary format for parse trees, written instead of the XML.
+
+A file starts with MAGIC and holds the tree of every class, one after the
+other, then a string table, then the offset of the string table as an
+8 byte little-endian integer. Every element of a tree is a varint (7 bits
+per byte, least significant first, the high bit set on all but the last
+byte) code:
+
+- below len(RULES): a non-terminal of that rule, followed by a varint
+  count of its children and then the children themselves;
+- below STRING_BASE: the keyword or symbol FIXED_TERMINALS[code -
+  len(RULES)], which takes a single byte;
+- from STRING_BASE on: a terminal of kind TERMINAL_KINDS[k] whose text is
+  string i of the string table, where code = STRING_BASE + i * 5 + k.
+
+The string table is a 4 byte little-endian count N of strings, N + 1 4 byte
+little-endian offsets into the UTF-8 data that follows (string i is the
+data from offset i to offset i + 1), and that data. Every distinct text is
+kept once, so a name used a hundred times costs its bytes once.
+"""
+import argparse
+import gc
+import mmap
+import os
+import struct
+import sys
+import typing
+
+from JackTokenizer import KEYWORDS, SYMBOLS
+from ParseHandler import ParseHandler
+from ParseTree import Node, Terminal, TreeBuilder
+from XmlWriter import XmlWriter
+
+# Changing any of the tables below changes the codes, so it needs a new
+# version in MAGIC.
+MAGIC = b"JPT\x01"
+RULES = ("class", "classVarDec", "subroutineDec", "parameterList",
+         "subroutineBody", "varDec", "statements", "letStatement",
+         "ifStatement", "whileStatement", "doStatement", "returnStatement",
+         "expression", "term", "expressionList")
+FIXED_TERMINALS = tuple(
+    [("keyword", keyword) for keyword in sorted(KEYWORDS)] +
+    [("symbol", symbol) for symbol in sorted(SYMBOLS)])
+TERMINAL_KINDS = ("keyword", "symbol", "integerConstant", "stringConstant",
+                  "identifier")
+STRING_BASE = len(RULES) + len(FIXED_TERMINALS)
+
+RULE_CODES = {rule: code for code, rule in enumerate(RULES)}
+FIXED_TERMINAL_CODES = {terminal: len(RULES) + index
+                        for index, terminal in enumerate(FIXED_TERMINALS)}
+KIND_CODES = {kind: code for code, kind in enumerate(TERMINAL_KINDS)}
+
+_OFFSET = struct.Struct("<Q")
+_COUNT = struct.Struct("<I")
+
+
+def _write_varint(output: bytearray, value: int) -> None:
+    while value >= 0x80:
+        output.append(value & 0x7F | 0x80)
+        value >>= 7
+    output.append(value)
+
+
+def _rest_of_varint(first: int, codes: typing.Iterator[int]) -> int:
+    """Returns a varint of several bytes, given its first byte and the
+    bytes after it.
+    """
+    value = first & 0x7F
+    shift = 7
+    for byte in codes:
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value
+        shift += 7
+    raise ValueError("Truncated binary parse tree")
+
+
+class BinaryTreeWriter(TreeBuilder):
+    """A CompilationEngine writer that writes the parsed structure in the
+    binary format instead of as XML.
+
+    The child counts are only known once a rule ends, so every class is
+    built as a tree first; it is encoded and dropped as soon as it ends.
+    Call close() once every class is written, to write the string table.
+    """
+
+    def __init__(self, output_stream: typing.BinaryIO) -> None:
+        """
+        :param output_stream: Where to write the binary tree.
+        """
+        super().__init__()
+        self.output_file = output_stream
+        self.output_file.write(MAGIC)
+        self._size = len(MAGIC)
+        self._strings = {}
+
+    def end(self, rule: str) -> None:
+        super().end(rule)
+        if not self._stack:
+            self.write(self.classes.pop())
+
+    def write(self, node: Node) -> None:
+        """Writes the tree of a class."""
+        output = bytearray()
+        strings = self._strings
+        stack = [node]
+        while stack:
+            element = stack.pop()
+            if type(element) is Node:
+                _write_varint(output, RULE_CODES[element.rule])
+                _write_varint(output, len(element.children))
+                stack.extend(reversed(element.children))
+                continue
+            code = FIXED_TERMINAL_CODES.get((element.kind, element.text))
+            if code is None:
+                index = strings.setdefault(element.text, len(strings))
+                code = STRING_BASE + index * 5 + KIND_CODES[element.kind]
+            _write_varint(output, code)
+        self.output_file.write(output)
+        self._size += len(output)
+
+    def close(self) -> None:
+        """Writes the string table and the offset it starts at."""
+        data = [text.encode() for text in self._strings]
+        offsets = [0]
+        for text in data:
+            offsets.append(offsets[-1] + len(text))
+        self.output_file.write(
+            _COUNT.pack(len(data)) +
+            struct.pack(f"<{len(offsets)}I", *offsets) +
+            b"".join(data) + _OFFSET.pack(self._size))
+
+
+class BinaryTreeReader:
+    """Reads a binary tree file through a memory mapping.
+
+    Nothing is decoded up front: replay() walks the file and emits each
+    element as it reaches it, like ParseTree.replay does for a tree, and
+    strings are only decoded when they are first used. classes() builds
+    the trees when they are actually needed.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: The file to read.
+        :raises ValueError: If the file is not in the binary tree format.
+        """
+        with open(path, 'rb') as input_file:
+            if os.fstat(input_file.fileno()).st_size < len(MAGIC) + 12:
+                raise ValueError(f"Not a binary parse tree: {path}")
+            self._data = mmap.mmap(input_file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        if self._data[:len(MAGIC)] != MAGIC:
+            self._data.close()
+            raise ValueError(f"Not a binary parse tree: {path}")
+        self._end, = _OFFSET.unpack_from(self._data, len(self._data) - 8)
+        self._count, = _COUNT.unpack_from(self._data, self._end)
+        self._text_start = self._end + 4 + 4 * (self._count + 1)
+        self._strings = [None] * self._count
+
+    def string(self, index: int) -> str:
+        """Returns string index of the string table."""
+        text = self._strings[index]
+        if text is None:
+            start, end = struct.unpack_from(
+                "<2I", self._data, self._end + 4 + 4 * index)
+            text = self._data[self._text_start + start:
+                              self._text_start + end].decode()
+            self._strings[index] = text
+        return text
+
+    def replay(self, writer: ParseHandler) -> None:
+        """Emits every class in the file through a ParseHandler,
+        exactly as the engine did while parsing it.
+
+        Args:
+            writer (ParseHandler): the handler to report the trees to, such
+                as an XmlWriter or a TreeBuilder.
+        """
+        start, close, terminal = writer.start, writer.end, writer.terminal
+        strings, string = self._strings, self.string
+        rule_count = len(RULES)
+        # the open rules, how many children the innermost one still has to
+        # get, and that number for the others (-1 outside of any rule, where
+        # it never runs out)
+        rules = []
+        counts = []
+        left = -1
+        with memoryview(self._data)[len(MAGIC):self._end] as body:
+            codes = iter(body)
+            for code in codes:
+                if code >= 0x80:
+                    code = _rest_of_varint(code, codes)
+                if code < rule_count:
+                    count = next(codes)
+                    if count >= 0x80:
+                        count = _rest_of_varint(count, codes)
+                    rule = RULES[code]
+                    start(rule)
+                    if count:
+                        rules.append(rule)
+                        counts.append(left)
+                        left = count
+                        continue
+                    close(rule)
+                elif code < STRING_BASE:
+                    kind, text = FIXED_TERMINALS[code - rule_count]
+                    terminal(kind, text)
+                else:
+                    index, kind = divmod(code - STRING_BASE, 5)
+                    text = strings[index]
+                    if text is None:
+                        text = string(index)
+                    terminal(TERMINAL_KINDS[kind], text)
+                # the element is complete, and so may be the rules it ends
+                left -= 1
+                while not left:
+                    close(rules.pop())
+                    left = counts.pop() - 1
+
+    def classes(self) -> typing.List[Node]:
+        """Returns the parse tree of every class in the file.
+
+        It decodes like replay(), but builds the nodes itself rather than
+        through a TreeBuilder, which saves a method call per element. The
+        new nodes hold no reference cycles, so the cyclic garbage collector,
+        which would keep scanning them while they pile up, is paused.
+        """
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return self._build_classes()
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _build_classes(self) -> typing.List[Node]:
+        strings, string = self._strings, self.string
+        rule_count = len(RULES)
+        classes = []
+        # the children of the innermost open node, and those of the others
+        children = classes
+        parents = []
+        counts = []
+        left = -1
+        with memoryview(self._data)[len(MAGIC):self._end] as body:
+            codes = iter(body)
+            for code in codes:
+                if code >= 0x80:
+                    code = _rest_of_varint(code, codes)
+                if code < rule_count:
+                    count = next(codes)
+                    if count >= 0x80:
+                        count = _rest_of_varint(count, codes)
+                    node = Node(RULES[code])
+                    children.append(node)
+                    if count:
+                        parents.append(children)
+                        counts.append(left)
+                        children = node.children
+                        left = count
+                        continue
+                elif code < STRING_BASE:
+                    kind, text = FIXED_TERMINALS[code - rule_count]
+                    children.append(Terminal(kind, text))
+                else:
+                    index, kind = divmod(code - STRING_BASE, 5)
+                    text = strings[index]
+                    if text is None:
+                        text = string(index)
+                    children.append(Terminal(TERMINAL_KINDS[kind], text))
+                left -= 1
+                while not left:
+                    children = parents.pop()
+                    left = counts.pop() - 1
+        return classes
+
+    def write_xml(self, output_stream: typing.TextIO,
+                  space_counter: int = 0) -> None:
+        """Writes the file as the XML the CompilationEngine would write."""
+        writer = XmlWriter(output_stream, space_counter)
+        self.replay(writer)
+        writer.flush()
+
+    def close(self) -> None:
+        self._data.close()
+
+    def __enter__(self) -> "BinaryTreeReader":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+
+def write_binary(classes: typing.List[Node],
+                 output_stream: typing.BinaryIO) -> None:
+    """Writes parse trees in the binary format.
+
+    Args:
+        classes (typing.List[Node]): the "class" node of every class.
+        output_stream (typing.BinaryIO): where to write them.
+    """
+    writer = BinaryTreeWriter(output_stream)
+    for node in classes:
+        writer.write(node)
+    writer.close()
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Converts binary parse trees (.jpt files, see "
+                    "JackAnalyzer --binary) back into the canonical XML, "
+                    "written into the .xml file next to each one.")
+    parser.add_argument("input_paths", nargs="+")
+    arguments = parser.parse_args()
+    failures = 0
+    for input_path in arguments.input_paths:
+        output_path = os.path.splitext(input_path)[0] + ".xml"
+        try:
+            with BinaryTreeReader(input_path) as reader, \
+                    open(output_path, 'w') as output_file:
+                reader.write_xml(output_file)
+        except (OSError, ValueError) as error:
+            failures += 1
+            print(f"{input_path}: {error}", file=sys.stderr)
+    if failures:
+        sys.exit(f"{failures} of {len(arguments.input_paths)} files failed")
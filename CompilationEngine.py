@@ -8,6 +8,8 @@ Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 import typing
 
 from JackTokenizer import JackTokenizer
+from ParseHandler import ParseHandler
+from XmlWriter import XmlWriter
 
 OPERATIONS = {'+', '-', '/', '&', '|', '<', '>', '=', '*'}
 UNARY_OPERATIONS = {'-', '~', '#', '^'}
@@ -18,32 +20,49 @@ class CompilationEngine:
     output stream.
     """
 
-    def __init__(self, input_stream: "JackTokenizer", output_stream) -> None:
+    def __init__(self, input_stream: "JackTokenizer", output_stream,
+                 space_counter: int = 0,
+                 writer: typing.Optional[ParseHandler] = None) -> None:
         """
         Creates a new compilation engine with the given input and output. The
         next routine called must be compileClass()
         :param input_stream: The input stream.
         :param output_stream: The output stream.
+        :param space_counter: How many spaces to indent each nesting level of
+            the XML by (0 writes every line at the first column).
+        :param writer: The ParseHandler the parsed structure is reported
+            to; by default an XmlWriter that buffers the XML and writes it
+            to output_stream in blocks.
         """
-        # Note that you can write to output_stream like so:
-        # output_stream.write("Hello world! \n")
         self.tokenizer = input_stream
         self.output_file = output_stream
-        self.space_counter = 0
+        self.space_counter = space_counter
+        if writer is None:
+            writer = XmlWriter(output_stream, space_counter)
+        self.writer = writer
+
+    def compile_classes(self) -> None:
+        """Compiles every class in the input, starting before its first
+        token. Parsing stops at the first token that does not start a class:
+        the end of the input after a complete parse.
+        """
+        self.tokenizer.advance()
+        while self.tokenizer.current_token == 'class':
+            self.compile_class()
 
     def compile_class(self) -> None:
         """Compiles a complete class."""
 
         subroutine_dec = {"function", "method", "constructor"}
 
-        self.output_file.write("<class>\n")  # beginning of file
+        self.writer.start("class")  # beginning of file
 
         # Write class and { and then advance to the class content
-        self.output_file.write("<keyword> class </keyword>\n")
+        self.writer.terminal("keyword", "class")
         self.tokenizer.advance()
-        self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")
+        self.writer.terminal("identifier", self.tokenizer.identifier())
         self.tokenizer.advance()
-        self.output_file.write("<symbol> { </symbol>\n")
+        self.writer.terminal("symbol", "{")
         self.tokenizer.advance()
 
         # Class variants
@@ -56,39 +75,39 @@ class CompilationEngine:
             self.compile_subroutine()
 
         # the end of the class
-        self.output_file.write("<symbol> } </symbol>\n")
-        self.tokenizer.advance()  # TODO: check if advance is not empty
+        self.writer.terminal("symbol", "}")
+        self.tokenizer.advance()
 
-        self.output_file.write("</class>\n")  # end of file
+        self.writer.end("class")  # end of file
 
     def compile_class_var_dec(self) -> None:
         """Compiles a static declaration or a field declaration."""
         """- classVarDec: ('static' | 'field') type varName (',' varName)* ';'  """
 
-        self.output_file.write("<classVarDec>\n")
+        self.writer.start("classVarDec")
 
-        self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")    # ('static' | 'field')
+        self.writer.terminal("keyword", self.tokenizer.keyword())    # ('static' | 'field')
         self.tokenizer.advance()
 
         if self.tokenizer.token_type() == "KEYWORD":
-            self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # type
+            self.writer.terminal("keyword", self.tokenizer.keyword())  # type
             self.tokenizer.advance()
         else:
-            self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")  # type (object kind)
+            self.writer.terminal("identifier", self.tokenizer.identifier())  # type (object kind)
             self.tokenizer.advance()
 
-        self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")   # # varName
+        self.writer.terminal("identifier", self.tokenizer.identifier())   # # varName
         self.tokenizer.advance()
 
         while self.tokenizer.current_token == ",":
-            self.output_file.write(f"<symbol> , </symbol>\n")
+            self.writer.terminal("symbol", ",")
             self.tokenizer.advance()
-            self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")
+            self.writer.terminal("identifier", self.tokenizer.identifier())
             self.tokenizer.advance()
 
-        self.output_file.write(f"<symbol> ; </symbol>\n")
+        self.writer.terminal("symbol", ";")
         self.tokenizer.advance()
-        self.output_file.write("</classVarDec>\n")
+        self.writer.end("classVarDec")
 
     def compile_subroutine(self) -> None:
         """
@@ -99,32 +118,31 @@ class CompilationEngine:
         """ - subroutineDec: ('constructor' | 'function' | 'method') ('void' | type) 
     - subroutineName '(' parameterList ')' subroutineBody"""
 
-        self.output_file.write("<subroutineDec>\n")
-        self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # method/func/constructor
+        self.writer.start("subroutineDec")
+        self.writer.terminal("keyword", self.tokenizer.keyword())  # method/func/constructor
         self.tokenizer.advance()
 
         if self.tokenizer.token_type() == "KEYWORD":
-            self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # type
+            self.writer.terminal("keyword", self.tokenizer.keyword())  # type
             self.tokenizer.advance()
         else:
-            self.output_file.write(
-                f"<identifier> {self.tokenizer.identifier()} </identifier>\n")  # type (object kind)
+            self.writer.terminal("identifier", self.tokenizer.identifier())  # type (object kind)
             self.tokenizer.advance()
 
-        self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")  # subroutineName
+        self.writer.terminal("identifier", self.tokenizer.identifier())  # subroutineName
         self.tokenizer.advance()
 
-        self.output_file.write("<symbol> ( </symbol>\n")  # (
+        self.writer.terminal("symbol", "(")  # (
         self.tokenizer.advance()
 
         self.compile_parameter_list()  # compile the list that is between the () in example: function int getx (x,y,z) it will be x,y,z
 
-        self.output_file.write("<symbol> ) </symbol>\n")  # )
+        self.writer.terminal("symbol", ")")  # )
         self.tokenizer.advance()
 
         # - subroutineBody: '{' varDec* statements '}'
-        self.output_file.write("<subroutineBody>\n")
-        self.output_file.write("<symbol> { </symbol>\n")  # {
+        self.writer.start("subroutineBody")
+        self.writer.terminal("symbol", "{")  # {
         self.tokenizer.advance()
 
         self.compile_var_dec()
@@ -132,11 +150,11 @@ class CompilationEngine:
         self.compile_statements()
 
 
-        self.output_file.write("<symbol> } </symbol>\n")  # }
-        self.output_file.write("</subroutineBody>\n")
+        self.writer.terminal("symbol", "}")  # }
+        self.writer.end("subroutineBody")
         self.tokenizer.advance()
 
-        self.output_file.write("</subroutineDec>\n")
+        self.writer.end("subroutineDec")
 
     def compile_parameter_list(self) -> None:
         """Compiles a (possibly empty) parameter list, not including the
@@ -147,55 +165,62 @@ class CompilationEngine:
         # check if empty
         if self.tokenizer.token_type() == "SYMBOL":
             if self.tokenizer.symbol() == ")":
-                self.output_file.write("<parameterList>\n"
-                                       "</parameterList>\n")
+                self.writer.start("parameterList")
+                self.writer.end("parameterList")
                 return
         else:  # not empty
-            self.output_file.write("<parameterList>\n")
-            self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # type
-            self.tokenizer.advance()
-            self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")  # varName
+            self.writer.start("parameterList")
+            self.compile_type()
+            self.writer.terminal("identifier", self.tokenizer.identifier())  # varName
             self.tokenizer.advance()
 
             while self.tokenizer.symbol() == ",":
-                self.output_file.write(f"<symbol> , </symbol>\n")
-                self.tokenizer.advance()
-                self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # type
+                self.writer.terminal("symbol", ",")
                 self.tokenizer.advance()
-                self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")
+                self.compile_type()
+                self.writer.terminal("identifier", self.tokenizer.identifier())
                 self.tokenizer.advance()
 
-            self.output_file.write("</parameterList>\n")
+            self.writer.end("parameterList")
+
+    def compile_type(self) -> None:
+        """Compiles the type of a parameter: 'int' | 'char' | 'boolean' |
+        className.
+        """
+        if self.tokenizer.token_type() == "KEYWORD":
+            self.writer.terminal("keyword", self.tokenizer.keyword())
+        else:
+            self.writer.terminal("identifier", self.tokenizer.identifier())  # object kind
+        self.tokenizer.advance()
 
     def compile_var_dec(self) -> None:
         """Compiles a var declaration."""
         # varDec: 'var' type varName (',' varName)* ';'
         while self.tokenizer.current_token == "var":
-            self.output_file.write("<varDec>\n")
+            self.writer.start("varDec")
 
-            self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")   # write 'var'
+            self.writer.terminal("keyword", self.tokenizer.keyword())   # write 'var'
             self.tokenizer.advance()
 
             if self.tokenizer.token_type() == "KEYWORD":
-                self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # type
+                self.writer.terminal("keyword", self.tokenizer.keyword())  # type
                 self.tokenizer.advance()
             else:
-                self.output_file.write(
-                    f"<identifier> {self.tokenizer.identifier()} </identifier>\n")  # type (object kind)
+                self.writer.terminal("identifier", self.tokenizer.identifier())  # type (object kind)
                 self.tokenizer.advance()
 
-            self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")  # write the varName
+            self.writer.terminal("identifier", self.tokenizer.identifier())  # write the varName
             self.tokenizer.advance()
             # write all the parameters
             while self.tokenizer.symbol() == ",":
-                self.output_file.write(f"<symbol> , </symbol>\n")
+                self.writer.terminal("symbol", ",")
                 self.tokenizer.advance()
-                self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")
+                self.writer.terminal("identifier", self.tokenizer.identifier())
                 self.tokenizer.advance()
 
-            self.output_file.write(f"<symbol> ; </symbol>\n")
+            self.writer.terminal("symbol", ";")
             self.tokenizer.advance()
-            self.output_file.write("</varDec>\n")
+            self.writer.end("varDec")
 
 
     def compile_statements(self) -> None:
@@ -206,161 +231,167 @@ class CompilationEngine:
         #                  returnStatement
         STATEMENTS_KEYS = {'let', 'if', 'while', 'do', 'return'}
 
-        self.output_file.write("<statements>\n")
-
-        while self.tokenizer.token_type() == "KEYWORD":
-            if self.tokenizer.keyword() in STATEMENTS_KEYS:
-                if self.tokenizer.keyword() == "let":
-                    self.compile_let()
-                elif self.tokenizer.keyword() == "while":
-                    self.compile_while()
-                elif self.tokenizer.keyword() == "do":
-                    self.compile_do()
-                elif self.tokenizer.keyword() == "return":
-                    self.compile_return()
-                elif self.tokenizer.keyword() == "if":
-                    self.compile_if()
-
-        self.output_file.write("</statements>\n")
+        self.writer.start("statements")
+
+        # any other token ends the statements, so a keyword that can't
+        # start a statement (e.g. in code that is still being typed) doesn't
+        # keep this loop spinning on it
+        while self.tokenizer.current_token in STATEMENTS_KEYS:
+            if self.tokenizer.keyword() == "let":
+                self.compile_let()
+            elif self.tokenizer.keyword() == "while":
+                self.compile_while()
+            elif self.tokenizer.keyword() == "do":
+                self.compile_do()
+            elif self.tokenizer.keyword() == "return":
+                self.compile_return()
+            elif self.tokenizer.keyword() == "if":
+                self.compile_if()
+
+        self.writer.end("statements")
 
     def compile_do(self) -> None:
         """Compiles a do statement."""
         # - doStatement: 'do' subroutineCall ';'
 
-        self.output_file.write("<doStatement>\n")
+        self.writer.start("doStatement")
 
-        self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # do
+        self.writer.terminal("keyword", self.tokenizer.keyword())  # do
         self.tokenizer.advance()
 
         # subroutineCall
-        self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")
+        self.writer.terminal("identifier", self.tokenizer.identifier())
         self.tokenizer.advance()
         # if we have '.' we add another identifier before :(expressionList)
         if self.tokenizer.current_token == '.':
-            self.output_file.write("<symbol> . </symbol>\n")
+            self.writer.terminal("symbol", ".")
             self.tokenizer.advance()
-            self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")
+            self.writer.terminal("identifier", self.tokenizer.identifier())
             self.tokenizer.advance()
 
-        self.output_file.write("<symbol> ( </symbol>\n")
+        self.writer.terminal("symbol", "(")
         self.tokenizer.advance()
         self.compile_expression_list()
-        self.output_file.write("<symbol> ) </symbol>\n")
+        self.writer.terminal("symbol", ")")
         self.tokenizer.advance()
 
-        self.output_file.write(f"<symbol> ; </symbol>\n")   # ;
+        self.writer.terminal("symbol", ";")   # ;
         self.tokenizer.advance()
 
-        self.output_file.write("</doStatement>\n")
+        self.writer.end("doStatement")
 
     def compile_let(self) -> None:
         """Compiles a let statement."""
 
-        self.output_file.write("<letStatement>\n")
+        self.writer.start("letStatement")
 
-        self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # let
+        self.writer.terminal("keyword", self.tokenizer.keyword())  # let
         self.tokenizer.advance()
 
-        self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")  # varName
+        self.writer.terminal("identifier", self.tokenizer.identifier())  # varName
         self.tokenizer.advance()
 
         if self.tokenizer.current_token == "[":  # option for [expression]
-            self.output_file.write("<symbol> [ </symbol>\n")
+            self.writer.terminal("symbol", "[")
             self.tokenizer.advance()
             self.compile_expression()
-            self.output_file.write("<symbol> ] </symbol>\n")
+            self.writer.terminal("symbol", "]")
             self.tokenizer.advance()
 
-        self.output_file.write("<symbol> = </symbol>\n")  # =
+        self.writer.terminal("symbol", "=")  # =
         self.tokenizer.advance()
 
         self.compile_expression()  # expression
 
-        self.output_file.write(f"<symbol> ; </symbol>\n")   # ;
+        self.writer.terminal("symbol", ";")   # ;
         self.tokenizer.advance()
 
-        self.output_file.write("</letStatement>\n")
+        self.writer.end("letStatement")
 
     def compile_while(self) -> None:
         """Compiles a while statement."""
         # - whileStatement: 'while' '(' 'expression' ')' '{' statements '}'
-        self.output_file.write("<whileStatement>\n")
+        self.writer.start("whileStatement")
 
-        self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # while
+        self.writer.terminal("keyword", self.tokenizer.keyword())  # while
         self.tokenizer.advance()
-        self.output_file.write("<symbol> ( </symbol>\n")
+        self.writer.terminal("symbol", "(")
         self.tokenizer.advance()
         self.compile_expression()
-        self.output_file.write("<symbol> ) </symbol>\n")
+        self.writer.terminal("symbol", ")")
         self.tokenizer.advance()
-        self.output_file.write("<symbol> { </symbol>\n")
+        self.writer.terminal("symbol", "{")
         self.tokenizer.advance()
         self.compile_statements()
-        self.output_file.write("<symbol> } </symbol>\n")
+        self.writer.terminal("symbol", "}")
         self.tokenizer.advance()
 
-        self.output_file.write("</whileStatement>\n")
+        self.writer.end("whileStatement")
 
     def compile_return(self) -> None:
         """Compiles a return statement."""
-        self.output_file.write("<returnStatement>\n")
-        self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # return
+        self.writer.start("returnStatement")
+        self.writer.terminal("keyword", self.tokenizer.keyword())  # return
         self.tokenizer.advance()
 
         if self.tokenizer.current_token != ";":  # check for expression
             self.compile_expression()
 
-        self.output_file.write("<symbol> ; </symbol>\n")  # ;
+        self.writer.terminal("symbol", ";")  # ;
         self.tokenizer.advance()
 
-        self.output_file.write("</returnStatement>\n")
+        self.writer.end("returnStatement")
 
     def compile_if(self) -> None:
         """Compiles an if statement, possibly with a trailing else clause."""
         #  ifStatement: 'if' '(' expression ')' '{' statements '}' ('else' '{'
         #                    statements '}')?
-        self.output_file.write("<ifStatement>\n")
+        self.writer.start("ifStatement")
 
-        self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # if
+        self.writer.terminal("keyword", self.tokenizer.keyword())  # if
         self.tokenizer.advance()
 
-        self.output_file.write("<symbol> ( </symbol>\n")
+        self.writer.terminal("symbol", "(")
         self.tokenizer.advance()
         self.compile_expression()
-        self.output_file.write("<symbol> ) </symbol>\n")
+        self.writer.terminal("symbol", ")")
         self.tokenizer.advance()
 
-        self.output_file.write("<symbol> { </symbol>\n")
+        self.writer.terminal("symbol", "{")
         self.tokenizer.advance()
         self.compile_statements()
-        self.output_file.write("<symbol> } </symbol>\n")
+        self.writer.terminal("symbol", "}")
         self.tokenizer.advance()
 
         while self.tokenizer.current_token == "else":
 
-            self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")  # else
+            self.writer.terminal("keyword", self.tokenizer.keyword())  # else
             self.tokenizer.advance()
 
-            self.output_file.write("<symbol> { </symbol>\n")
+            self.writer.terminal("symbol", "{")
             self.tokenizer.advance()
             self.compile_statements()
-            self.output_file.write("<symbol> } </symbol>\n")
+            self.writer.terminal("symbol", "}")
             self.tokenizer.advance()
 
-        self.output_file.write("</ifStatement>\n")
+        self.writer.end("ifStatement")
 
     def compile_expression(self) -> None:
         """Compiles an expression."""
-        # term (op term)?
-        self.output_file.write("<expression>\n")
+        # term (op term)*
+        # Jack gives every op the same precedence and applies them left to
+        # right, so precedence climbing comes down to taking (op term) pairs
+        # in a loop. The operands stay flat under one <expression>, and a
+        # chain of any length is compiled without recursing per operator.
+        self.writer.start("expression")
         self.compile_term()
 
-        if self.tokenizer.current_token in OPERATIONS:
-            self.output_file.write(f"<symbol> {self.tokenizer.symbol()} </symbol>\n")
+        while self.tokenizer.current_token in OPERATIONS:
+            self.writer.terminal("symbol", self.tokenizer.current_token)
             self.tokenizer.advance()
             self.compile_term()
 
-        self.output_file.write("</expression>\n")
+        self.writer.end("expression")
 
     def compile_term(self) -> None:
         """ Compiles a term.
@@ -374,40 +405,35 @@ class CompilationEngine:
         """
         # first check if it's a simple number or string or const keyword
         # then check for the two other recognisable options : (expression) , unaryOp term
-        self.output_file.write("<term>\n")
+        self.writer.start("term")
+        # unaryOp term: the operand of each unary op is a term nested in this
+        # one, so a run of unary ops opens one term per op and closes them
+        # all once the innermost term is compiled
+        nested_terms = 0
+        while self.tokenizer.current_token in UNARY_OPERATIONS:
+            self.writer.terminal("symbol", self.tokenizer.current_token)
+            self.tokenizer.advance()
+            self.writer.start("term")
+            nested_terms += 1
+
         if self.tokenizer.token_type() == "INT_CONST":
-            self.output_file.write(f"<integerConstant> {self.tokenizer.int_val()} </integerConstant>\n")
+            self.writer.terminal("integerConstant", str(self.tokenizer.int_val()))
             self.tokenizer.advance()
 
         elif self.tokenizer.token_type() == "STRING_CONST":
-            self.output_file.write(f"<stringConstant> {self.tokenizer.string_val()} </stringConstant>\n")
+            self.writer.terminal("stringConstant", self.tokenizer.string_val())
             self.tokenizer.advance()
 
         elif self.tokenizer.current_token in KEYWORD_CONSTANTS:
-            self.output_file.write(f"<keyword> {self.tokenizer.keyword()} </keyword>\n")
+            self.writer.terminal("keyword", self.tokenizer.keyword())
             self.tokenizer.advance()
 
         elif self.tokenizer.current_token == '(':
-            self.output_file.write("<symbol> ( </symbol>\n")
+            self.writer.terminal("symbol", "(")
             self.tokenizer.advance()
             self.compile_expression()
-            self.output_file.write("<symbol> ) </symbol>\n")
-            self.tokenizer.advance()
-
-        elif self.tokenizer.current_token in UNARY_OPERATIONS:
-            # #(y+3) is an option, so we either get' unaryOp term' or 'unaryOp (expression)'
-            self.output_file.write(f"<symbol> {self.tokenizer.symbol()} </symbol>\n")
+            self.writer.terminal("symbol", ")")
             self.tokenizer.advance()
-            if self.tokenizer.current_token == '(':
-                self.output_file.write("<term>\n")
-                self.output_file.write("<symbol> ( </symbol>\n")
-                self.tokenizer.advance()
-                self.compile_expression()
-                self.output_file.write("<symbol> ) </symbol>\n")
-                self.tokenizer.advance()
-                self.output_file.write("</term>\n")
-            else:
-                self.compile_term()
 
         elif self.tokenizer.token_type() == "IDENTIFIER":
             # keep the current token and advance to check what the next one is
@@ -415,44 +441,47 @@ class CompilationEngine:
             self.tokenizer.advance()
 
             if self.tokenizer.current_token == '[':
-                self.output_file.write(f"<identifier> {prev_token} </identifier>\n")
-                self.output_file.write("<symbol> [ </symbol>\n")
+                self.writer.terminal("identifier", prev_token)
+                self.writer.terminal("symbol", "[")
                 self.tokenizer.advance()
                 self.compile_expression()
-                self.output_file.write("<symbol> ] </symbol>\n")
+                self.writer.terminal("symbol", "]")
                 self.tokenizer.advance()
 
             elif self.tokenizer.current_token == '(':
-                self.output_file.write(f"<identifier> {prev_token} </identifier>\n")
-                self.output_file.write("<symbol> ( </symbol>\n")
+                self.writer.terminal("identifier", prev_token)
+                self.writer.terminal("symbol", "(")
                 self.tokenizer.advance()
                 self.compile_expression_list()
-                self.output_file.write("<symbol> ) </symbol>\n")
+                self.writer.terminal("symbol", ")")
                 self.tokenizer.advance()
 
             elif self.tokenizer.current_token == '.':
-                self.output_file.write(f"<identifier> {prev_token} </identifier>\n")
-                self.output_file.write("<symbol> . </symbol>\n")
+                self.writer.terminal("identifier", prev_token)
+                self.writer.terminal("symbol", ".")
                 self.tokenizer.advance()
-                self.output_file.write(f"<identifier> {self.tokenizer.identifier()} </identifier>\n")
+                self.writer.terminal("identifier", self.tokenizer.identifier())
                 self.tokenizer.advance()
-                self.output_file.write("<symbol> ( </symbol>\n")
+                self.writer.terminal("symbol", "(")
                 self.tokenizer.advance()
                 self.compile_expression_list()
-                self.output_file.write("<symbol> ) </symbol>\n")
+                self.writer.terminal("symbol", ")")
                 self.tokenizer.advance()
 
             else:
-                self.output_file.write(f"<identifier> {prev_token} </identifier>\n")
-        self.output_file.write("</term>\n")
+                self.writer.terminal("identifier", prev_token)
+
+        for _ in range(nested_terms):
+            self.writer.end("term")
+        self.writer.end("term")
 
     def compile_expression_list(self) -> None:
         """Compiles a (possibly empty) comma-separated list of expressions."""
         # if it's empty do nothing
-        self.output_file.write("<expressionList>\n")
+        self.writer.start("expressionList")
 
         if self.tokenizer.current_token == ')':
-            self.output_file.write("</expressionList>\n")   #############
+            self.writer.end("expressionList")   #############
 
             return
 
@@ -462,8 +491,8 @@ class CompilationEngine:
 
         # while we have commas, compile the expression that comes after
         while self.tokenizer.current_token == ",":
-            self.output_file.write("<symbol> , </symbol>\n")
+            self.writer.terminal("symbol", ",")
             self.tokenizer.advance()
             self.compile_expression()
 
-        self.output_file.write("</expressionList>\n")
+        self.writer.end("expressionList")
@@ -0,0 +1,83 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import os
+import time
+import typing
+
+
+class DirectoryWatcher:
+    """Polls a set of files and reports the ones that changed.
+
+    A file counts as changed when its modification time or size differs
+    from when it was last reported. It is only reported once it has stayed
+    the same for a debounce period, so an editor that saves a file in
+    several writes causes a single report, with the complete file.
+    """
+
+    def __init__(self, list_files: typing.Callable[[], typing.List[str]],
+                 interval: float = 0.5, debounce: float = 0.2) -> None:
+        """
+        :param list_files: Returns the files to watch; called on every poll,
+            so files that are created later are picked up.
+        :param interval: Seconds between polls.
+        :param debounce: Seconds a changed file has to stay unchanged before
+            it is reported.
+        """
+        self.list_files = list_files
+        self.interval = interval
+        self.debounce = debounce
+        # the state of each file when it was last reported
+        self.known = self.snapshot()
+        # changed files that are not settled yet: their state, and since when
+        self.pending = {}
+
+    def snapshot(self) -> typing.Dict[str, typing.Tuple[int, int]]:
+        """Returns the (modification time, size) of every watched file."""
+        states = {}
+        for path in self.list_files():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # deleted since it was listed
+            states[path] = (stat.st_mtime_ns, stat.st_size)
+        return states
+
+    def poll(self) -> typing.List[str]:
+        """Checks the files once.
+
+        Returns:
+            typing.List[str]: the files that changed and have settled since
+            the last poll, sorted.
+        """
+        now = time.monotonic()
+        current = self.snapshot()
+        settled = []
+        for path, state in current.items():
+            if self.known.get(path) == state:
+                self.pending.pop(path, None)
+                continue
+            pending_state, since = self.pending.get(path, (None, now))
+            if pending_state != state:
+                self.pending[path] = (state, now)
+            elif now - since >= self.debounce:
+                del self.pending[path]
+                self.known[path] = state
+                settled.append(path)
+        for path in set(self.known) - set(current):
+            del self.known[path]
+        for path in set(self.pending) - set(current):
+            del self.pending[path]
+        return sorted(settled)
+
+    def changes(self) -> typing.Iterator[typing.List[str]]:
+        """Polls forever, yielding each non-empty batch of settled changes."""
+        while True:
+            time.sleep(self.interval)
+            changed = self.poll()
+            if changed:
+                yield changed
@@ -0,0 +1,136 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import re
+import typing
+
+# How many characters of the golden file are read at a time (rounded up to
+# the end of a line).
+BLOCK_SIZE = 64 * 1024
+
+_WORD = re.compile(r"\S+")
+
+
+def _word_at(text: str, index: int) -> typing.Tuple[str, int]:
+    """Returns the whitespace separated word of a text that holds its
+    index-th non-whitespace character, and where the word starts.
+    """
+    for match in _WORD.finditer(text):
+        length = match.end() - match.start()
+        if index < length:
+            return match.group(), match.start()
+        index -= length
+    raise IndexError(index)
+
+
+class GoldenComparer:
+    """A text stream that, instead of keeping what is written into it,
+    compares it with a golden file as it is written, ignoring whitespace
+    like the course's TextComparer.
+
+    The golden file is read in blocks, only as far as the output written so
+    far reaches, and every block is compared as soon as both sides have it,
+    so neither document is ever held in memory as a whole. Writers are
+    expected to write whole lines, as XmlWriter and write_tokens do, so the
+    differing words it reports are never cut in two.
+    """
+
+    def __init__(self, golden_file: typing.TextIO) -> None:
+        """
+        :param golden_file: The file the output should be equal to.
+        """
+        self.golden_file = golden_file
+        # a description of the first difference, once one is found
+        self.difference = None
+        self._output_line = 1
+        # the golden block being compared, without whitespace, how much of
+        # it was compared, and the line it starts at
+        self._golden_block = ""
+        self._golden_stripped = ""
+        self._golden_offset = 0
+        self._golden_line = 1
+
+    def write(self, text: str) -> int:
+        if self.difference is None:
+            stripped = "".join(text.split())
+            position = 0
+            while position < len(stripped):
+                if self._golden_offset == len(self._golden_stripped) and \
+                        not self._read_golden():
+                    self._report(text, position, None)
+                    break
+                length = min(len(stripped) - position,
+                             len(self._golden_stripped) - self._golden_offset)
+                output_part = stripped[position:position + length]
+                golden_part = self._golden_stripped[
+                    self._golden_offset:self._golden_offset + length]
+                if output_part != golden_part:
+                    index = next(index for index in range(length)
+                                 if output_part[index] != golden_part[index])
+                    self._golden_offset += index
+                    self._report(text, position + index,
+                                 self._golden_offset)
+                    break
+                position += length
+                self._golden_offset += length
+            self._output_line += text.count("\n")
+        return len(text)
+
+    def close(self) -> None:
+        """Checks that the golden file has nothing left the output lacks.
+        Call it once the whole output was written.
+        """
+        if self.difference is None:
+            while self._golden_offset == len(self._golden_stripped):
+                if not self._read_golden():
+                    return
+            self._report(None, 0, self._golden_offset)
+
+    def _read_golden(self) -> bool:
+        """Reads the next block of the golden file that has anything but
+        whitespace in it, returning False at the end of the file.
+        """
+        while True:
+            self._golden_line += self._golden_block.count("\n")
+            self._golden_block = self.golden_file.read(BLOCK_SIZE)
+            if not self._golden_block:
+                self._golden_stripped = ""
+                self._golden_offset = 0
+                return False
+            if not self._golden_block.endswith("\n"):
+                self._golden_block += self.golden_file.readline()
+            self._golden_stripped = "".join(self._golden_block.split())
+            self._golden_offset = 0
+            if self._golden_stripped:
+                return True
+
+    def _report(self, output_text: typing.Optional[str], output_index: int,
+                golden_index: typing.Optional[int]) -> None:
+        """Describes the first difference: the words of the output and of
+        the golden file holding the first character that differs, with their
+        lines.
+
+        :param output_text: The text written when the difference was found,
+            or None if the output ended first.
+        :param output_index: The non-whitespace character of output_text
+            that differs.
+        :param golden_index: The non-whitespace character of the golden
+            block that differs, or None if the golden file ended first.
+        """
+        if golden_index is None:
+            expected = f"the end of the file at line {self._golden_line}"
+        else:
+            word, start = _word_at(self._golden_block, golden_index)
+            line = self._golden_line + self._golden_block.count("\n", 0, start)
+            expected = f"{word!r} at line {line}"
+        if output_text is None:
+            actual = f"the end of the output at line {self._output_line}"
+        else:
+            word, start = _word_at(output_text, output_index)
+            line = self._output_line + output_text.count("\n", 0, start)
+            actual = f"{word!r} at line {line}"
+        self.difference = f"expected {expected}, got {actual}"
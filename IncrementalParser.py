@@ -0,0 +1,242 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import bisect
+import typing
+from array import array
+
+from CompilationEngine import CompilationEngine
+from JackTokenizer import JackTokenizer, KEYWORD, TOKEN_PATTERN
+from ParseTree import Node, TreeBuilder, write_xml
+
+SUBROUTINE_KEYWORDS = {"constructor", "function", "method"}
+# Two tokens of no kind are put after the tokens that are parsed. Unlike the
+# end of the input, they count in current_token_index, which tells where the
+# engine stopped: on the first one after a complete parse, and past it if it
+# ran out of tokens.
+_END_OF_INPUT = [("", 0), ("", 0)]
+
+
+class _Subroutine:
+    """The tokens of a subroutineDec and where they are in the source.
+
+    Offsets are kept relative to base, the offset at which lexing the
+    subroutine starts (the end of the token before it), so an edit only
+    moves the bases of the subroutines after it.
+    """
+    __slots__ = ("node", "parent", "base", "tokens", "kinds", "starts",
+                 "ends")
+
+    def __init__(self, node: Node, parent: Node, base: int) -> None:
+        self.node = node
+        self.parent = parent
+        self.base = base
+        self.tokens = []
+        self.kinds = array('B')
+        self.starts = array('L')
+        self.ends = array('L')
+
+
+class _SpanRecorder(TreeBuilder):
+    """A TreeBuilder that also records which tokens each subroutineDec was
+    parsed from.
+    """
+
+    def __init__(self, tokenizer: JackTokenizer) -> None:
+        super().__init__()
+        self.tokenizer = tokenizer
+        # [node, class node, first token, end token] per subroutineDec
+        self.spans = []
+
+    def start(self, rule: str) -> None:
+        super().start(rule)
+        if rule == "subroutineDec":
+            self.spans.append([self._stack[-1], self._stack[-2],
+                               self.tokenizer.current_token_index - 1])
+
+    def end(self, rule: str) -> None:
+        if rule == "subroutineDec":
+            self.spans[-1].append(self.tokenizer.current_token_index - 1)
+        super().end(rule)
+
+
+class IncrementalParser:
+    """Keeps the parse tree of a Jack source up to date as the source is
+    edited, e.g. by an editor.
+
+    An edit that stays within a single subroutine only re-lexes that
+    subroutine's text and re-parses that subroutine, then puts the new
+    subroutineDec node in place of the old one, so it costs time in the size
+    of the subroutine rather than of the file. Any other edit, or one whose
+    effect reaches beyond the subroutine (e.g. by opening a block comment
+    that closes after it), re-parses the whole source. Either way the tree
+    is the one parsing the new source from scratch gives.
+    """
+
+    def __init__(self, source: str) -> None:
+        """
+        :param source: The Jack source to parse.
+        :raises ValueError: if the source cannot be parsed.
+        """
+        self.source = source
+        self.classes = []
+        self._subroutines = []
+        # the base of each of self._subroutines, for looking edits up
+        self._bases = []
+        self._parse_all()
+
+    def edit(self, start: int, end: int, text: str) -> typing.Optional[Node]:
+        """Replaces source[start:end] with text and updates the parse tree.
+
+        :param start: Where the replaced text starts in the source.
+        :param end: Where the replaced text ends in the source.
+        :param text: The text to put in its place.
+        :return: The new subroutineDec node if only that subroutine was
+            re-parsed; it replaced the old node among its class node's
+            children, and write_xml(node, ...) gives its XML. None if the
+            whole source was re-parsed.
+        :raises ValueError: if the new source cannot be parsed. The edit is
+            still applied, and the next edit re-parses the whole source.
+        """
+        if not 0 <= start <= end <= len(self.source):
+            raise ValueError(f"Edit range out of bounds: {start}:{end}")
+        self.source = self.source[:start] + text + self.source[end:]
+        index = bisect.bisect_right(self._bases, start) - 1
+        if index >= 0:
+            delta = len(text) - (end - start)
+            node = self._reparse(self._subroutines[index], start, end, delta)
+            if node is not None:
+                for later in self._subroutines[index + 1:]:
+                    later.base += delta
+                self._bases[index + 1:] = [
+                    later.base for later in self._subroutines[index + 1:]]
+                return node
+        self._parse_all()
+        return None
+
+    def write_xml(self, output_stream: typing.TextIO,
+                  space_counter: int = 0) -> None:
+        """Writes the XML of every class, as JackAnalyzer would.
+
+        :param output_stream: Where to write the XML.
+        :param space_counter: How many spaces to indent each nesting level by.
+        """
+        for node in self.classes:
+            write_xml(node, output_stream, space_counter)
+
+    def _parse_all(self) -> None:
+        """Lexes and parses the whole source, recording the subroutines."""
+        tokens = []
+        kinds = array('B')
+        starts = array('L')
+        ends = array('L')
+        for match in TOKEN_PATTERN.finditer(self.source):
+            group = match.lastindex
+            if group:
+                tokens.append(match.group(group))
+                kinds.append(group)
+                starts.append(match.start(group))
+                ends.append(match.end())
+        self.classes = []
+        self._subroutines = []
+        self._bases = []
+
+        tokenizer = JackTokenizer.from_tokens(
+            tokens + [token for token, _ in _END_OF_INPUT],
+            kinds + array('B', [kind for _, kind in _END_OF_INPUT]))
+        recorder = _SpanRecorder(tokenizer)
+        engine = CompilationEngine(tokenizer, None, writer=recorder)
+        engine.compile_classes()
+        self.classes = recorder.classes
+
+        for node, parent, first, last in recorder.spans:
+            if last > len(tokens):
+                continue  # ran out of tokens: never re-parsed on its own
+            subroutine = _Subroutine(node, parent,
+                                     ends[first - 1] if first else 0)
+            subroutine.tokens = tokens[first:last]
+            subroutine.kinds = kinds[first:last]
+            subroutine.starts = array(
+                'L', [offset - subroutine.base for offset in starts[first:last]])
+            subroutine.ends = array(
+                'L', [offset - subroutine.base for offset in ends[first:last]])
+            self._subroutines.append(subroutine)
+            self._bases.append(subroutine.base)
+
+    def _reparse(self, subroutine: _Subroutine, start: int, end: int,
+                 delta: int) -> typing.Optional[Node]:
+        """Re-lexes and re-parses a single subroutine after an edit.
+
+        :param subroutine: The subroutine the edit starts in.
+        :param start: Where the edit starts, in the old source.
+        :param end: Where the edit ends, in the old source.
+        :param delta: How much longer the source became.
+        :return: The new subroutineDec node, or None if the edit cannot be
+            handled within the subroutine.
+        """
+        base = subroutine.base
+        if not subroutine.tokens or start < base + subroutine.starts[0] or \
+                end > base + subroutine.ends[-1]:
+            return None
+        # Lexing restarts at the base, where a match started before the
+        # edit, and goes on until a token ends where an old token ended,
+        # after the edit: from there on the text is the same as before and
+        # so are the tokens.
+        tokens = []
+        kinds = array('B')
+        starts = array('L')
+        ends = array('L')
+        last_end = subroutine.ends[-1]
+        resumed_at = None
+        for match in TOKEN_PATTERN.finditer(self.source, base):
+            group = match.lastindex
+            if not group:
+                continue
+            tokens.append(match.group(group))
+            kinds.append(group)
+            starts.append(match.start(group) - base)
+            ends.append(match.end() - base)
+            if match.end() >= end + delta:  # the token ends after the edit
+                old_end = match.end() - delta - base
+                if old_end > last_end:
+                    return None  # the edit's effect reaches past the subroutine
+                index = bisect.bisect_left(subroutine.ends, old_end)
+                if index < len(subroutine.ends) and \
+                        subroutine.ends[index] == old_end:
+                    resumed_at = index + 1
+                    break
+        if resumed_at is None:
+            return None
+        tokens += subroutine.tokens[resumed_at:]
+        kinds += subroutine.kinds[resumed_at:]
+        starts.extend(offset + delta for offset in subroutine.starts[resumed_at:])
+        ends.extend(offset + delta for offset in subroutine.ends[resumed_at:])
+        if kinds[0] != KEYWORD or tokens[0] not in SUBROUTINE_KEYWORDS:
+            return None  # compile_class would not see a subroutine here
+
+        tokenizer = JackTokenizer.from_tokens(
+            tokens + [token for token, _ in _END_OF_INPUT],
+            kinds + array('B', [kind for _, kind in _END_OF_INPUT]))
+        builder = TreeBuilder()
+        engine = CompilationEngine(tokenizer, None, writer=builder)
+        tokenizer.advance()
+        try:
+            engine.compile_subroutine()
+        except ValueError:
+            return None
+        if tokenizer.current_token_index != len(tokens) + 1:
+            return None  # the subroutine ended before or after its tokens
+
+        node = builder.classes[0]
+        children = subroutine.parent.children
+        children[children.index(subroutine.node)] = node
+        subroutine.node = node
+        subroutine.tokens = tokens
+        subroutine.kinds = kinds
+        subroutine.starts = starts
+        subroutine.ends = ends
+        return node
@@ -0,0 +1,342 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+from CompilationEngine import (CompilationEngine, KEYWORD_CONSTANTS,
+                               OPERATIONS, UNARY_OPERATIONS)
+from JackTokenizer import IDENTIFIER, INT_CONST, STRING_CONST
+
+# The states of the parsing machine. Each of the first ones compiles the
+# beginning of a rule; the others carry on with a rule once a rule nested
+# in it was compiled, and are what the machine keeps on its stack instead
+# of Python stack frames.
+(_STATEMENTS, _LET, _IF, _WHILE, _DO, _RETURN, _EXPRESSION,
+ _TERM, _EXPRESSION_LIST,
+ _NEXT_STATEMENT, _LET_INDEX, _LET_VALUE, _IF_CONDITION, _IF_BODY,
+ _WHILE_CONDITION, _WHILE_BODY, _DO_ARGUMENTS, _RETURN_VALUE, _NEXT_TERM,
+ _NEXT_EXPRESSION, _PARENTHESIZED_TERM, _ARRAY_TERM, _CALL_TERM,
+ _DONE) = range(24)
+
+STATEMENT_STATES = {"let": _LET, "if": _IF, "while": _WHILE, "do": _DO,
+                    "return": _RETURN}
+
+
+class IterativeCompilationEngine(CompilationEngine):
+    """A CompilationEngine that compiles statements and expressions without
+    recursion, emitting exactly the same structure.
+
+    Statements contain statements and expressions contain expressions, so
+    the engine's compile_* methods for them call one another as deeply as
+    the code is nested, which makes deeply nested code slow and runs into
+    the recursion limit. Here a single loop compiles them all, following
+    the grammar rules as states of a machine, and pushes the state to come
+    back to onto a list when a rule nests another one. Nesting is thus
+    limited only by memory. The class level rules don't nest, and are
+    compiled by the CompilationEngine methods.
+    """
+
+    def compile_statements(self) -> None:
+        """Compiles a sequence of statements, not including the enclosing
+        "{}".
+        """
+        self._run(_STATEMENTS)
+
+    def compile_do(self) -> None:
+        """Compiles a do statement."""
+        self._run(_DO)
+
+    def compile_let(self) -> None:
+        """Compiles a let statement."""
+        self._run(_LET)
+
+    def compile_while(self) -> None:
+        """Compiles a while statement."""
+        self._run(_WHILE)
+
+    def compile_return(self) -> None:
+        """Compiles a return statement."""
+        self._run(_RETURN)
+
+    def compile_if(self) -> None:
+        """Compiles an if statement, possibly with a trailing else clause."""
+        self._run(_IF)
+
+    def compile_expression(self) -> None:
+        """Compiles an expression."""
+        self._run(_EXPRESSION)
+
+    def compile_term(self) -> None:
+        """Compiles a term."""
+        self._run(_TERM)
+
+    def compile_expression_list(self) -> None:
+        """Compiles a (possibly empty) comma-separated list of expressions."""
+        self._run(_EXPRESSION_LIST)
+
+    def _run(self, state: int) -> None:
+        """Runs the parsing machine from a state until the rule it starts is
+        compiled.
+
+        :param state: One of the states that start a rule.
+        """
+        tokenizer = self.tokenizer
+        advance = tokenizer.advance
+        start = self.writer.start
+        end = self.writer.end
+        terminal = self.writer.terminal
+        # the states to go on with once the current rule is compiled; a term
+        # also keeps its count of nested unary op terms here
+        stack = [_DONE]
+        push = stack.append
+        pop = stack.pop
+
+        # The states are tested roughly from the most to the least frequent.
+        while True:
+            if state == _TERM:
+                # integerConstant | stringConstant | keywordConstant |
+                # varName | varName '[' expression ']' | subroutineCall |
+                # '(' expression ')' | unaryOp term
+                start("term")
+                token = tokenizer.current_token
+                nested_terms = 0
+                while token in UNARY_OPERATIONS:
+                    terminal("symbol", token)
+                    advance()
+                    start("term")
+                    nested_terms += 1
+                    token = tokenizer.current_token
+                kind = tokenizer.current_kind
+                if kind == INT_CONST:
+                    terminal("integerConstant", str(int(token)))
+                    advance()
+                elif kind == STRING_CONST:
+                    terminal("stringConstant", token[1:-1])
+                    advance()
+                elif token in KEYWORD_CONSTANTS:
+                    terminal("keyword", token)
+                    advance()
+                elif token == '(':
+                    terminal("symbol", "(")
+                    advance()
+                    push(nested_terms)
+                    push(_PARENTHESIZED_TERM)
+                    state = _EXPRESSION
+                    continue
+                elif kind == IDENTIFIER:
+                    # a single look-ahead token tells a variable, an array
+                    # entry and a subroutine call apart
+                    advance()
+                    following = tokenizer.current_token
+                    if following == '[':
+                        terminal("identifier", token)
+                        terminal("symbol", "[")
+                        advance()
+                        push(nested_terms)
+                        push(_ARRAY_TERM)
+                        state = _EXPRESSION
+                        continue
+                    elif following == '(' or following == '.':
+                        terminal("identifier", token)
+                        if following == '.':
+                            terminal("symbol", ".")
+                            advance()
+                            terminal("identifier", tokenizer.identifier())
+                            advance()
+                        terminal("symbol", "(")
+                        advance()
+                        push(nested_terms)
+                        push(_CALL_TERM)
+                        state = _EXPRESSION_LIST
+                        continue
+                    terminal("identifier", token)
+                for _ in range(nested_terms):
+                    end("term")
+                end("term")
+                state = pop()
+
+            elif state == _NEXT_TERM:
+                # (op term)*: Jack applies every op left to right, so the
+                # terms of an expression are taken in a loop
+                token = tokenizer.current_token
+                if token in OPERATIONS:
+                    terminal("symbol", token)
+                    advance()
+                    push(_NEXT_TERM)
+                    state = _TERM
+                else:
+                    end("expression")
+                    state = pop()
+
+            elif state == _EXPRESSION:
+                start("expression")
+                push(_NEXT_TERM)
+                state = _TERM
+
+            elif state == _PARENTHESIZED_TERM or state == _ARRAY_TERM or \
+                    state == _CALL_TERM:
+                terminal("symbol", ")" if state != _ARRAY_TERM else "]")
+                advance()
+                for _ in range(pop()):
+                    end("term")
+                end("term")
+                state = pop()
+
+            elif state == _EXPRESSION_LIST:
+                start("expressionList")
+                if tokenizer.current_token == ')':
+                    end("expressionList")
+                    state = pop()
+                else:
+                    push(_NEXT_EXPRESSION)
+                    state = _EXPRESSION
+
+            elif state == _NEXT_EXPRESSION:
+                if tokenizer.current_token == ",":
+                    terminal("symbol", ",")
+                    advance()
+                    push(_NEXT_EXPRESSION)
+                    state = _EXPRESSION
+                else:
+                    end("expressionList")
+                    state = pop()
+
+            elif state == _NEXT_STATEMENT:
+                # statement*: any token that can't start a statement ends them
+                state = STATEMENT_STATES.get(tokenizer.current_token)
+                if state is None:
+                    end("statements")
+                    state = pop()
+                else:
+                    push(_NEXT_STATEMENT)
+
+            elif state == _STATEMENTS:
+                start("statements")
+                state = _NEXT_STATEMENT
+
+            elif state == _LET:
+                # 'let' varName ('[' expression ']')? '=' expression ';'
+                start("letStatement")
+                terminal("keyword", tokenizer.keyword())
+                advance()
+                terminal("identifier", tokenizer.identifier())
+                advance()
+                if tokenizer.current_token == "[":
+                    terminal("symbol", "[")
+                    advance()
+                    push(_LET_INDEX)
+                else:
+                    terminal("symbol", "=")
+                    advance()
+                    push(_LET_VALUE)
+                state = _EXPRESSION
+
+            elif state == _LET_INDEX:
+                terminal("symbol", "]")
+                advance()
+                terminal("symbol", "=")
+                advance()
+                push(_LET_VALUE)
+                state = _EXPRESSION
+
+            elif state == _LET_VALUE:
+                terminal("symbol", ";")
+                advance()
+                end("letStatement")
+                state = pop()
+
+            elif state == _DO:
+                # 'do' subroutineCall ';'
+                start("doStatement")
+                terminal("keyword", tokenizer.keyword())
+                advance()
+                terminal("identifier", tokenizer.identifier())
+                advance()
+                if tokenizer.current_token == '.':
+                    terminal("symbol", ".")
+                    advance()
+                    terminal("identifier", tokenizer.identifier())
+                    advance()
+                terminal("symbol", "(")
+                advance()
+                push(_DO_ARGUMENTS)
+                state = _EXPRESSION_LIST
+
+            elif state == _DO_ARGUMENTS:
+                terminal("symbol", ")")
+                advance()
+                terminal("symbol", ";")
+                advance()
+                end("doStatement")
+                state = pop()
+
+            elif state == _IF:
+                # 'if' '(' expression ')' '{' statements '}'
+                # ('else' '{' statements '}')?
+                start("ifStatement")
+                terminal("keyword", tokenizer.keyword())
+                advance()
+                terminal("symbol", "(")
+                advance()
+                push(_IF_CONDITION)
+                state = _EXPRESSION
+
+            elif state == _IF_CONDITION or state == _WHILE_CONDITION:
+                terminal("symbol", ")")
+                advance()
+                terminal("symbol", "{")
+                advance()
+                push(_IF_BODY if state == _IF_CONDITION else _WHILE_BODY)
+                state = _STATEMENTS
+
+            elif state == _IF_BODY:
+                terminal("symbol", "}")
+                advance()
+                if tokenizer.current_token == "else":
+                    terminal("keyword", tokenizer.keyword())
+                    advance()
+                    terminal("symbol", "{")
+                    advance()
+                    push(_IF_BODY)
+                    state = _STATEMENTS
+                else:
+                    end("ifStatement")
+                    state = pop()
+
+            elif state == _WHILE:
+                # 'while' '(' expression ')' '{' statements '}'
+                start("whileStatement")
+                terminal("keyword", tokenizer.keyword())
+                advance()
+                terminal("symbol", "(")
+                advance()
+                push(_WHILE_CONDITION)
+                state = _EXPRESSION
+
+            elif state == _WHILE_BODY:
+                terminal("symbol", "}")
+                advance()
+                end("whileStatement")
+                state = pop()
+
+            elif state == _RETURN:
+                # 'return' expression? ';'
+                start("returnStatement")
+                terminal("keyword", tokenizer.keyword())
+                advance()
+                if tokenizer.current_token != ";":
+                    push(_RETURN_VALUE)
+                    state = _EXPRESSION
+                else:
+                    state = _RETURN_VALUE
+
+            elif state == _RETURN_VALUE:
+                terminal("symbol", ";")
+                advance()
+                end("returnStatement")
+                state = pop()
+
+            else:  # _DONE
+                return
@@ -5,11 +5,29 @@ was written by Aviv Yaish. It is an extension to the specifications given
 as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
+import argparse
+import functools
+import io
 import os
 import sys
 import typing
+from AnalysisCache import AnalysisCache, CACHE_DIRECTORY_NAME, DEFAULT_MAX_BYTES
+from AtomicFile import open_atomically
 from CompilationEngine import CompilationEngine
 from JackTokenizer import JackTokenizer
+from ParseHandler import CountingHandler, ParseHandler
+from XmlWriter import write_tokens
+
+# The output formats, engines and modes other than the default are imported
+# only by the functions that use them, so analyzing into XML, the common
+# case, starts without loading them (asyncio alone would take longer to
+# import than a small project takes to analyze).
+
+# Sources at least this large are tokenized through a memory mapping.
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+# (name, xml, error) as produced by iter_analyze_sources
+SourceResult = typing.Tuple[str, typing.Optional[str], typing.Optional[str]]
 
 
 def analyze_file(input_file: typing.TextIO, output_file: typing.TextIO) -> None:
@@ -21,14 +39,547 @@ def analyze_file(input_file: typing.TextIO, output_file: typing.TextIO) -> None:
     """
     # Your code goes here!
     # It might be good to start by creating a new JackTokenizer and CompilationEngine:
-    tokenizer = JackTokenizer(input_file)
-    engine = CompilationEngine(tokenizer, output_file)
+    compile_tokens(JackTokenizer(input_file, streaming=True), output_file)
+
+
+def compile_tokens(tokenizer: JackTokenizer, output_file: typing.TextIO,
+                   engine_class: type = CompilationEngine) -> None:
+    """Compiles every class a tokenizer produces.
+
+    Args:
+        tokenizer (JackTokenizer): the tokens to compile.
+        output_file (typing.TextIO): writes all output to this file.
+        engine_class (type): the engine to compile with, CompilationEngine
+            or IterativeCompilationEngine; both write the same XML.
+    """
+    engine = engine_class(tokenizer, output_file)
+
+
+
+    engine.compile_classes()
+
+
+def compile_with(tokenizer: JackTokenizer, handler: ParseHandler,
+                 engine_class: type = CompilationEngine) -> None:
+    """Parses every class a tokenizer produces, reporting the parse to a
+    handler instead of writing XML.
+
+    Args:
+        tokenizer (JackTokenizer): the tokens to parse.
+        handler (ParseHandler): receives the parse, e.g. a JsonWriter or a
+            ParseTree.TreeBuilder.
+        engine_class (type): the engine to parse with, CompilationEngine
+            or IterativeCompilationEngine.
+    """
+    engine = engine_class(tokenizer, None, writer=handler)
+    engine.compile_classes()
+
+
+def compile_vm(tokenizer: JackTokenizer, output_file: typing.TextIO,
+               engine_class: type = CompilationEngine) -> None:
+    """Compiles every class a tokenizer produces into Hack VM code, while
+    parsing it, instead of into XML.
+
+    Args:
+        tokenizer (JackTokenizer): the tokens to compile.
+        output_file (typing.TextIO): writes all VM commands to this file.
+        engine_class (type): the engine to parse with, CompilationEngine
+            or IterativeCompilationEngine.
+    """
+    from VMCodeGenerator import VMCodeGenerator
+    compile_with(tokenizer, VMCodeGenerator(output_file), engine_class)
+
+
+def compile_json(tokenizer: JackTokenizer, output_file: typing.TextIO,
+                 engine_class: type = CompilationEngine) -> None:
+    """Compiles every class a tokenizer produces into JSON Lines, one class
+    per line, instead of into XML; see JsonWriter.
+
+    Args:
+        tokenizer (JackTokenizer): the tokens to compile.
+        output_file (typing.TextIO): writes the JSON to this file.
+        engine_class (type): the engine to parse with.
+    """
+    from JsonWriter import JsonWriter
+    writer = JsonWriter(output_file)
+    compile_with(tokenizer, writer, engine_class)
+    writer.flush()
+
+
+def compile_optimized(tokenizer: JackTokenizer, output_file: typing.TextIO,
+                      level: int, vm: bool = False,
+                      engine_class: type = CompilationEngine,
+                      statistics: typing.Optional[list] = None,
+                      json_lines: bool = False) -> None:
+    """Parses every class a tokenizer produces into a parse tree, runs the
+    optimization passes of a level over it, and only then writes the
+    optimized program as XML, as VM code or as JSON Lines.
+
+    Args:
+        tokenizer (JackTokenizer): the tokens to compile.
+        output_file (typing.TextIO): writes all output to this file.
+        level (int): the optimization level, see Optimizer.optimize.
+        vm (bool): if True, write VM code instead of XML.
+        engine_class (type): the engine to parse with.
+        statistics (typing.Optional[list]): if given, the statistics of
+            every pass are added to it, with the size of the output in lines
+            (VM commands with vm) before and after the pass.
+        json_lines (bool): if True, write JSON Lines instead of XML.
+    """
+    from JsonWriter import JsonWriter
+    import Optimizer
+    import ParseTree
+    from VMCodeGenerator import VMCodeGenerator
+    builder = ParseTree.TreeBuilder()
+    compile_with(tokenizer, builder, engine_class)
+
+    def emit(classes: typing.List["ParseTree.Node"],
+             output: typing.TextIO) -> None:
+        for node in classes:
+            if vm:
+                ParseTree.replay(node, VMCodeGenerator(output))
+            elif json_lines:
+                ParseTree.replay(node, JsonWriter(output))
+            else:
+                ParseTree.write_xml(node, output)
+
+    def measure(classes: typing.List["ParseTree.Node"]) -> int:
+        output = io.StringIO()
+        emit(classes, output)
+        return output.getvalue().count("\n")
+
+    passes = Optimizer.optimize(builder.classes, level,
+                                measure if statistics is not None else None)
+    if statistics is not None:
+        statistics.extend(passes)
+    emit(builder.classes, output_file)
+
+
+def compile_binary(tokenizer: JackTokenizer, output_file: typing.BinaryIO,
+                   engine_class: type = CompilationEngine,
+                   level: int = 0) -> None:
+    """Compiles every class a tokenizer produces into the binary parse tree
+    format of BinaryParseTree, instead of into XML.
+
+    Args:
+        tokenizer (JackTokenizer): the tokens to compile.
+        output_file (typing.BinaryIO): writes the binary trees to this file.
+        engine_class (type): the engine to parse with.
+        level (int): the optimization level, see Optimizer.optimize.
+    """
+    from BinaryParseTree import BinaryTreeWriter
+    import Optimizer
+    import ParseTree
+    writer = BinaryTreeWriter(output_file)
+    if level:
+        builder = ParseTree.TreeBuilder()
+        engine = engine_class(tokenizer, None, writer=builder)
+    else:
+        engine = engine_class(tokenizer, None, writer=writer)
+    engine.compile_classes()
+    if level:
+        Optimizer.optimize(builder.classes, level)
+        for node in builder.classes:
+            writer.write(node)
+    writer.close()
+
+
+def analyze_source(source: str, tokens_only: bool = False) -> str:
+    """Analyzes Jack source held in memory, without any file I/O.
+
+    Args:
+        source (str): the source to analyze.
+        tokens_only (bool): if True, only tokenize it, like --tokens.
+
+    Returns:
+        str: the XML the analyzer would have written for it.
+    """
+    output = io.StringIO()
+    tokenizer = JackTokenizer(io.StringIO(source))
+    if tokens_only:
+        write_tokens(tokenizer, output)
+    else:
+        compile_tokens(tokenizer, output)
+    return output.getvalue()
+
+
+def _analyze_named_sources(
+        named_sources: typing.List[typing.Tuple[str, str]],
+        tokens_only: bool) -> typing.List[SourceResult]:
+    """Runs analyze_source on a batch of (name, source) pairs, returning a
+    (name, xml, error) triple for each; see iter_analyze_sources.
+    """
+    results = []
+    for name, source in named_sources:
+        try:
+            results.append((name, analyze_source(source, tokens_only), None))
+        except Exception as error:
+            results.append((name, None, f"{type(error).__name__}: {error}"))
+    return results
+
+
+def iter_analyze_sources(
+        sources: typing.Mapping[str, str], jobs: int = 1,
+        tokens_only: bool = False, batch_size: int = 64
+) -> typing.Iterator[SourceResult]:
+    """Analyzes many sources held in memory, yielding each result as soon as
+    it is ready.
+
+    Args:
+        sources (typing.Mapping[str, str]): the sources, by name.
+        jobs (int): how many sources to analyze at once, or 0 for one per
+            CPU. With 1, they are analyzed in this process, in order;
+            otherwise batches of them are spread over that many worker
+            processes and come back in the order they finish.
+        tokens_only (bool): if True, only tokenize, like --tokens.
+        batch_size (int): how many sources a worker process gets at a time.
 
+    Returns:
+        typing.Iterator[SourceResult]: a (name, xml, error) triple for each
+        source.
+        On success error is None; otherwise xml is None and error describes
+        what stopped the analysis.
+    """
+    if jobs < 0:
+        raise ValueError(f"jobs must be at least 0, not {jobs}")
+    jobs = jobs or os.cpu_count()
+    named_sources = list(sources.items())
+    if jobs == 1:
+        yield from _analyze_named_sources(named_sources, tokens_only)
+        return
+    import concurrent.futures
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        batches = [
+            executor.submit(_analyze_named_sources,
+                            named_sources[start:start + batch_size],
+                            tokens_only)
+            for start in range(0, len(named_sources), batch_size)]
+        for batch in concurrent.futures.as_completed(batches):
+            yield from batch.result()
+
+
+def analyze_sources(sources: typing.Mapping[str, str], jobs: int = 1,
+                    tokens_only: bool = False) -> typing.Dict[str, str]:
+    """Analyzes many sources held in memory, without any file I/O.
+
+    Args:
+        sources (typing.Mapping[str, str]): the sources, by name.
+        jobs (int): how many sources to analyze at once, or 0 for one per
+            CPU.
+        tokens_only (bool): if True, only tokenize, like --tokens.
+
+    Returns:
+        typing.Dict[str, str]: the XML of each source, by name.
 
+    Raises:
+        ValueError: if a source could not be analyzed, or jobs is negative.
+    """
+    results = {}
+    for name, xml, error in iter_analyze_sources(sources, jobs, tokens_only):
+        if error is not None:
+            raise ValueError(f"{name}: {error}")
+        results[name] = xml
+    return {name: results[name] for name in sources}
 
-    tokenizer.advance()
-    while tokenizer.current_token == 'class':  # TODO:move the while loop to the function CompilationEngine.compileClass
-        engine.compile_class()
+
+def output_settings(tokens_only: bool = False, iterative: bool = False,
+                    vm: bool = False, optimization: int = 0,
+                    statistics: typing.Optional[list] = None,
+                    binary: bool = False, json_lines: bool = False
+                    ) -> typing.Tuple[str, typing.Callable[
+                        [JackTokenizer, typing.TextIO], None], str]:
+    """Returns how a file is analyzed with the options of analyze_path (see
+    there).
+
+    Returns:
+        typing.Tuple[str, typing.Callable, str]: what replaces the .jack
+        extension in the name of the output file, the function that writes
+        the output of a tokenizer into a file, and the variant the output is
+        cached under.
+    """
+    if tokens_only:
+        return "T.xml", write_tokens, "tokens"
+    if binary:
+        suffix, variant = ".jpt", "binary"
+        emit = functools.partial(compile_binary, level=optimization)
+    else:
+        if vm:
+            suffix, variant, emit = ".vm", "vm", compile_vm
+        elif json_lines:
+            suffix, variant, emit = ".json", "json", compile_json
+        else:
+            suffix, variant, emit = ".xml", "", compile_tokens
+        if optimization:
+            emit = functools.partial(compile_optimized, level=optimization,
+                                     vm=vm, statistics=statistics,
+                                     json_lines=json_lines)
+    if optimization:
+        variant += f"-O{optimization}"
+    if iterative:
+        from IterativeCompilationEngine import IterativeCompilationEngine
+        emit = functools.partial(emit, engine_class=IterativeCompilationEngine)
+    return suffix, emit, variant
+
+
+def analyze_bytes(source: bytes, emit: typing.Callable[
+        [JackTokenizer, typing.TextIO], None]) -> str:
+    """Returns the output of a source read from a file, as written by one of
+    the functions output_settings returns.
+    """
+    output = io.StringIO()
+    emit(JackTokenizer(io.TextIOWrapper(io.BytesIO(source)), streaming=True),
+         output)
+    return output.getvalue()
+
+
+def analyze_path(input_path: str,
+                 cache: typing.Optional[AnalysisCache] = None,
+                 tokens_only: bool = False,
+                 iterative: bool = False,
+                 vm: bool = False,
+                 optimization: int = 0,
+                 statistics: typing.Optional[list] = None,
+                 binary: bool = False,
+                 json_lines: bool = False
+                 ) -> typing.Optional[str]:
+    """Analyzes a single .jack file into the .xml file next to it.
+
+    Args:
+        input_path (str): path of the file to analyze.
+        cache (typing.Optional[AnalysisCache]): if given, a file whose source
+            was analyzed before is not analyzed again, and the result of a
+            new analysis is cached. Files of at least MMAP_THRESHOLD bytes
+            are tokenized through a memory mapping and never cached.
+        tokens_only (bool): if True, only tokenize the file, writing its
+            tokens into the T.xml file next to it (e.g. MainT.xml).
+        iterative (bool): if True, compile with IterativeCompilationEngine,
+            which has no limit on how deeply the code may be nested.
+        vm (bool): if True, compile the file into Hack VM code instead, in
+            the .vm file next to it.
+        optimization (int): the optimization level to compile at, see
+            Optimizer.optimize; 0 compiles the program as it is.
+        statistics (typing.Optional[list]): with an optimization level, the
+            statistics of every optimization pass are added to it.
+        binary (bool): if True, write the parse tree in the binary format of
+            BinaryParseTree instead, into the .jpt file next to it. The
+            cache only keeps text, so binary trees are never cached.
+        json_lines (bool): if True, write the parse tree as JSON Lines
+            instead, into the .json file next to it; see JsonWriter.
+
+    Returns:
+        typing.Optional[str]: None on success, otherwise a description of
+        the error that stopped the analysis of this file.
+    """
+    suffix, emit, variant = output_settings(tokens_only, iterative, vm,
+                                            optimization, statistics, binary,
+                                            json_lines)
+    output_path = os.path.splitext(input_path)[0] + suffix
+    mode = 'wb' if binary else 'w'
+    if binary:
+        cache = None
+    try:
+        if os.path.getsize(input_path) >= MMAP_THRESHOLD:
+            # too large to read and decode whole, as caching would need to:
+            # tokenize it through a memory mapping, bypassing the cache
+            tokenizer = JackTokenizer.memory_mapped(input_path)
+            with open_atomically(output_path, mode) as output_file:
+                emit(tokenizer, output_file)
+        elif cache is None:
+            with open(input_path, 'r') as input_file, \
+                    open_atomically(output_path, mode) as output_file:
+                emit(JackTokenizer(input_file, streaming=True), output_file)
+        else:
+            with open(input_path, 'rb') as input_file:
+                source = input_file.read()
+            key = cache.key(source, variant)
+            result = cache.get(key)
+            if result is None:
+                result = analyze_bytes(source, emit)
+                cache.put(key, result)
+            with open_atomically(output_path) as output_file:
+                output_file.write(result)
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+    return None
+
+
+def analyze_path_with_statistics(input_path: str, **options) -> dict:
+    """Runs analyze_path, returning the statistics of its optimization
+    passes along with its result.
+
+    Returns:
+        dict: the "file", its "error" (or None) and the statistics of every
+        optimization pass, in "passes".
+    """
+    statistics = []
+    error = analyze_path(input_path, statistics=statistics, **options)
+    return {"file": input_path, "error": error, "passes": statistics}
+
+
+def analyze_paths_pipelined(input_paths: typing.List[str], jobs: int = 1,
+                            io_threads: int = 8,
+                            cache: typing.Optional[AnalysisCache] = None,
+                            **options) -> typing.List[typing.Optional[str]]:
+    """Analyzes many files like analyze_path, but overlaps reading and
+    writing files with the analysis, for disks with slow round trips (e.g.
+    network file systems); see AnalysisPipeline. Sources are read into
+    memory whole, however large they are.
+
+    Args:
+        input_paths (typing.List[str]): paths of the files to analyze.
+        jobs (int): how many files to analyze at once.
+        io_threads (int): how many files to read or write at once.
+        cache (typing.Optional[AnalysisCache]): as for analyze_path.
+        **options: the output options of analyze_path.
+
+    Returns:
+        typing.List[typing.Optional[str]]: the result of each file, in the
+        order of input_paths, as analyze_path would have returned it.
+    """
+    import asyncio
+    from AnalysisPipeline import AnalysisPipeline
+    suffix, emit, variant = output_settings(**options)
+
+    def write(input_path: str, output: str) -> None:
+        output_path = os.path.splitext(input_path)[0] + suffix
+        with open_atomically(output_path) as output_file:
+            output_file.write(output)
+
+    pipeline = AnalysisPipeline(functools.partial(analyze_bytes, emit=emit),
+                                write, jobs, io_threads, cache=cache,
+                                variant=variant)
+    errors = asyncio.run(pipeline.run(input_paths))
+    return [errors[input_path] for input_path in input_paths]
+
+
+def verify_path(input_path: str, iterative: bool = False
+                ) -> typing.List[typing.Tuple[str, typing.Optional[str]]]:
+    """Compares the analysis of a .jack file with the golden files next to
+    it, the .xml and the T.xml file, without writing anything: the output
+    is compared while it is produced, ignoring whitespace.
+
+    Args:
+        input_path (str): path of the file to verify.
+        iterative (bool): if True, compile with IterativeCompilationEngine.
+
+    Returns:
+        typing.List[typing.Tuple[str, typing.Optional[str]]]: for each golden
+        file that exists, its path and None if the output matches it, or
+        else a description of the first difference or of the error that
+        stopped the analysis.
+    """
+    from GoldenComparer import GoldenComparer
+    base_path = os.path.splitext(input_path)[0]
+    compile_xml = output_settings(iterative=iterative)[1]
+    results = []
+    for golden_path, emit in ((base_path + ".xml", compile_xml),
+                              (base_path + "T.xml", write_tokens)):
+        if not os.path.exists(golden_path):
+            continue
+        try:
+            with open(input_path, 'r') as input_file, \
+                    open(golden_path, 'r') as golden_file:
+                comparer = GoldenComparer(golden_file)
+                emit(JackTokenizer(input_file, streaming=True), comparer)
+                comparer.close()
+            results.append((golden_path, comparer.difference))
+        except Exception as error:
+            results.append((golden_path, f"{type(error).__name__}: {error}"))
+    return results
+
+
+def validate_path(input_path: str, iterative: bool = False
+                  ) -> typing.Optional[str]:
+    """Checks that a .jack file parses, without writing anything: the
+    engine reports the parse to a CountingHandler, which formats nothing.
+
+    Args:
+        input_path (str): path of the file to check.
+        iterative (bool): if True, parse with IterativeCompilationEngine.
+
+    Returns:
+        typing.Optional[str]: None if the file parses, otherwise a
+        description of the error that stopped the parse.
+    """
+    engine_class = CompilationEngine
+    if iterative:
+        from IterativeCompilationEngine import IterativeCompilationEngine
+        engine_class = IterativeCompilationEngine
+    try:
+        with open(input_path, 'r') as input_file:
+            compile_with(JackTokenizer(input_file, streaming=True),
+                         CountingHandler(), engine_class)
+    except Exception as error:
+        return f"{type(error).__name__}: {error}"
+    return None
+
+
+def analyze_paths(input_paths: typing.List[str], jobs: int = 1,
+                  worker: typing.Callable[[str], typing.Any] = analyze_path
+                  ) -> typing.Iterator[typing.Any]:
+    """Analyzes many files, possibly in parallel.
+
+    Args:
+        input_paths (typing.List[str]): paths of the files to analyze.
+        jobs (int): how many files to analyze at once. With 1, the files are
+            analyzed one after the other in this process; otherwise they are
+            spread over that many worker processes.
+        worker (typing.Callable[[str], typing.Any]): analyzes a single file,
+            like analyze_path (the default) or Profiler.profile_path. It has
+            to be picklable to run in worker processes.
+
+    Returns:
+        typing.Iterator[typing.Any]: the result of the worker for each file,
+        in the order of input_paths.
+    """
+    if jobs == 1:
+        yield from map(worker, input_paths)
+        return
+    import concurrent.futures
+    # hand out several files per task so small files don't pay a round trip
+    # to the worker each
+    chunk_size = max(1, len(input_paths) // (jobs * 4))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as executor:
+        yield from executor.map(worker, input_paths, chunksize=chunk_size)
+
+
+def default_cache(argument_path: str, max_bytes: int = DEFAULT_MAX_BYTES
+                  ) -> AnalysisCache:
+    """Returns the cache the analyzer uses for an input path: the
+    CACHE_DIRECTORY_NAME directory next to the analyzed files.
+    """
+    cache_root = argument_path if os.path.isdir(argument_path) \
+        else os.path.dirname(argument_path)
+    return AnalysisCache(os.path.join(cache_root, CACHE_DIRECTORY_NAME),
+                         max_bytes)
+
+
+def list_jack_files(argument_path: str) -> typing.List[str]:
+    """Returns the .jack files an input path stands for: the path itself, or
+    every .jack file in it if it is a directory, sorted by name.
+    """
+    if os.path.isdir(argument_path):
+        files_to_assemble = [
+            os.path.join(argument_path, filename)
+            for filename in sorted(os.listdir(argument_path))]
+    else:
+        files_to_assemble = [argument_path]
+    return [input_path for input_path in files_to_assemble
+            if os.path.splitext(input_path)[1].lower() == ".jack"]
+
+
+def find_jack_files(root_path: str) -> typing.List[str]:
+    """Returns every .jack file under a directory and its subdirectories,
+    sorted by path, or the path itself if it is a .jack file.
+    """
+    if not os.path.isdir(root_path):
+        return list_jack_files(root_path)
+    input_paths = []
+    for directory, subdirectories, _ in os.walk(root_path):
+        subdirectories[:] = [name for name in subdirectories
+                             if name != CACHE_DIRECTORY_NAME]
+        input_paths.extend(list_jack_files(directory))
+    return sorted(input_paths)
 
 
 if "__main__" == __name__:
@@ -37,20 +588,217 @@ if "__main__" == __name__:
     # Both are closed automatically when the code finishes running.
     # If the output file does not exist, it is created automatically in the
     # correct path, using the correct filename.
-    if not len(sys.argv) == 2:
-        sys.exit("Invalid usage, please use: JackAnalyzer <input path>")
-    argument_path = os.path.abspath(sys.argv[1])
-    if os.path.isdir(argument_path):
-        files_to_assemble = [
-            os.path.join(argument_path, filename)
-            for filename in os.listdir(argument_path)]
+    parser = argparse.ArgumentParser(
+        prog="JackAnalyzer",
+        description="Analyzes a .jack file, or every .jack file in a "
+                    "directory, into .xml files.")
+    parser.add_argument("input_path")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="how many files to analyze in parallel (0 for one per CPU)")
+    parser.add_argument(
+        "--io-threads", type=int, default=0, metavar="N",
+        help="read and write N files at once while others are analyzed, "
+             "so slow or network disks don't hold the analysis up")
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help=f"analyze every file, without reading or updating the "
+             f"{CACHE_DIRECTORY_NAME} cache of previous results")
+    parser.add_argument(
+        "--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="how many megabytes of results the cache may keep")
+    output_format = parser.add_mutually_exclusive_group()
+    output_format.add_argument(
+        "--tokens", action="store_true",
+        help="only tokenize, writing each file's tokens into the T.xml "
+             "file next to it instead of parsing it")
+    output_format.add_argument(
+        "--vm", action="store_true",
+        help="compile each file into Hack VM code, written into the .vm "
+             "file next to it instead of the XML")
+    output_format.add_argument(
+        "--binary", action="store_true",
+        help="write each file's parse tree in a compact binary format, "
+             "into the .jpt file next to it instead of the XML; "
+             "BinaryParseTree.py converts it back to XML")
+    output_format.add_argument(
+        "--json", dest="json_lines", action="store_true",
+        help="write each file's parse tree as JSON Lines, one class per "
+             "line, into the .json file next to it instead of the XML")
+    output_format.add_argument(
+        "--validate", action="store_true",
+        help="write nothing; only parse every file, formatting no output, "
+             "and report the files whose parse fails")
+    output_format.add_argument(
+        "--verify", action="store_true",
+        help="write nothing; instead compare the analysis of every .jack "
+             "file under the input path, subdirectories included, with its "
+             ".xml and T.xml golden files, ignoring whitespace, and report "
+             "the first difference in each")
+    parser.add_argument(
+        "--iterative", action="store_true",
+        help="compile with the iterative engine, which writes the same XML "
+             "but is not limited in how deeply statements and expressions "
+             "may be nested")
+    parser.add_argument(
+        "-O", dest="optimization", type=int, default=0, metavar="LEVEL",
+        help="optimization level: 0 (the default) compiles the program as "
+             "it is, 1 folds constants and simplifies ~true "
+             "and ~false, 2 also removes dead branches and replaces "
+             "multiplications by powers of two with shifts, 3 also does so "
+             "for divisions (only right for non-negative dividends)")
+    parser.add_argument(
+        "--pass-stats", action="store_true",
+        help="with -O, print how many rewrites each optimization pass made "
+             "and by how many lines it shrank the output; implies --no-cache")
+    parser.add_argument(
+        "--profile", metavar="REPORT",
+        help="time each phase of every file and count tokens, grammar "
+             "nodes, tokens consumed by the parser and output bytes, "
+             "writing the report to REPORT (CSV if it ends with .csv, JSON "
+             "otherwise); honors the output options and implies --no-cache. "
+             "The phases are timed one after the other rather than "
+             "interleaved as usual, so their times are an approximation")
+    parser.add_argument(
+        "--profile-slowest", type=int, default=0, metavar="N",
+        help="with --profile, also dump cProfile statistics of the N "
+             "slowest files next to the report, re-analyzing them as usual "
+             "with the same output options")
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="after analyzing, keep watching the input path and re-analyze "
+             "every .jack file that changes, until interrupted")
+    parser.add_argument(
+        "--interval", type=float, default=0.5,
+        help="with --watch, seconds between checks for changes")
+    parser.add_argument(
+        "--debounce", type=float, default=0.2,
+        help="with --watch, seconds a changed file has to stay unchanged "
+             "before it is re-analyzed")
+    arguments = parser.parse_args()
+    if arguments.optimization:
+        import Optimizer
+        if not 0 <= arguments.optimization <= Optimizer.MAX_LEVEL:
+            parser.error(f"-O: the levels are 0 to {Optimizer.MAX_LEVEL}")
+    if arguments.profile and (arguments.validate or arguments.verify or
+                              arguments.pass_stats):
+        parser.error("--profile cannot be combined with --validate, "
+                     "--verify or --pass-stats")
+    if arguments.watch and (arguments.profile or arguments.pass_stats or
+                            arguments.verify):
+        parser.error("--watch cannot be combined with --profile, "
+                     "--pass-stats or --verify")
+    jobs = arguments.jobs if arguments.jobs > 0 else os.cpu_count()
+    argument_path = os.path.abspath(arguments.input_path)
+    if arguments.verify:
+        input_paths = find_jack_files(argument_path)
+        verified = differences = 0
+        for results in analyze_paths(
+                input_paths, jobs, functools.partial(
+                    verify_path, iterative=arguments.iterative)):
+            for golden_path, difference in results:
+                verified += 1
+                if difference is not None:
+                    differences += 1
+                    print(f"{golden_path}: {difference}", flush=True)
+        print(f"verified {verified} golden files of {len(input_paths)} "
+              f".jack files", file=sys.stderr)
+        if differences:
+            sys.exit(f"{differences} of {verified} golden files differ")
+        sys.exit()
+    files_to_assemble = list_jack_files(argument_path)
+    watcher = None
+    if arguments.watch:
+        from DirectoryWatcher import DirectoryWatcher
+        # the watcher takes its baseline now, so files saved while the first
+        # analysis runs count as changed
+        watcher = DirectoryWatcher(lambda: list_jack_files(argument_path),
+                                   arguments.interval, arguments.debounce)
+    cache = None
+    if not arguments.no_cache and not arguments.profile and \
+            not arguments.pass_stats and not arguments.validate:
+        cache = default_cache(argument_path,
+                              arguments.cache_size * 1024 * 1024)
+    output_options = dict(
+        tokens_only=arguments.tokens, iterative=arguments.iterative,
+        vm=arguments.vm, optimization=arguments.optimization,
+        binary=arguments.binary, json_lines=arguments.json_lines)
+    if arguments.profile:
+        import Profiler
+        worker = functools.partial(
+            Profiler.profile_path,
+            suffix=output_settings(**output_options)[0], **output_options)
+    elif arguments.validate:
+        worker = functools.partial(validate_path,
+                                   iterative=arguments.iterative)
     else:
-        files_to_assemble = [argument_path]
-    for input_path in files_to_assemble:
-        filename, extension = os.path.splitext(input_path)
-        if extension.lower() != ".jack":
-            continue
-        output_path = filename + ".xml"
-        with open(input_path, 'r') as input_file, \
-                open(output_path, 'w') as output_file:
-            analyze_file(input_file, output_file)
+        worker = functools.partial(
+            analyze_path_with_statistics if arguments.pass_stats
+            else analyze_path, cache=cache, **output_options)
+    failures = 0
+    records = []
+    if arguments.io_threads > 0 and not arguments.profile and \
+            not arguments.pass_stats and not arguments.binary and \
+            not arguments.validate:
+        results = analyze_paths_pipelined(
+            files_to_assemble, jobs, arguments.io_threads, cache,
+            tokens_only=arguments.tokens, iterative=arguments.iterative,
+            vm=arguments.vm, optimization=arguments.optimization,
+            json_lines=arguments.json_lines)
+    else:
+        results = analyze_paths(files_to_assemble, jobs, worker)
+    for input_path, result in zip(files_to_assemble, results):
+        if arguments.profile or arguments.pass_stats:
+            records.append(result)
+            error = result["error"]
+        else:
+            error = result
+        if error is not None:
+            failures += 1
+            print(f"{input_path}: {error}", file=sys.stderr)
+    if cache is not None:
+        cache.prune()
+    if arguments.pass_stats:
+        totals = {}
+        for record in records:
+            for statistics in record["passes"]:
+                total = totals.setdefault(
+                    statistics["pass"], dict.fromkeys(
+                        ("rewrites", "before", "after"), 0))
+                for counter in total:
+                    total[counter] += statistics[counter]
+        print(f"{'pass':<20}{'rewrites':>10}{'lines before':>14}"
+              f"{'lines after':>13}{'shrank':>9}", file=sys.stderr)
+        for name, total in totals.items():
+            shrank = 1 - total["after"] / total["before"] \
+                if total["before"] else 0
+            print(f"{name:<20}{total['rewrites']:>10}{total['before']:>14}"
+                  f"{total['after']:>13}{shrank:>9.1%}", file=sys.stderr)
+    if arguments.profile:
+        Profiler.write_report(records, arguments.profile)
+        Profiler.dump_slowest(
+            records, arguments.profile_slowest,
+            os.path.dirname(os.path.abspath(arguments.profile)),
+            functools.partial(analyze_path, **output_options),
+            argument_path if os.path.isdir(argument_path)
+            else os.path.dirname(argument_path))
+    if watcher is not None:
+        # analyze changes in this process, one file after the other, so the
+        # analyzer stays loaded and warm between saves
+        print(f"watching {argument_path} for changes", file=sys.stderr)
+        try:
+            for changed_paths in watcher.changes():
+                failures = 0
+                for input_path in changed_paths:
+                    error = worker(input_path)
+                    if error is not None:
+                        failures += 1
+                        print(f"{input_path}: {error}", file=sys.stderr)
+                print(f"analyzed {len(changed_paths)} changed files, "
+                      f"{failures} failed", file=sys.stderr)
+                if cache is not None:
+                    cache.prune()
+        except KeyboardInterrupt:
+            pass
+    elif failures:
+        sys.exit(f"{failures} of {len(files_to_assemble)} files failed")
@@ -0,0 +1,119 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import errno
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+import typing
+
+SOCKET_NAME = "jackanalyzer.sock"
+USER_ID = os.getuid() if hasattr(os, 'getuid') else 0
+# Where the socket goes when there is no $XDG_RUNTIME_DIR: a directory of the
+# shared temporary directory that only this user may enter, so no one else
+# can put a socket of their own where the client looks for the server's.
+PRIVATE_DIRECTORY = os.path.join(tempfile.gettempdir(),
+                                 f"jackanalyzer-{USER_ID}")
+
+
+def socket_path() -> str:
+    """Where the analyzer server listens: $JACK_ANALYZER_SOCKET if set,
+    otherwise in the user's $XDG_RUNTIME_DIR, or else in PRIVATE_DIRECTORY.
+    """
+    if os.environ.get("JACK_ANALYZER_SOCKET"):
+        return os.environ["JACK_ANALYZER_SOCKET"]
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR")
+    return os.path.join(runtime_directory or PRIVATE_DIRECTORY, SOCKET_NAME)
+
+
+def make_private_directory(path: str) -> None:
+    """Creates a directory only this user may access, unless it exists.
+
+    Raises:
+        PermissionError: if the path exists but is not a directory of this
+            user's that no one else may access (e.g. someone else made it
+            first).
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    status = os.lstat(path)
+    if not stat.S_ISDIR(status.st_mode) or status.st_uid != USER_ID or \
+            status.st_mode & 0o077:
+        raise PermissionError(errno.EACCES,
+                              "not a private directory of this user", path)
+
+
+def check_owner(path: str) -> None:
+    """Makes sure a socket belongs to this user before connecting to it.
+
+    Raises:
+        PermissionError: if it belongs to someone else.
+        OSError: if it does not exist.
+    """
+    if os.stat(path).st_uid != USER_ID:
+        raise PermissionError(errno.EACCES,
+                              "the socket belongs to another user", path)
+
+
+def request(message: dict, path: typing.Optional[str] = None) -> dict:
+    """Sends one request to a running analyzer server and returns its reply.
+
+    Args:
+        message (dict): the request, see JackAnalyzerServer.handle_request.
+        path (typing.Optional[str]): the server's socket, by default
+            socket_path().
+
+    Returns:
+        dict: the server's reply.
+
+    Raises:
+        OSError: if no server is listening, or if the socket belongs to
+            another user (PermissionError).
+        ValueError: if the server closed the connection without a reply.
+    """
+    path = path or socket_path()
+    check_owner(path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        connection.sendall(json.dumps(message).encode() + b"\n")
+        reply = bytearray()
+        while not reply.endswith(b"\n"):
+            chunk = connection.recv(1 << 16)
+            if not chunk:
+                break
+            reply += chunk
+    return json.loads(reply)
+
+
+if "__main__" == __name__:
+    # A thin stand-in for JackAnalyzer.py: it hands the input path to a
+    # running JackAnalyzerServer, so the analyzer modules are never imported
+    # here. If no server is running, it runs JackAnalyzer.py instead.
+    arguments = sys.argv[1:]
+    paths = [argument for argument in arguments if not argument.startswith("-")]
+    if len(paths) != 1 or set(arguments) - set(paths) - {"--tokens"}:
+        # options only JackAnalyzer.py understands
+        reply = None
+    else:
+        try:
+            reply = request({"path": os.path.abspath(paths[0]),
+                             "tokens": "--tokens" in arguments})
+        except (OSError, ValueError):
+            reply = None
+    if reply is None:
+        analyzer = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "JackAnalyzer.py")
+        os.execv(sys.executable, [sys.executable, analyzer] + arguments)
+    for input_path, error in reply["errors"]:
+        print(f"{input_path}: {error}", file=sys.stderr)
+    if reply["errors"]:
+        sys.exit(f"{len(reply['errors'])} of {reply['files']} files failed")
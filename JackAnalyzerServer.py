@@ -0,0 +1,167 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import errno
+import functools
+import json
+import os
+import signal
+import socket
+import sys
+import typing
+
+from AnalysisCache import AnalysisCache
+import JackAnalyzer
+from JackAnalyzerClient import (PRIVATE_DIRECTORY, make_private_directory,
+                                socket_path)
+
+# The longest request line accepted, i.e. roughly the largest source buffer.
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+def handle_request(message: dict) -> dict:
+    """Serves one request.
+
+    Args:
+        message (dict): either {"path": ...} to analyze a .jack file, or every
+            .jack file in a directory, into .xml files next to them, exactly
+            like JackAnalyzer.py does; or {"source": ...} to analyze a source
+            buffer. Either may add "tokens": true to only tokenize, like
+            --tokens.
+
+    Returns:
+        dict: for a path, {"files": how many files were analyzed, "errors":
+        a [file, error] pair per failed file}. For a source, {"xml": ...,
+        "error": None} or {"xml": None, "error": ...}.
+    """
+    tokens_only = bool(message.get("tokens"))
+    if "source" in message:
+        try:
+            return {"xml": JackAnalyzer.analyze_source(message["source"],
+                                                       tokens_only),
+                    "error": None}
+        except Exception as error:
+            return {"xml": None, "error": f"{type(error).__name__}: {error}"}
+    argument_path = os.path.abspath(message["path"])
+    input_paths = JackAnalyzer.list_jack_files(argument_path)
+    cache = cache_for(argument_path)
+    errors = []
+    for input_path in input_paths:
+        error = JackAnalyzer.analyze_path(input_path, cache,
+                                          tokens_only=tokens_only)
+        if error is not None:
+            errors.append([input_path, error])
+    cache.prune()
+    return {"files": len(input_paths), "errors": errors}
+
+
+@functools.lru_cache(maxsize=None)
+def cache_for(argument_path: str) -> AnalysisCache:
+    """Returns the cache JackAnalyzer.py uses for an input path. It is made
+    once per path, so the analyzer's fingerprint is not hashed again for
+    every request.
+    """
+    return JackAnalyzer.default_cache(argument_path)
+
+
+def is_listening(path: str) -> bool:
+    """Tells whether a server accepts connections on a socket."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        try:
+            connection.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+class AnalyzerServer:
+    """Serves analysis requests over a Unix domain socket.
+
+    Each request is a line of JSON and gets a line of JSON back, see
+    handle_request; a connection may send any number of them. Requests are
+    analyzed on a thread pool, so several clients are served at once, and
+    the analyzer modules stay imported and warm between requests.
+    """
+
+    def __init__(self, path: str, workers: typing.Optional[int] = None) -> None:
+        """
+        :param path: The socket to listen on.
+        :param workers: How many requests to analyze at once.
+        """
+        self.path = path
+        self.executor = concurrent.futures.ThreadPoolExecutor(workers)
+
+    async def serve_connection(self, reader: asyncio.StreamReader,
+                               writer: asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    reply = await loop.run_in_executor(
+                        self.executor, handle_request, message)
+                except (ValueError, KeyError, TypeError) as error:
+                    reply = {"error": f"bad request: {error}"}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        """Serves requests until the process is interrupted or terminated.
+
+        Raises:
+            OSError: if another server is already listening on the socket,
+                or if the socket's default directory, PRIVATE_DIRECTORY,
+                belongs to another user (PermissionError).
+        """
+        if os.path.dirname(os.path.abspath(self.path)) == PRIVATE_DIRECTORY:
+            make_private_directory(PRIVATE_DIRECTORY)
+        if os.path.exists(self.path):
+            if is_listening(self.path):
+                raise OSError(errno.EADDRINUSE,
+                              "a server is already listening", self.path)
+            os.remove(self.path)  # left behind by a server that was killed
+        server = await asyncio.start_unix_server(
+            self.serve_connection, self.path, limit=MAX_REQUEST_BYTES)
+        stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signal_number, stopped.set)
+        try:
+            async with server:
+                await stopped.wait()
+        finally:
+            self.executor.shutdown(wait=False)
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Keeps the Jack analyzer loaded and serves analysis "
+                    "requests from JackAnalyzerClient over a Unix socket.")
+    parser.add_argument("--socket", default=socket_path(),
+                        help="the socket to listen on (default: "
+                             "$JACK_ANALYZER_SOCKET, or jackanalyzer.sock in "
+                             "$XDG_RUNTIME_DIR or in a private directory of "
+                             "the temporary directory; now %(default)s)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="how many requests to analyze at once")
+    arguments = parser.parse_args()
+    try:
+        asyncio.run(AnalyzerServer(arguments.socket, arguments.jobs).serve())
+    except OSError as error:
+        sys.exit(f"JackAnalyzerServer: {error}")
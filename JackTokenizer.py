@@ -5,8 +5,212 @@ was written by Aviv Yaish. It is an extension to the specifications given
 as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
+import bisect
+import mmap
+import os
 import typing
 import re
+import sys
+from array import array
+
+KEYWORDS = frozenset({
+    'class', 'constructor', 'function', 'method', 'field',
+    'static', 'var', 'int', 'char', 'boolean', 'void', 'true',
+    'false', 'null', 'this', 'let', 'do', 'if', 'else',
+    'while', 'return'
+})
+SYMBOLS = frozenset('(){}[].,;+-*/&|<>=~^#')
+SYMBOL_ESCAPES = {'<': '&lt;', '>': '&gt;', '"': '&quot;', '&': '&amp;'}
+
+# Token kind codes, as stored in JackTokenizer.token_kinds. Each code is the
+# number of the TOKEN_PATTERN group that matches that kind of token, and
+# TOKEN_TYPES maps it to the name returned by JackTokenizer.token_type().
+KEYWORD, SYMBOL, INT_CONST, STRING_CONST, IDENTIFIER = range(1, 6)
+TOKEN_TYPES = (None, "KEYWORD", "SYMBOL", "INT_CONST", "STRING_CONST",
+               "IDENTIFIER")
+
+# A single pattern both skips everything before a token and classifies the
+# token itself: at most one of the numbered groups takes part in a match, so
+# match.lastindex is the kind code of the token (None when only whitespace,
+# comments or a stray character were matched).
+_TOKEN_REGEX = (
+    r'(?:\s+|//[^\n]*|/\*.*?\*/)*'      # 0. Whitespace and the three comment formats: skipped
+    r'(?:((?:' + '|'.join(sorted(KEYWORDS)) + r')(?!\w))'  # 1. Keyword: a whole word only
+    r'|([(){}\[\].,;+\-*/&|<>=~^#])'    # 2. Symbol: Matches any of the required symbols
+    r'|(\d+(?!\w))'                     # 3. Integer Constant: digits only
+    r'|("[^"\n]*")'                     # 4. String Constant: Starts with ", captures anything but " or \n, ends with "
+    r'|(\w+)'                           # 5. Identifier (letters, digits, underscore)
+    r'|.)?')                            # Any other character is not part of a token
+TOKEN_PATTERN = re.compile(_TOKEN_REGEX, re.DOTALL)
+# The same pattern over raw UTF-8 bytes, for memory-mapped sources. Jack
+# keywords, symbols and identifiers are ASCII, so only the contents of
+# string constants can hold multi-byte characters.
+BYTES_TOKEN_PATTERN = re.compile(_TOKEN_REGEX.encode(), re.DOTALL)
+# Keywords and symbols as str, so mapped sources don't decode them per token.
+_DECODED_TERMINALS = {text.encode(): text for text in KEYWORDS | SYMBOLS}
+
+# How many characters the streaming mode reads from the input at a time.
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Finds the line breaks of a source, for JackTokenizer.position().
+_NEWLINE_PATTERN = re.compile(r'\n')
+# Token offsets are kept as their low 16 bits; the high bits are the number
+# of the window of this many characters the token starts in.
+OFFSET_WINDOW_BITS = 16
+# The bytes of the low 16 bits within each 32 bit item of an array('I').
+_LOW_BYTES = (0, 1) if sys.byteorder == "little" else (2, 3)
+
+
+def _split_offsets(offsets: array) -> typing.Tuple[array, array]:
+    """Compacts an increasing array('I') of offsets: returns the low
+    OFFSET_WINDOW_BITS bits of each offset, as an array('H'), and the index
+    of the first offset in each window, as an array('I'). Both are built
+    from whole-array slices, never looping over the offsets in Python.
+    """
+    data = offsets.tobytes()
+    low_data = bytearray(len(data) // 2)
+    low_data[0::2] = data[_LOW_BYTES[0]::4]
+    low_data[1::2] = data[_LOW_BYTES[1]::4]
+    low = array('H')
+    low.frombytes(low_data)
+    last_window = offsets[-1] >> OFFSET_WINDOW_BITS if offsets else 0
+    windows = array('I', (
+        bisect.bisect_left(offsets, window << OFFSET_WINDOW_BITS)
+        for window in range(last_window + 1)))
+    return low, windows
+
+
+class _TokenIds(dict):
+    """Maps token texts to their IDs in an InternPool, numbering new texts
+    as they are looked up.
+    """
+
+    def __init__(self, texts: typing.List[str]) -> None:
+        super().__init__()
+        self.texts = texts
+
+    def __missing__(self, text: str) -> int:
+        token_id = self[text] = len(self.texts)
+        self.texts.append(text)
+        return token_id
+
+
+class InternPool:
+    """Shares token texts between the tokenizers of a batch of files.
+
+    Every distinct text gets a single str object and a small integer ID,
+    numbered in the order the texts were first seen (the keywords and
+    symbols come first). Tokenizers given the same pool hand out the same
+    object for every occurrence of an identifier such as Array or length in
+    any file, instead of one per occurrence, so tokens and parse trees that
+    are kept for many files at once share their texts. The pool keeps every
+    text it was given until it is dropped itself, so it is meant for one
+    batch, not for the lifetime of a process (unlike sys.intern).
+    """
+
+    def __init__(self) -> None:
+        # texts[token_id] is the shared text of an ID
+        self.texts = []
+        # the ID of every text in the pool
+        self.ids = _TokenIds(self.texts)
+        for text in sorted(KEYWORDS) + sorted(SYMBOLS):
+            self.ids[text]
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def intern(self, text: str) -> str:
+        """
+        Args:
+            text (str): a token text.
+
+        Returns:
+            str: the pool's object for the text, which is added to the pool
+            if it is new.
+        """
+        return self.texts[self.ids[text]]
+
+    def intern_all(self, texts: typing.Iterable[str]) -> typing.List[str]:
+        """Like intern, for many texts at once; only texts that are new to
+        the pool cost a Python call.
+        """
+        return list(map(self.texts.__getitem__, map(self.ids.__getitem__,
+                                                    texts)))
+
+    def id_array(self, texts: typing.Iterable[str]) -> array:
+        """
+        Args:
+            texts (typing.Iterable[str]): token texts.
+
+        Returns:
+            array: the ID of each text, as an array('I'), adding the texts
+            that are new to the pool.
+        """
+        return array('I', map(self.ids.__getitem__, texts))
+
+    def intern_tokens(self, lexer: typing.Iterator[typing.Tuple[str, int]]
+                      ) -> typing.Iterator[typing.Tuple[str, int]]:
+        """Interns the texts of the (text, kind code) pairs a lexer yields,
+        as they are yielded.
+        """
+        texts, ids = self.texts, self.ids
+        for text, kind in lexer:
+            yield texts[ids[text]], kind
+
+
+def _lex_stream(input_stream: typing.TextIO,
+                chunk_size: int) -> typing.Iterator[typing.Tuple[str, int]]:
+    """Lazily yields the tokens of an input stream and their kind codes,
+    reading the input in chunks.
+
+    Only complete lines are matched, since apart from block comments no
+    lexeme can span a newline. A block comment that is still open at the end
+    of the buffered lines makes us read more input before going on.
+
+    Args:
+        input_stream (typing.TextIO): input stream.
+        chunk_size (int): how many characters to read at a time.
+    """
+    buffer = ""
+    position = 0
+    while True:
+        chunk = input_stream.read(chunk_size)
+        at_eof = not chunk
+        buffer = buffer[position:] + chunk
+        end = len(buffer) if at_eof else buffer.rfind("\n") + 1
+        position = end
+        for match in TOKEN_PATTERN.finditer(buffer, 0, end):
+            group = match.lastindex
+            if group == SYMBOL and not at_eof and \
+                    buffer.startswith("/*", match.start(SYMBOL)):
+                # the comment's closing */ was not read yet
+                position = match.start(SYMBOL)
+                break
+            if group:
+                yield match.group(group), group
+        if at_eof:
+            return
+
+
+def _lex_mapped(path: str) -> typing.Iterator[typing.Tuple[str, int]]:
+    """Lazily yields the tokens of a file and their kind codes, matching the
+    file through a read-only memory mapping. The file is never decoded as a
+    whole: only the bytes of each token are turned into a str.
+
+    Args:
+        path (str): the file to tokenize.
+    """
+    with open(path, 'rb') as input_file:
+        if os.fstat(input_file.fileno()).st_size == 0:
+            return  # empty files cannot be mapped
+        mapping = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+    # the mapping is released once this generator and its matches are gone
+    for match in BYTES_TOKEN_PATTERN.finditer(mapping):
+        group = match.lastindex
+        if group == KEYWORD or group == SYMBOL:
+            yield _DECODED_TERMINALS[match.group(group)], group
+        elif group:
+            yield match.group(group).decode(), group
 
 
 class JackTokenizer:
@@ -93,42 +297,135 @@ class JackTokenizer:
     Note that ^, # correspond to shiftleft and shiftright, respectively.
     """
 
-    def __init__(self, input_stream: typing.TextIO) -> None:
+    def __init__(self, input_stream: typing.TextIO,
+                 streaming: bool = False,
+                 pool: typing.Optional[InternPool] = None,
+                 token_ids: bool = False) -> None:
         """Opens the input stream and gets ready to tokenize it.
 
         Args:
             input_stream (typing.TextIO): input stream.
+            streaming (bool): if True, the input is read and tokenized lazily,
+                one chunk at a time, instead of being read whole up front.
+                Only the current token and a single look-ahead token are kept
+                in memory, so self.tokens, self.token_kinds and the positions
+                of tokens are not available in this mode.
+            pool (typing.Optional[InternPool]): if given, every token text
+                is the pool's shared object for it, as are the texts the
+                tokenizer hands out.
+            token_ids (bool): with a pool, and when the whole input is read
+                up front, keep the tokens as their IDs in the pool, in
+                self.token_ids (an array('I')), instead of as texts in
+                self.tokens, which is then None. The tokenizer still hands
+                out texts.
+        """
+        self._offsets = None
+        self.token_ids = None
+        if streaming:
+            self.tokens = None
+            self.token_kinds = None
+            self._lexer = _lex_stream(input_stream, STREAM_CHUNK_SIZE)
+            if pool is not None:
+                self._lexer = pool.intern_tokens(self._lexer)
+        else:
+            # one pass over the whole text: comments and whitespace are
+            # matched by the pattern itself and simply produce no token, so
+            # the offset of every token is its offset in the original text
+            text = input_stream.read()
+            self.tokens = []
+            self.token_kinds = array('B')
+            offsets = array('I')
+            append_token = self.tokens.append
+            append_kind = self.token_kinds.append
+            append_offset = offsets.append
+            for match in TOKEN_PATTERN.finditer(text):
+                group = match.lastindex
+                if group:
+                    append_token(match.group(group))
+                    append_kind(group)
+                    append_offset(match.start(group))
+            # two bytes per token instead of four
+            self._offsets, self._offset_windows = _split_offsets(offsets)
+            # where each line starts: far fewer entries than tokens, and
+            # all position() needs to keep of the text
+            self._line_starts = array('I', [0])
+            self._line_starts.extend(
+                match.end() for match in _NEWLINE_PATTERN.finditer(text))
+            if pool is not None and token_ids:
+                self.token_ids = pool.id_array(self.tokens)
+                self.tokens = None
+                self._lexer = zip(map(pool.texts.__getitem__, self.token_ids),
+                                  self.token_kinds)
+            else:
+                if pool is not None:
+                    self.tokens = pool.intern_all(self.tokens)
+                self._lexer = zip(self.tokens, self.token_kinds)
+        self._start()
+
+    @classmethod
+    def memory_mapped(cls, path: str,
+                      pool: typing.Optional[InternPool] = None
+                      ) -> "JackTokenizer":
+        """Tokenizes a file through a memory mapping instead of a stream.
+
+        The lexing pattern runs directly over the mapped bytes, so the
+        operating system pages the file in as it is read and no decoded copy
+        of it is ever made; each token is decoded only when advance() reaches
+        it. As in streaming mode, self.tokens and self.token_kinds are not
+        available.
+
+        Args:
+            path (str): the file to tokenize, encoded as UTF-8.
+            pool (typing.Optional[InternPool]): if given, the texts handed
+                out are the pool's shared objects.
+
+        Returns:
+            JackTokenizer: a tokenizer over the file.
+        """
+        tokenizer = cls.__new__(cls)
+        tokenizer.tokens = None
+        tokenizer.token_kinds = None
+        tokenizer._offsets = None
+        tokenizer.token_ids = None
+        tokenizer._lexer = _lex_mapped(path)
+        if pool is not None:
+            tokenizer._lexer = pool.intern_tokens(tokenizer._lexer)
+        tokenizer._start()
+        return tokenizer
+
+    @classmethod
+    def from_tokens(cls, tokens: typing.Iterable[str],
+                    token_kinds: typing.Iterable[int]) -> "JackTokenizer":
+        """Hands out tokens that were already lexed, e.g. a slice of the
+        tokens of another tokenizer, instead of lexing an input stream.
+
+        Args:
+            tokens (typing.Iterable[str]): the tokens, in order.
+            token_kinds (typing.Iterable[int]): the kind code of each token.
+
+        Returns:
+            JackTokenizer: a tokenizer over the tokens. self.tokens,
+            self.token_kinds and the positions of tokens are not available.
         """
-        TOKEN_PATTERN = re.compile(
-            r'"[^"\n]*"'                # 1. String Constant: Starts with ", captures anything but " or \n, ends with "
-            r'|[(){}\[\].,;+\-*/&|<>=~^#]'                # 2. Symbol: Matches any of the required symbols
-            r'|\w+'               # 3. Identifiers, Keywords, Integer Constants (letters, digits, underscore)
-        )
-        # remove comment_starters = ["//", "/*", "/**"]
-        input_text = input_stream.read()
-        input_text = re.sub(r"/\*\*?.*?\*/", "", input_text, flags=re.DOTALL)
-        input_text = re.sub(r"//.*", "", input_text)
-
-        # spilt to lines
-        input_lines = input_text.splitlines()
+        tokenizer = cls.__new__(cls)
+        tokenizer.tokens = None
+        tokenizer.token_kinds = None
+        tokenizer._offsets = None
+        tokenizer.token_ids = None
+        tokenizer._lexer = zip(tokens, token_kinds)
+        tokenizer._start()
+        return tokenizer
+
+    def _start(self) -> None:
+        """Gets ready to hand out the tokens of self._lexer."""
         self.current_token_index = 0
         self.current_token = None
-        self.tokens = []
-        # temp list of the tokens
-        all_tokens = []
-
-        for line in input_lines:
-            comment_index = line.find("//")
-            if comment_index != -1:
-                # if its -1 the index will not be ''//''
-                # cut the comment ("//")
-                line = line[:comment_index]
-            line = line.strip()
-            if line:
-                # separate lines to tokens
-                tokens_on_line = TOKEN_PATTERN.findall(line)
-                all_tokens.extend(tokens_on_line)
-        self.tokens = all_tokens
+        # kind code of the current token, classified once at lex time
+        self.current_kind = None
+        # the token that the next advance() will make current
+        self._next_token = next(self._lexer, None)
+        # whether advance() went past the last token
+        self._ended = False
 
     def has_more_tokens(self) -> bool:
         """Do we have more tokens in the input?
@@ -136,16 +433,78 @@ class JackTokenizer:
         Returns:
             bool: True if there are more tokens, False otherwise.
         """
-        return self.current_token_index < len(self.tokens)
+        return self._next_token is not None
 
     def advance(self) -> None:
         """Gets the next token from the input and makes it the current token. 
         This method should be called if has_more_tokens() is true. 
         Initially there is no current token.
+
+        Past the last token, the current token becomes "", of no kind, which
+        matches nothing the engine looks for and is not counted in
+        current_token_index; a complete parse ends there. Advancing past it
+        means the input ended in the middle of a construct: rather than let
+        the engine wait forever for the rest of it, a ValueError is raised.
+        """
+        if self._next_token is not None:
+            self.current_token, self.current_kind = self._next_token
+            self.current_token_index += 1
+            self._next_token = next(self._lexer, None)
+        elif self._ended:
+            raise ValueError("Unexpected end of input")
+        else:
+            self.current_token, self.current_kind = "", 0
+            self._ended = True
+
+    def __iter__(self) -> typing.Iterator[typing.Tuple[str, int]]:
+        """Yields every token that advance() has not reached yet with its
+        kind code, without making any of them the current token. This is
+        the cheapest way to run through the tokens when no parsing is done.
         """
-        if self.has_more_tokens():
-            self.current_token = self.tokens[self.current_token_index]
+        while self._next_token is not None:
+            yield self._next_token
             self.current_token_index += 1
+            self._next_token = next(self._lexer, None)
+
+    def offset(self, index: typing.Optional[int] = None) -> int:
+        """Finds where a token starts in the source.
+
+        Args:
+            index (typing.Optional[int]): the index of the token in
+                self.tokens; the current token if not given.
+
+        Returns:
+            int: the offset of the token's first character in the source, in
+            characters. Only available when the whole input was read up
+            front (not in streaming or memory-mapped mode, nor with
+            from_tokens).
+        """
+        if self._offsets is None:
+            raise ValueError("Token positions are only recorded when the "
+                             "whole input is read up front")
+        if index is None:
+            index = self.current_token_index - 1
+        window = bisect.bisect_right(self._offset_windows, index) - 1
+        return window << OFFSET_WINDOW_BITS | self._offsets[index]
+
+    def position(self, index: typing.Optional[int] = None
+                 ) -> typing.Tuple[int, int]:
+        """Finds the line and the column a token starts at. Only the offset
+        of each token is recorded while lexing; its line and column are
+        looked up here, on demand.
+
+        Args:
+            index (typing.Optional[int]): the index of the token in
+                self.tokens; the current token if not given.
+
+        Returns:
+            typing.Tuple[int, int]: the line and the column of the token's
+            first character, both counted from 1, with columns in
+            characters. Available when offset() is.
+        """
+        offset = self.offset(index)
+        line = bisect.bisect_right(self._line_starts, offset)
+        return line, offset - self._line_starts[line - 1] + 1
 
     def token_type(self) -> str:
         """
@@ -153,25 +512,7 @@ class JackTokenizer:
             str: the type of the current token, can be
             "KEYWORD", "SYMBOL", "IDENTIFIER", "INT_CONST", "STRING_CONST"
         """
-        KEYWORD_SET = {
-            'class', 'constructor', 'function', 'method', 'field',
-            'static', 'var', 'int', 'char', 'boolean', 'void', 'true',
-            'false', 'null', 'this', 'let', 'do', 'if', 'else',
-            'while', 'return'
-        }
-        SYMBOL_SET = {
-            '{', '}', '(', ')', '[', ']', '.', ',', ';', '+',
-            '-', '*', '/', '&', '|', '<', '>', '=', '~', '^', '#'
-        }
-        if self.current_token in KEYWORD_SET:
-            return 'KEYWORD'
-        if self.current_token in SYMBOL_SET:
-            return 'SYMBOL'
-        if self.current_token.isdigit():
-            return 'INT_CONST'
-        if self.current_token[0] == '"' and self.current_token[-1] == '"':
-            return 'STRING_CONST'
-        return 'IDENTIFIER'
+        return TOKEN_TYPES[self.current_kind]
 
     def keyword(self) -> str:
         """
@@ -182,7 +523,7 @@ class JackTokenizer:
             "BOOLEAN", "CHAR", "VOID", "VAR", "STATIC", "FIELD", "LET", "DO", 
             "IF", "ELSE", "WHILE", "RETURN", "TRUE", "FALSE", "NULL", "THIS"
         """
-        if self.token_type() == 'KEYWORD':
+        if self.current_kind == KEYWORD:
             return self.current_token
         else:
             raise ValueError(f"Keyword method called on non-KEYWORD token: {self.current_token}")
@@ -196,17 +537,8 @@ class JackTokenizer:
             symbol: '{' | '}' | '(' | ')' | '[' | ']' | '.' | ',' | ';' | '+' | 
               '-' | '*' | '/' | '&' | '|' | '<' | '>' | '=' | '~' | '^' | '#'
         """
-        if self.token_type() == 'SYMBOL':
-            if self.current_token == '<':
-                return '&lt;'
-            elif self.current_token == '>':
-                return '&gt;'
-            elif self.current_token == '"':
-                return '&quot;'
-            elif self.current_token == "&":
-                return '&amp;'
-            else:
-                return self.current_token
+        if self.current_kind == SYMBOL:
+            return SYMBOL_ESCAPES.get(self.current_token, self.current_token)
         else:
             raise ValueError(f"Symbol method called on non-Symbol token: {self.current_token}")
 
@@ -220,7 +552,7 @@ class JackTokenizer:
                   starting with a digit. You can assume keywords cannot be
                   identifiers, so 'self' cannot be an identifier, etc.'.
         """
-        if self.token_type() == 'IDENTIFIER':
+        if self.current_kind == IDENTIFIER:
             return self.current_token
         else:
             raise ValueError(f"Identifier method called on non-IDENTIFIER token: {self.current_token}")
@@ -233,7 +565,7 @@ class JackTokenizer:
             Recall that integerConstant was defined in the grammar like so:
             integerConstant: A decimal number in the range 0-32767.
         """
-        if self.token_type() == 'INT_CONST':
+        if self.current_kind == INT_CONST:
             return int(self.current_token)
         else:
             raise ValueError(f"Integer value method called on non-INT_CONST token: {self.current_token}")
@@ -247,7 +579,7 @@ class JackTokenizer:
             StringConstant: '"' A sequence of Unicode characters not including 
                       double quote or newline '"'
         """
-        if self.token_type() == 'STRING_CONST':
+        if self.current_kind == STRING_CONST:
             string_token = self.current_token[1:-1]
             return string_token
         else:
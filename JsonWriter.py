@@ -0,0 +1,76 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import json.encoder
+import typing
+
+from JackTokenizer import KEYWORDS, SYMBOLS
+from ParseHandler import ParseHandler
+from XmlWriter import FLUSH_LINES
+
+# The complete JSON object of every keyword and symbol.
+TERMINAL_OBJECTS = {
+    **{("keyword", keyword): f'{{"kind":"keyword","text":"{keyword}"}}'
+       for keyword in KEYWORDS},
+    **{("symbol", symbol): '{"kind":"symbol","text":%s}'
+       % json.encoder.encode_basestring(symbol) for symbol in SYMBOLS},
+}
+
+
+class JsonWriter(ParseHandler):
+    """Emits the parsed structure of a Jack program as JSON Lines: every
+    class becomes one line holding a JSON object. A non-terminal is written
+    as {"rule": "letStatement", "children": [...]} and a terminal as
+    {"kind": "symbol", "text": "<"}, with the text unescaped as in the
+    source; there is no whitespace between the parts.
+
+    Like the XmlWriter, it collects the parts and writes them out in large
+    blocks, when the outermost rule ends or enough were collected.
+    """
+
+    def __init__(self, output_stream: typing.TextIO) -> None:
+        """
+        :param output_stream: The output stream.
+        """
+        self.output_file = output_stream
+        self.depth = 0
+        self._parts = []
+        # whether the next element is the first child of its rule, and so
+        # needs no comma before it
+        self._first = True
+
+    def start(self, rule: str) -> None:
+        self._parts.append(f'{{"rule":"{rule}","children":[' if self._first
+                           else f',{{"rule":"{rule}","children":[')
+        self._first = True
+        self.depth += 1
+
+    def end(self, rule: str) -> None:
+        self.depth -= 1
+        if self.depth == 0:
+            self._parts.append("]}\n")
+            self._first = True
+            self.flush()
+        else:
+            self._parts.append("]}")
+            self._first = False
+            if len(self._parts) >= FLUSH_LINES:
+                self.flush()
+
+    def terminal(self, kind: str, text: str) -> None:
+        part = TERMINAL_OBJECTS.get((kind, text))
+        if part is None:
+            part = f'{{"kind":"{kind}","text":' \
+                   f'{json.encoder.encode_basestring(text)}}}'
+        self._parts.append(part if self._first else "," + part)
+        self._first = False
+
+    def flush(self) -> None:
+        """Writes out everything collected so far."""
+        if self._parts:
+            self.output_file.write("".join(self._parts))
+            self._parts.clear()
@@ -0,0 +1,348 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import typing
+
+from ParseTree import Node, Terminal
+
+# The largest integerConstant, and the values a 16 bit word can hold.
+MAX_CONSTANT = 32767
+WORD = 1 << 16
+
+# A constant value: the integer it evaluates to on the Hack platform, and
+# whether it is a boolean (true is -1 and false is 0).
+Constant = typing.Tuple[int, bool]
+
+
+def _node(rule: str, children: list) -> Node:
+    node = Node(rule)
+    node.children = children
+    return node
+
+
+def _post_order(root: Node) -> typing.List[Node]:
+    """Returns the nodes of a tree with every node after its descendants,
+    without recursing, so deeply nested trees can be optimized.
+    """
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(child for child in node.children if type(child) is Node)
+    order.reverse()
+    return order
+
+
+def _to_word(value: int) -> int:
+    """Wraps an integer around to a signed 16 bit value, as Hack does."""
+    value %= WORD
+    return value - WORD if value > MAX_CONSTANT else value
+
+
+def constant_value(term: Node) -> typing.Optional[Constant]:
+    """Returns the value of a term that is a constant, in one of the forms
+    the passes leave constants in: an integerConstant, 'true', 'false', or
+    '-' followed by an integerConstant term. Returns None for anything else.
+    """
+    children = term.children
+    first = children[0]
+    if len(children) == 1 and type(first) is Terminal:
+        if first.kind == "integerConstant":
+            return int(first.text), False
+        if first.kind == "keyword" and first.text in ("true", "false"):
+            return (-1 if first.text == "true" else 0), True
+    elif len(children) == 2 and type(first) is Terminal and \
+            first.text == "-":
+        operand = children[1].children
+        if len(operand) == 1 and operand[0].kind == "integerConstant":
+            return -int(operand[0].text), False
+    return None
+
+
+def constant_term(value: Constant) -> typing.Optional[Node]:
+    """Returns a term that evaluates to a constant, or None if the value
+    cannot be written as one (-32768, whose magnitude is not an
+    integerConstant).
+    """
+    number, is_boolean = value
+    if is_boolean and number in (-1, 0):
+        return _node("term", [Terminal("keyword",
+                                       "true" if number else "false")])
+    if number >= 0:
+        return _node("term", [Terminal("integerConstant", str(number))])
+    if number > -WORD // 2:
+        return _node("term", [
+            Terminal("symbol", "-"),
+            _node("term", [Terminal("integerConstant", str(-number))])])
+    return None
+
+
+def _divide(left: int, right: int) -> int:
+    """Divides like Math.divide, which rounds towards zero."""
+    quotient = abs(left) // abs(right)
+    return -quotient if (left < 0) != (right < 0) else quotient
+
+
+def _apply(op: str, left: Constant,
+           right: Constant) -> typing.Optional[Constant]:
+    (a, a_is_boolean), (b, b_is_boolean) = left, right
+    if op == "+":
+        return _to_word(a + b), False
+    if op == "-":
+        return _to_word(a - b), False
+    if op == "*":
+        return _to_word(a * b), False
+    if op == "/":
+        return (_to_word(_divide(a, b)), False) if b else None
+    if op == "&":
+        return a & b, a_is_boolean and b_is_boolean
+    if op == "|":
+        return a | b, a_is_boolean and b_is_boolean
+    if op == "<":
+        return -(a < b), True
+    if op == ">":
+        return -(a > b), True
+    if op == "=":
+        return -(a == b), True
+    return None
+
+
+def fold_constants(root: Node, level: int) -> int:
+    """Evaluates integer constant expressions at compile time.
+
+    A unary '-', '^' (shift left), '#' (shift right) or '~' applied to an
+    integer constant, a parenthesized constant and a run of constant terms
+    at the start of an expression are replaced by their value. Jack applies
+    ops left to right, so constants after a variable term are left alone.
+
+    :param root: The tree to optimize, in place.
+    :param level: The optimization level.
+    :return: How many constants were folded.
+    """
+    folded = 0
+    for node in _post_order(root):
+        if node.rule == "term":
+            children = node.children
+            first = children[0]
+            if type(first) is not Terminal or first.kind != "symbol":
+                continue
+            if first.text == "(":
+                inner = children[1].children
+                value = constant_value(inner[0]) if len(inner) == 1 else None
+            elif first.text in ("-", "^", "#", "~"):
+                value = constant_value(children[1])
+                if value is None or (first.text == "-" and not value[1]
+                                     and value[0] >= 0):
+                    continue  # already as folded as it gets, e.g. -5
+                if value[1] and first.text == "~":
+                    continue  # ~true and ~false are simplify_not's
+                number = value[0]
+                value = (_to_word({"-": -number, "^": number << 1,
+                                   "#": number >> 1, "~": ~number}
+                                  [first.text]), False)
+            else:
+                continue
+            replacement = constant_term(value) if value else None
+            if replacement is not None:
+                node.children = replacement.children
+                folded += 1
+        elif node.rule == "expression":
+            children = node.children
+            value = constant_value(children[0])
+            index = 1
+            # stop at the first op that can't be folded, e.g. / 0, keeping
+            # the value of the prefix before it
+            while value is not None and index < len(children):
+                operand = constant_value(children[index + 1])
+                if operand is None:
+                    break
+                next_value = _apply(children[index].text, value, operand)
+                if next_value is None:
+                    break
+                value = next_value
+                index += 2
+            if index > 1 and value is not None:
+                replacement = constant_term(value)
+                if replacement is not None:
+                    node.children[:index] = [replacement]
+                    folded += 1
+    return folded
+
+
+def simplify_not(root: Node, level: int) -> int:
+    """Replaces ~true with false and ~false with true.
+
+    :param root: The tree to optimize, in place.
+    :param level: The optimization level.
+    :return: How many negations were simplified.
+    """
+    simplified = 0
+    for node in _post_order(root):
+        if node.rule != "term" or len(node.children) != 2:
+            continue
+        first = node.children[0]
+        if type(first) is Terminal and first.text == "~":
+            value = constant_value(node.children[1])
+            if value is not None and value[1]:
+                node.children = constant_term((~value[0], True)).children
+                simplified += 1
+    return simplified
+
+
+def _condition(statement: Node) -> typing.Optional[int]:
+    """Returns the value of an if or while condition that is a constant."""
+    expression = statement.children[2].children
+    if len(expression) != 1:
+        return None
+    value = constant_value(expression[0])
+    return value[0] if value else None
+
+
+def remove_dead_branches(root: Node, level: int) -> int:
+    """Removes code that never runs: if (false) and while (false) bodies,
+    and the else branch of if (true). The remaining branch of an if with a
+    constant condition takes the if statement's place. A condition counts
+    as false when it is 0 and as true when it is -1 (true), as for the VM
+    code, which only runs an if branch when the condition is not 0 after
+    'not'.
+
+    :param root: The tree to optimize, in place.
+    :param level: The optimization level.
+    :return: How many statements were removed or replaced.
+    """
+    removed = 0
+    for node in _post_order(root):
+        if node.rule != "statements":
+            continue
+        statements = []
+        for statement in node.children:
+            rule = statement.rule
+            if rule == "whileStatement" and _condition(statement) == 0:
+                removed += 1
+                continue
+            if rule == "ifStatement" and len(statement.children) <= 11:
+                # 'if' '(' expression ')' '{' statements '}'
+                # ('else' '{' statements '}')?
+                condition = _condition(statement)
+                if condition == -1:
+                    statements.extend(statement.children[5].children)
+                    removed += 1
+                    continue
+                if condition == 0:
+                    if len(statement.children) == 11:
+                        statements.extend(statement.children[9].children)
+                    removed += 1
+                    continue
+            statements.append(statement)
+        node.children = statements
+    return removed
+
+
+def _power_of_two(term: Node) -> int:
+    """Returns k if a term is the constant 2^k, for k >= 1, and 0 if not."""
+    value = constant_value(term)
+    if value is None or value[1] or value[0] < 2 or value[0] & (value[0] - 1):
+        return 0
+    return value[0].bit_length() - 1
+
+
+def _shifted(operand: Node, op: str, times: int) -> Node:
+    """Returns a term applying a unary shift op to a term several times."""
+    for _ in range(times):
+        operand = _node("term", [Terminal("symbol", op), operand])
+    return operand
+
+
+def reduce_strength(root: Node, level: int) -> int:
+    """Replaces multiplication by a power of two, which costs a call to
+    Math.multiply, with shifts left ('^'). From level 3 on, division by a
+    power of two is also replaced with shifts right ('#'); that rounds
+    negative numbers down instead of towards zero like Math.divide, so it
+    is only right when the dividend is never negative.
+
+    :param root: The tree to optimize, in place.
+    :param level: The optimization level.
+    :return: How many multiplications and divisions were replaced.
+    """
+    reduced = 0
+    ops = {"*": "^", "/": "#"} if level >= 3 else {"*": "^"}
+    for node in _post_order(root):
+        if node.rule != "expression":
+            continue
+        children = node.children
+        index = 1
+        while index < len(children):
+            op = children[index].text
+            shift = ops.get(op)
+            times = _power_of_two(children[index + 1]) if shift else 0
+            if times:
+                if index == 1:
+                    operand = children[0]
+                else:
+                    # (op term)* applies left to right: everything before
+                    # the op is its left operand
+                    operand = _node("term", [
+                        Terminal("symbol", "("),
+                        _node("expression", children[:index]),
+                        Terminal("symbol", ")")])
+                children[:index + 2] = [_shifted(operand, shift, times)]
+                reduced += 1
+                index = 1
+            elif op == "*" and index == 1 and _power_of_two(children[0]):
+                # 2^k * term: the constant has no side effects to keep in
+                # order, so the operands can trade places
+                times = _power_of_two(children[0])
+                children[:3] = [_shifted(children[2], "^", times)]
+                reduced += 1
+            else:
+                index += 2
+    return reduced
+
+
+# The passes, in the order they run, with the lowest -O level each runs at.
+PASSES = (
+    ("fold-constants", fold_constants, 1),
+    ("simplify-not", simplify_not, 1),
+    ("dead-branches", remove_dead_branches, 2),
+    ("strength-reduction", reduce_strength, 2),
+)
+MAX_LEVEL = 3
+
+
+def optimize(classes: typing.List[Node], level: int,
+             measure: typing.Optional[typing.Callable[
+                 [typing.List[Node]], int]] = None) -> typing.List[dict]:
+    """Runs the passes of an optimization level over parse trees, in place.
+
+    Args:
+        classes (typing.List[Node]): the "class" nodes to optimize.
+        level (int): 0 runs no pass; 1 folds constants and simplifies
+            ~true and ~false; 2 also removes dead branches and replaces
+            multiplications by powers of two with shifts; 3 also replaces
+            divisions by powers of two with shifts.
+        measure (typing.Optional[typing.Callable]): if given, returns the
+            size of the output the trees compile to, e.g. how many VM
+            commands; it is called before the first pass and after each one.
+
+    Returns:
+        typing.List[dict]: for every pass that ran, its "pass" name, how
+        many "rewrites" it made and, with measure, the output size
+        "before" and "after" it.
+    """
+    statistics = []
+    size = measure(classes) if measure else None
+    for name, optimization_pass, lowest_level in PASSES:
+        if level < lowest_level:
+            continue
+        rewrites = sum(optimization_pass(node, level) for node in classes)
+        record = {"pass": name, "rewrites": rewrites}
+        if measure:
+            record["before"] = size
+            size = record["after"] = measure(classes)
+        statistics.append(record)
+    return statistics
@@ -0,0 +1,60 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+
+
+class ParseHandler:
+    """The events a CompilationEngine reports while it parses, in the style
+    of a SAX handler. The engine knows nothing about output formats: it
+    calls these methods of its writer, and the writer decides what to do
+    with them.
+
+    For every rule the engine calls start(rule), then reports the rule's
+    contents in source order, nested rules included, and then calls
+    end(rule). Every token of the source is reported as exactly one
+    terminal, in order. Implementations include XmlWriter, JsonWriter,
+    ParseTree.TreeBuilder, VMCodeGenerator and CountingHandler. The methods
+    here do nothing, so this class itself is a handler that ignores the
+    parse.
+    """
+
+    def start(self, rule: str) -> None:
+        """A non-terminal begins, e.g. start("letStatement").
+
+        :param rule: The grammar rule, named like its XML tag.
+        """
+
+    def end(self, rule: str) -> None:
+        """A non-terminal ends, e.g. end("letStatement").
+
+        :param rule: The grammar rule, as given to the matching start().
+        """
+
+    def terminal(self, kind: str, text: str) -> None:
+        """A token, e.g. terminal("symbol", "<").
+
+        :param kind: The terminal's tag: "keyword", "symbol", "identifier",
+            "integerConstant" or "stringConstant".
+        :param text: The token as it appears in the source (unescaped; the
+            contents of a string constant, without its quotes).
+        """
+
+
+class CountingHandler(ParseHandler):
+    """A handler that formats nothing and only counts what the engine
+    reports, for runs that just check that sources parse.
+    """
+
+    def __init__(self) -> None:
+        self.rules = 0
+        self.terminals = 0
+
+    def start(self, rule: str) -> None:
+        self.rules += 1
+
+    def terminal(self, kind: str, text: str) -> None:
+        self.terminals += 1
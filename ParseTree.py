@@ -0,0 +1,146 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import typing
+
+from CompilationEngine import CompilationEngine
+from JackTokenizer import InternPool, JackTokenizer
+from ParseHandler import ParseHandler
+from XmlWriter import XmlWriter
+
+
+class Terminal:
+    """A token in the parse tree, e.g. Terminal("symbol", "<")."""
+    __slots__ = ("kind", "text")
+
+    def __init__(self, kind: str, text: str) -> None:
+        """
+        :param kind: The terminal's tag: "keyword", "symbol", "identifier",
+            "integerConstant" or "stringConstant".
+        :param text: The token as it appears in the source (unescaped).
+        """
+        self.kind = kind
+        self.text = text
+
+    def __repr__(self) -> str:
+        return f"Terminal({self.kind!r}, {self.text!r})"
+
+
+class Node:
+    """A non-terminal in the parse tree, e.g. a letStatement, holding its
+    Terminal and Node children in source order.
+    """
+    __slots__ = ("rule", "children")
+
+    def __init__(self, rule: str) -> None:
+        """
+        :param rule: The grammar rule, named like its XML tag.
+        """
+        self.rule = rule
+        self.children = []
+
+    def __repr__(self) -> str:
+        return f"Node({self.rule!r}, {len(self.children)} children)"
+
+
+class TreeBuilder(ParseHandler):
+    """A CompilationEngine writer that builds a parse tree instead of
+    emitting XML. Each compiled class becomes a Node in self.classes.
+
+    Memory use, measured with tracemalloc over the Square and
+    ExpressionLessSquare samples and over SquareGame.jack repeated 300 times
+    (benchmarks/tree_memory.py runs both by default), is about 150 bytes
+    per token, including the token texts: a Terminal takes 48 bytes, and the
+    Nodes above the tokens and their children lists make up most of the
+    rest. Kinds and rule names are shared constants, so they cost nothing
+    per token.
+    """
+
+    def __init__(self, pool: typing.Optional[InternPool] = None) -> None:
+        """
+        :param pool: If given, the text of every terminal is the pool's
+            shared object for it, so trees built with the same pool share
+            their texts.
+        """
+        self.classes = []
+        self._stack = []
+        self._intern = pool.intern if pool is not None else None
+
+    def start(self, rule: str) -> None:
+        node = Node(rule)
+        if self._stack:
+            self._stack[-1].children.append(node)
+        else:
+            self.classes.append(node)
+        self._stack.append(node)
+
+    def end(self, rule: str) -> None:
+        self._stack.pop()
+
+    def terminal(self, kind: str, text: str) -> None:
+        if self._intern is not None:
+            text = self._intern(text)
+        self._stack[-1].children.append(Terminal(kind, text))
+
+
+def parse(input_stream: typing.TextIO,
+          pool: typing.Optional[InternPool] = None) -> typing.List[Node]:
+    """Parses Jack source into a parse tree per class.
+
+    Args:
+        input_stream (typing.TextIO): the source to parse.
+        pool (typing.Optional[InternPool]): if given, the texts of the tree's
+            terminals are shared with every other tree parsed with the pool.
+
+    Returns:
+        typing.List[Node]: the "class" node of every class in the source.
+    """
+    tokenizer = JackTokenizer(input_stream, streaming=True)
+    builder = TreeBuilder(pool)
+    engine = CompilationEngine(tokenizer, None, writer=builder)
+    engine.compile_classes()
+    return builder.classes
+
+
+def replay(node: Node, writer: ParseHandler) -> None:
+    """Walks a parse tree and emits it through a ParseHandler,
+    exactly as the engine would have while parsing it. The walk keeps its
+    own stack, so deep trees don't hit the recursion limit.
+
+    Args:
+        node (Node): the root of the tree to emit.
+        writer (ParseHandler): the handler to report the tree to, such as
+            an XmlWriter or a TreeBuilder.
+    """
+    writer.start(node.rule)
+    stack = [(node, iter(node.children))]
+    while stack:
+        parent, children = stack[-1]
+        for child in children:
+            if type(child) is Terminal:
+                writer.terminal(child.kind, child.text)
+            else:
+                writer.start(child.rule)
+                stack.append((child, iter(child.children)))
+                break
+        else:
+            stack.pop()
+            writer.end(parent.rule)
+
+
+def write_xml(node: Node, output_stream: typing.TextIO,
+              space_counter: int = 0) -> None:
+    """Writes a parse tree as the XML the CompilationEngine would write.
+
+    Args:
+        node (Node): the root of the tree to write.
+        output_stream (typing.TextIO): where to write the XML.
+        space_counter (int): how many spaces to indent each nesting level by.
+    """
+    writer = XmlWriter(output_stream, space_counter)
+    replay(node, writer)
+    writer.flush()
@@ -0,0 +1,210 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import collections
+import cProfile
+import csv
+import io
+import json
+import os
+import time
+import typing
+
+from AtomicFile import open_atomically
+from BinaryParseTree import BinaryTreeWriter
+from CompilationEngine import CompilationEngine
+from IterativeCompilationEngine import IterativeCompilationEngine
+from JackTokenizer import JackTokenizer
+from JsonWriter import JsonWriter
+import Optimizer
+from ParseTree import Node, TreeBuilder, replay, write_xml
+from VMCodeGenerator import VMCodeGenerator
+from XmlWriter import write_tokens
+
+# Comments are skipped by the lexing pattern itself, so there is no
+# separate comment-stripping phase to time: it is part of "lex".
+PHASES = ("read", "lex", "parse", "optimize", "emit", "write")
+
+# profile_path separates the phases that the analyzer interleaves, so its
+# timings describe a reordering of the usual work; the reports say so.
+APPROXIMATION_NOTE = (
+    "The phases are timed one after the other, while the analyzer streams "
+    "them into each other: the times approximate where the usual analysis "
+    "spends its time, and their total may differ from it. The counters are "
+    "exact.")
+
+
+def count_rules(classes: typing.List[Node]) -> typing.Dict[str, int]:
+    """Counts the nodes of each grammar rule in parse trees."""
+    counts = collections.Counter()
+    stack = list(classes)
+    while stack:
+        node = stack.pop()
+        counts[node.rule] += 1
+        stack.extend(child for child in node.children if type(child) is Node)
+    return dict(counts)
+
+
+def profile_path(input_path: str, suffix: str = ".xml",
+                 tokens_only: bool = False,
+                 iterative: bool = False, vm: bool = False,
+                 optimization: int = 0, binary: bool = False,
+                 json_lines: bool = False) -> dict:
+    """Analyzes a single .jack file like JackAnalyzer.analyze_path with the
+    same options, into the same output file, timing each phase separately.
+
+    The phases run one after the other instead of interleaving: the source
+    is read whole, lexed whole, parsed into a tree, optimized, and only then
+    emitted in the output format, which is written in one go. With
+    tokens_only nothing is parsed, and the tokens are emitted as they are.
+    The output is the same as usual, but the timings only approximate those
+    of analyze_path (see APPROXIMATION_NOTE); dump_slowest profiles the
+    usual analysis itself.
+
+    Args:
+        input_path (str): path of the file to analyze.
+        suffix (str): what replaces the .jack extension in the name of the
+            output file, as JackAnalyzer.output_settings gives it for the
+            other options.
+        tokens_only, iterative, vm, optimization, binary, json_lines: as in
+            JackAnalyzer.analyze_path.
+
+    Returns:
+        dict: the file, the error that stopped its analysis (or None), the
+        seconds spent in each of PHASES and the counters of the run.
+    """
+    output_path = os.path.splitext(input_path)[0] + suffix
+    engine_class = IterativeCompilationEngine if iterative \
+        else CompilationEngine
+    seconds = dict.fromkeys(PHASES, 0.0)
+    counters = {"tokens": 0, "tokens_consumed": 0, "output_bytes": 0,
+                "nodes": {}}
+    record = {"file": input_path, "error": None, "seconds": seconds,
+              "counters": counters}
+    try:
+        start = time.perf_counter()
+        with open(input_path, 'r') as input_file:
+            source = input_file.read()
+        seconds["read"], start = time.perf_counter() - start, time.perf_counter()
+
+        tokenizer = JackTokenizer(io.StringIO(source))
+        seconds["lex"], start = time.perf_counter() - start, time.perf_counter()
+        counters["tokens"] = len(tokenizer.tokens)
+
+        builder = TreeBuilder()
+        if not tokens_only:
+            engine = engine_class(tokenizer, None, writer=builder)
+            engine.compile_classes()
+            counters["tokens_consumed"] = tokenizer.current_token_index
+        seconds["parse"], start = time.perf_counter() - start, time.perf_counter()
+
+        if optimization and not tokens_only:
+            Optimizer.optimize(builder.classes, optimization)
+        seconds["optimize"], start = \
+            time.perf_counter() - start, time.perf_counter()
+
+        output = io.BytesIO() if binary else io.StringIO()
+        if tokens_only:
+            write_tokens(tokenizer, output)
+            counters["tokens_consumed"] = tokenizer.current_token_index
+        elif binary:
+            writer = BinaryTreeWriter(output)
+            for node in builder.classes:
+                writer.write(node)
+            writer.close()
+        else:
+            for node in builder.classes:
+                if vm:
+                    replay(node, VMCodeGenerator(output))
+                elif json_lines:
+                    replay(node, JsonWriter(output))
+                else:
+                    write_xml(node, output)
+        result = output.getvalue()
+        seconds["emit"], start = time.perf_counter() - start, time.perf_counter()
+
+        with open_atomically(
+                output_path, 'wb' if binary else 'w') as output_file:
+            output_file.write(result)
+        seconds["write"] = time.perf_counter() - start
+        counters["output_bytes"] = len(result) if binary \
+            else len(result.encode())
+        counters["nodes"] = count_rules(builder.classes)
+    except Exception as error:
+        record["error"] = f"{type(error).__name__}: {error}"
+    record["total_seconds"] = sum(seconds.values())
+    return record
+
+
+def write_report(records: typing.List[dict], report_path: str) -> None:
+    """Writes the records of profile_path as JSON, or as CSV if the report's
+    name ends with .csv (one column per phase, counter and grammar rule).
+    Both start with APPROXIMATION_NOTE: the JSON report is an object with
+    the "note" and the records, as "files"; the CSV report's first line is
+    the note, as a comment.
+    """
+    if not report_path.lower().endswith(".csv"):
+        with open(report_path, 'w') as report_file:
+            json.dump({"note": APPROXIMATION_NOTE, "files": records},
+                      report_file, indent=2)
+        return
+    rules = sorted({rule for record in records
+                    for rule in record["counters"]["nodes"]})
+    with open(report_path, 'w', newline="") as report_file:
+        report_file.write(f"# {APPROXIMATION_NOTE}\r\n")
+        writer = csv.writer(report_file)
+        writer.writerow(["file", "error", "total_seconds"] +
+                        [f"{phase}_seconds" for phase in PHASES] +
+                        ["tokens", "tokens_consumed", "output_bytes"] +
+                        [f"{rule}_nodes" for rule in rules])
+        for record in records:
+            counters = record["counters"]
+            writer.writerow(
+                [record["file"], record["error"] or "",
+                 record["total_seconds"]] +
+                [record["seconds"][phase] for phase in PHASES] +
+                [counters["tokens"], counters["tokens_consumed"],
+                 counters["output_bytes"]] +
+                [counters["nodes"].get(rule, 0) for rule in rules])
+
+
+def dump_slowest(records: typing.List[dict], count: int, directory: str,
+                 analyze: typing.Callable[[str], typing.Any],
+                 root: str) -> typing.List[str]:
+    """Re-analyzes the slowest files under cProfile, dumping the statistics
+    of each into directory as <path relative to root>.prof (readable with
+    pstats), so files of the same name in different directories get
+    separate dumps.
+
+    Args:
+        records (typing.List[dict]): the records of profile_path.
+        count (int): how many of the slowest files to profile.
+        directory (str): where to dump the statistics.
+        analyze (typing.Callable[[str], typing.Any]): analyzes a single file
+            the way the profiled run did, e.g. JackAnalyzer.analyze_path
+            with its options, so the statistics show the usual analysis
+            rather than profile_path's phases.
+        root (str): the directory the dumps' names are relative to.
+
+    Returns:
+        typing.List[str]: the paths of the dumps.
+    """
+    slowest = sorted((record for record in records if record["error"] is None),
+                     key=lambda record: record["total_seconds"],
+                     reverse=True)[:count]
+    dumps = []
+    for record in slowest:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        analyze(record["file"])
+        profiler.disable()
+        dump_path = os.path.join(
+            directory, os.path.relpath(record["file"], root) + ".prof")
+        os.makedirs(os.path.dirname(dump_path), exist_ok=True)
+        profiler.dump_stats(dump_path)
+        dumps.append(dump_path)
+    return dumps
@@ -0,0 +1,375 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import argparse
+import io
+import os
+import sqlite3
+import sys
+import typing
+
+from CompilationEngine import CompilationEngine
+from JackTokenizer import JackTokenizer
+import JackAnalyzer
+from ParseHandler import ParseHandler
+from SymbolTable import SymbolTable
+
+INDEX_FILE_NAME = ".jackindex.sqlite"
+
+# (path, line, description) of a definition or a call site
+Location = typing.Tuple[str, int, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL, size INTEGER NOT NULL, error TEXT);
+CREATE TABLE IF NOT EXISTS classes (
+    file INTEGER NOT NULL, name TEXT NOT NULL, line INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS subroutines (
+    file INTEGER NOT NULL, class TEXT NOT NULL, name TEXT NOT NULL,
+    kind TEXT NOT NULL, type TEXT NOT NULL, parameters TEXT NOT NULL,
+    line INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS variables (
+    file INTEGER NOT NULL, class TEXT NOT NULL, name TEXT NOT NULL,
+    kind TEXT NOT NULL, type TEXT NOT NULL, line INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS calls (
+    file INTEGER NOT NULL, caller_class TEXT NOT NULL,
+    caller TEXT NOT NULL, class TEXT NOT NULL, name TEXT NOT NULL,
+    line INTEGER NOT NULL);
+CREATE INDEX IF NOT EXISTS classes_by_name ON classes (name);
+CREATE INDEX IF NOT EXISTS classes_by_file ON classes (file);
+CREATE INDEX IF NOT EXISTS subroutines_by_name ON subroutines (name, class);
+CREATE INDEX IF NOT EXISTS subroutines_by_file ON subroutines (file);
+CREATE INDEX IF NOT EXISTS variables_by_name ON variables (name, class);
+CREATE INDEX IF NOT EXISTS variables_by_file ON variables (file);
+CREATE INDEX IF NOT EXISTS calls_by_callee ON calls (name, class);
+CREATE INDEX IF NOT EXISTS calls_by_file ON calls (file);
+"""
+# The tables of the declarations and calls in a file, with their columns
+# after "file", in the order the IndexRecorder keeps their rows.
+_TABLES = {"classes": 2, "subroutines": 6, "variables": 5, "calls": 5}
+
+
+class IndexRecorder(ParseHandler):
+    """A CompilationEngine writer that, instead of emitting anything,
+    records the declarations of a file and the subroutine calls in it.
+
+    The engine writes a terminal for every token, in source order, so the
+    n-th terminal it writes is the n-th token of the file, whose line the
+    tokenizer looks up only for the tokens that end up in a row.
+    """
+
+    def __init__(self, tokenizer: JackTokenizer) -> None:
+        """
+        :param tokenizer: The tokenizer the engine parses, which read the
+            whole file up front and so knows the position of every token.
+        """
+        self.tokenizer = tokenizer
+        self.symbols = SymbolTable()
+        self.class_name = None
+        self.subroutine_name = None
+        self._subroutine = None
+        # rows of the tables of _TABLES, without their file column
+        self.classes = []
+        self.subroutines = []
+        self.variables = []
+        self.calls = []
+        self._terminals = 0
+        # the rules that are open, each with its (kind, text, token index)
+        # terminals so far
+        self._stack = []
+
+    def start(self, rule: str) -> None:
+        if rule == "class":
+            self.symbols = SymbolTable()
+        elif rule == "subroutineDec":
+            self.symbols.start_subroutine()
+        self._stack.append((rule, []))
+
+    def end(self, rule: str) -> None:
+        _, terminals = self._stack.pop()
+        if rule == "classVarDec" or rule == "varDec":
+            # ('static' | 'field' | 'var') type varName (',' varName)* ';'
+            kind, variable_type = terminals[0][1], terminals[1][1]
+            for _, name, index in terminals[2:-1:2]:
+                self.symbols.define(name, variable_type, kind.upper())
+                if rule == "classVarDec":
+                    self.variables.append((self.class_name, name, kind,
+                                           variable_type, self._line(index)))
+        elif rule == "parameterList":
+            # ((type varName) (',' type varName)*)?
+            parameters = []
+            for index in range(0, len(terminals), 3):
+                parameter_type, name = terminals[index][1], \
+                    terminals[index + 1][1]
+                self.symbols.define(name, parameter_type, "ARG")
+                parameters.append(f"{parameter_type} {name}")
+            kind, return_type, index = self._subroutine
+            self.subroutines.append((self.class_name, self.subroutine_name,
+                                     kind, return_type, ", ".join(parameters),
+                                     self._line(index)))
+
+    def terminal(self, kind: str, text: str) -> None:
+        index = self._terminals
+        self._terminals += 1
+        rule, terminals = self._stack[-1]
+        terminals.append((kind, text, index))
+        if rule == "class" and len(terminals) == 2:
+            self.class_name = text
+            self.classes.append((text, self._line(index)))
+        elif rule == "subroutineDec" and len(terminals) == 3:
+            # ('constructor' | 'function' | 'method') type subroutineName;
+            # it is recorded once its parameterList ends
+            self.subroutine_name = text
+            self._subroutine = (terminals[0][1], terminals[1][1], index)
+            if terminals[0][1] == "method":
+                self.symbols.define("this", self.class_name, "ARG")
+        elif text == "(" and len(terminals) > 1 and \
+                terminals[-2][0] == "identifier":
+            if rule == "doStatement":
+                self._record_call(terminals[1:-1])
+            elif rule == "term":
+                self._record_call(terminals[:-1])
+
+    def _record_call(self, names: typing.List[typing.Tuple[str, str, int]]
+                     ) -> None:
+        """Records a call, given the terminals before its '(':
+        subroutineName, or (className | varName) '.' subroutineName.
+        """
+        if len(names) == 1:
+            called_class, name = self.class_name, names[0][1]
+        else:
+            receiver, name = names[0][1], names[2][1]
+            entry = self.symbols.lookup(receiver)
+            called_class = receiver if entry is None else entry[0]
+        self.calls.append((self.class_name, self.subroutine_name,
+                           called_class, name, self._line(names[0][2])))
+
+    def _line(self, index: int) -> int:
+        """The line of the token with an index in the file."""
+        return self.tokenizer.position(index)[0]
+
+
+def scan_source(source: str) -> typing.Dict[str, list]:
+    """Parses a source, returning the declarations and calls in it.
+
+    Args:
+        source (str): the source to scan.
+
+    Returns:
+        typing.Dict[str, list]: the rows of each table of _TABLES, without
+        their file column.
+    """
+    tokenizer = JackTokenizer(io.StringIO(source))
+    recorder = IndexRecorder(tokenizer)
+    engine = CompilationEngine(tokenizer, None, writer=recorder)
+    engine.compile_classes()
+    return {table: getattr(recorder, table) for table in _TABLES}
+
+
+def scan_path(input_path: str) -> dict:
+    """Scans a file, like scan_source, for ProjectIndex.update.
+
+    Returns:
+        dict: the "file", the "mtime_ns" and "size" it had when it was
+        read, its "error" (or None) and the rows of each table of _TABLES.
+    """
+    result = {"file": input_path, "mtime_ns": 0, "size": 0, "error": None}
+    try:
+        stat = os.stat(input_path)
+        result["mtime_ns"], result["size"] = stat.st_mtime_ns, stat.st_size
+        with open(input_path, 'r') as input_file:
+            result.update(scan_source(input_file.read()))
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+    return result
+
+
+class ProjectIndex:
+    """A persistent index of the classes, subroutines, class variables and
+    subroutine calls of a Jack project, kept in an SQLite database.
+
+    update() only parses the files that changed since they were indexed
+    (by modification time and size) and replaces just their rows, all in
+    one transaction. Queries are answered from the database's indexes,
+    without parsing anything.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: The database file; created if it does not exist.
+        """
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def update(self, root_path: str, jobs: int = 1
+               ) -> typing.Tuple[typing.List[dict], int]:
+        """Brings the index of the .jack files under a directory up to date:
+        files that changed or are new are scanned again, and the files that
+        are gone are dropped.
+
+        Args:
+            root_path (str): the project's directory.
+            jobs (int): how many files to scan at once.
+
+        Returns:
+            typing.Tuple[typing.List[dict], int]: what scan_path returned for
+            every file that was scanned, and how many files were dropped.
+        """
+        root_path = os.path.abspath(root_path)
+        prefix = os.path.join(root_path, "")
+        indexed = {path: (file_id, mtime_ns, size)
+                   for file_id, path, mtime_ns, size in self.connection.execute(
+                       "SELECT id, path, mtime_ns, size FROM files")
+                   if path.startswith(prefix)}
+        changed = []
+        for input_path in JackAnalyzer.find_jack_files(root_path):
+            entry = indexed.pop(input_path, None)
+            try:
+                stat = os.stat(input_path)
+            except OSError:
+                continue
+            if entry is None or \
+                    entry[1:] != (stat.st_mtime_ns, stat.st_size):
+                changed.append(input_path)
+        scanned = list(JackAnalyzer.analyze_paths(changed, jobs, scan_path))
+        with self.connection:
+            for file_id, _, _ in indexed.values():
+                self._delete_rows(file_id)
+                self.connection.execute("DELETE FROM files WHERE id = ?",
+                                        (file_id,))
+            for result in scanned:
+                self._replace_rows(result)
+        return scanned, len(indexed)
+
+    def _delete_rows(self, file_id: int) -> None:
+        for table in _TABLES:
+            self.connection.execute(f"DELETE FROM {table} WHERE file = ?",
+                                    (file_id,))
+
+    def _replace_rows(self, result: dict) -> None:
+        row = self.connection.execute("SELECT id FROM files WHERE path = ?",
+                                      (result["file"],)).fetchone()
+        if row is None:
+            file_id = self.connection.execute(
+                "INSERT INTO files (path, mtime_ns, size, error) "
+                "VALUES (?, ?, ?, ?)",
+                (result["file"], result["mtime_ns"], result["size"],
+                 result["error"])).lastrowid
+        else:
+            file_id = row[0]
+            self._delete_rows(file_id)
+            self.connection.execute(
+                "UPDATE files SET mtime_ns = ?, size = ?, error = ? "
+                "WHERE id = ?",
+                (result["mtime_ns"], result["size"], result["error"],
+                 file_id))
+        for table, columns in _TABLES.items():
+            self.connection.executemany(
+                f"INSERT INTO {table} VALUES (?{', ?' * columns})",
+                [(file_id,) + row for row in result.get(table, ())])
+
+    def definitions(self, name: str) -> typing.List[Location]:
+        """Finds where a class, a subroutine or a class variable is declared.
+
+        Args:
+            name (str): "ClassName", "ClassName.member", or "member" for
+                members of that name in any class.
+
+        Returns:
+            typing.List[Location]: every matching declaration.
+        """
+        class_name, _, member = name.rpartition(".")
+        condition = "name = ?" + (" AND class = ?" if class_name else "")
+        parameters = (member, class_name) if class_name else (member,)
+        locations = []
+        if not class_name:
+            locations += self.connection.execute(
+                "SELECT path, line, 'class ' || name FROM classes "
+                "JOIN files ON files.id = file WHERE name = ?", parameters)
+        locations += self.connection.execute(
+            "SELECT path, line, kind || ' ' || type || ' ' || class || '.' || "
+            "name || '(' || parameters || ')' FROM subroutines "
+            f"JOIN files ON files.id = file WHERE {condition}", parameters)
+        locations += self.connection.execute(
+            "SELECT path, line, kind || ' ' || type || ' ' || class || '.' || "
+            "name FROM variables "
+            f"JOIN files ON files.id = file WHERE {condition}", parameters)
+        return locations
+
+    def callers(self, name: str) -> typing.List[Location]:
+        """Finds every call of a subroutine.
+
+        Args:
+            name (str): "ClassName.subroutineName", or "subroutineName" for
+                subroutines of that name in any class.
+
+        Returns:
+            typing.List[Location]: every call site, described by the
+            subroutine it is in, ordered by file and line.
+        """
+        class_name, _, member = name.rpartition(".")
+        condition = "name = ?" + (" AND class = ?" if class_name else "")
+        parameters = (member, class_name) if class_name else (member,)
+        return self.connection.execute(
+            "SELECT path, line, caller_class || '.' || caller FROM calls "
+            f"JOIN files ON files.id = file WHERE {condition} "
+            "ORDER BY path, line", parameters).fetchall()
+
+    def errors(self) -> typing.List[typing.Tuple[str, str]]:
+        """Returns every indexed file that could not be scanned, with the
+        error that stopped it; such files have no declarations or calls.
+        """
+        return self.connection.execute(
+            "SELECT path, error FROM files WHERE error IS NOT NULL "
+            "ORDER BY path").fetchall()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "ProjectIndex":
+        return self
+
+    def __exit__(self, *exception) -> None:
+        self.close()
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Indexes the classes, subroutines, class variables and "
+                    "calls of every .jack file under a directory, and "
+                    "answers go-to-definition and find-callers queries.")
+    parser.add_argument("project")
+    parser.add_argument(
+        "--index", help=f"the index database (default: {INDEX_FILE_NAME} "
+                        f"in the project directory)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="how many changed files to scan in parallel (0 for one per CPU)")
+    parser.add_argument(
+        "--definition", action="append", default=[], metavar="NAME",
+        help="where ClassName, ClassName.member or member is declared")
+    parser.add_argument(
+        "--callers", action="append", default=[], metavar="NAME",
+        help="where ClassName.subroutineName or subroutineName is called")
+    arguments = parser.parse_args()
+    jobs = arguments.jobs if arguments.jobs > 0 else os.cpu_count()
+    index_path = arguments.index or os.path.join(arguments.project,
+                                                 INDEX_FILE_NAME)
+    with ProjectIndex(index_path) as index:
+        scanned, removed = index.update(arguments.project, jobs)
+        for result in scanned:
+            if result["error"] is not None:
+                print(f"{result['file']}: {result['error']}", file=sys.stderr)
+        print(f"scanned {len(scanned)} changed files, dropped {removed}",
+              file=sys.stderr)
+        for name in arguments.definition:
+            for path, line, description in index.definitions(name):
+                print(f"{path}:{line}: {description}")
+        for name in arguments.callers:
+            for path, line, description in index.callers(name):
+                print(f"{path}:{line}: called in {description}")
@@ -0,0 +1,109 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import typing
+
+# The kinds of identifiers, and whether each one belongs to the class scope.
+CLASS_KINDS = {"STATIC", "FIELD"}
+SUBROUTINE_KINDS = {"ARG", "VAR"}
+
+
+class SymbolTable:
+    """A symbol table that associates names with information needed for Jack
+    compilation: type, kind and running index. The symbol table has two
+    nested scopes (class/subroutine), each kept in a dict from name to
+    (type, kind, index), so every lookup is a hash lookup.
+    """
+
+    def __init__(self) -> None:
+        """Creates a new empty symbol table."""
+        self.class_scope = {}
+        self.subroutine_scope = {}
+        self.counts = dict.fromkeys(CLASS_KINDS | SUBROUTINE_KINDS, 0)
+
+    def start_subroutine(self) -> None:
+        """Starts a new subroutine scope (i.e., resets the subroutine's
+        symbol table).
+        """
+        self.subroutine_scope = {}
+        for kind in SUBROUTINE_KINDS:
+            self.counts[kind] = 0
+
+    def define(self, name: str, type: str, kind: str) -> None:
+        """Defines a new identifier of a given name, type and kind and assigns
+        it a running index. "STATIC" and "FIELD" identifiers have a class scope,
+        while "ARG" and "VAR" identifiers have a subroutine scope.
+
+        Args:
+            name (str): the name of the new identifier.
+            type (str): the type of the new identifier.
+            kind (str): the kind of the new identifier, can be:
+            "STATIC", "FIELD", "ARG", "VAR".
+        """
+        scope = self.class_scope if kind in CLASS_KINDS \
+            else self.subroutine_scope
+        scope[name] = (type, kind, self.counts[kind])
+        self.counts[kind] += 1
+
+    def var_count(self, kind: str) -> int:
+        """
+        Args:
+            kind (str): can be "STATIC", "FIELD", "ARG", "VAR".
+
+        Returns:
+            int: the number of variables of the given kind already defined in
+            the current scope.
+        """
+        return self.counts[kind]
+
+    def lookup(self, name: str) -> typing.Optional[typing.Tuple[str, str, int]]:
+        """
+        Args:
+            name (str): name of an identifier.
+
+        Returns:
+            typing.Optional[typing.Tuple[str, str, int]]: the type, kind and
+            index of the named identifier in the current scope, or None if it
+            is unknown there (e.g. it names a class or a subroutine).
+        """
+        entry = self.subroutine_scope.get(name)
+        if entry is None:
+            entry = self.class_scope.get(name)
+        return entry
+
+    def kind_of(self, name: str) -> typing.Optional[str]:
+        """
+        Args:
+            name (str): name of an identifier.
+
+        Returns:
+            typing.Optional[str]: the kind of the named identifier in the
+            current scope, or None if the identifier is unknown in the
+            current scope.
+        """
+        entry = self.lookup(name)
+        return entry[1] if entry else None
+
+    def type_of(self, name: str) -> str:
+        """
+        Args:
+            name (str):  name of an identifier.
+
+        Returns:
+            str: the type of the named identifier in the current scope.
+        """
+        return self.lookup(name)[0]
+
+    def index_of(self, name: str) -> int:
+        """
+        Args:
+            name (str):  name of an identifier.
+
+        Returns:
+            int: the index assigned to the named identifier.
+        """
+        return self.lookup(name)[2]
@@ -0,0 +1,261 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import typing
+
+from ParseHandler import ParseHandler
+from SymbolTable import SymbolTable
+from VMWriter import VMWriter
+
+# The VM segment each kind of variable lives in.
+SEGMENTS = {"STATIC": "static", "FIELD": "this", "ARG": "argument",
+            "VAR": "local"}
+BINARY_COMMANDS = {'+': "add", '-': "sub", '&': "and", '|': "or",
+                   '<': "lt", '>': "gt", '=': "eq"}
+BINARY_CALLS = {'*': "Math.multiply", '/': "Math.divide"}
+UNARY_COMMANDS = {'-': "neg", '~': "not", '^': "shiftleft", '#': "shiftright"}
+
+
+class _Rule:
+    """What the generator remembers about a rule that is being compiled."""
+    __slots__ = ("rule", "terminals", "label", "count", "op")
+
+    def __init__(self, rule: str) -> None:
+        self.rule = rule
+        # the (kind, text) of the rule's own terminals so far
+        self.terminals = []
+        # the rule's label number, or the function a call in it calls
+        self.label = None
+        # how many expressions it holds; for a call, how many arguments
+        self.count = 0
+        # a VM command or flag that waits for a later part of the rule
+        self.op = None
+
+
+class VMCodeGenerator(ParseHandler):
+    """A CompilationEngine writer that compiles the parsed structure into
+    Hack VM commands instead of emitting it as XML.
+
+    The engine reports every rule and terminal in source order, and the
+    commands of a rule only depend on what came before them in it, so the
+    code is written while the engine parses: e.g. a term's push is written
+    when the term ends, and the op between two terms after the second one.
+    Only the rules that are still open are kept, never a whole tree.
+    """
+
+    def __init__(self, output_stream: typing.TextIO) -> None:
+        """
+        :param output_stream: Where to write the VM commands.
+        """
+        self.vm = VMWriter(output_stream)
+        self.symbols = SymbolTable()
+        self.class_name = None
+        self.subroutine_kind = None
+        self.subroutine_name = None
+        self.labels = 0
+        self._stack = []
+
+    def start(self, rule: str) -> None:
+        if rule == "class":
+            self.symbols = SymbolTable()
+        elif rule == "subroutineDec":
+            self.symbols.start_subroutine()
+            self.labels = 0
+        elif rule == "parameterList" and self.subroutine_kind == "method":
+            # a method gets the object it is called on as argument 0
+            self.symbols.define("this", self.class_name, "ARG")
+        elif rule == "statements" and self._stack[-1].rule == "subroutineBody":
+            # every local variable is declared by now
+            self._write_function()
+        self._stack.append(_Rule(rule))
+
+    def end(self, rule: str) -> None:
+        node = self._stack.pop()
+        parent = self._stack[-1] if self._stack else None
+        if rule == "term":
+            if len(node.terminals) == 1 and \
+                    node.terminals[0][0] == "identifier":
+                self._push_variable(node.terminals[0][1])
+            elif node.op is not None:
+                self.vm.write_arithmetic(node.op)  # unary op
+            if parent.rule == "expression" and parent.op is not None:
+                self._write_binary(parent.op)
+                parent.op = None
+        elif rule == "expression":
+            parent.count += 1
+        elif rule == "expressionList":
+            parent.count += node.count
+        elif rule == "ifStatement":
+            self.vm.write_label(f"IF_END{node.label}" if node.op
+                                else f"IF_FALSE{node.label}")
+        elif rule == "whileStatement":
+            self.vm.write_goto(f"WHILE_EXP{node.label}")
+            self.vm.write_label(f"WHILE_END{node.label}")
+        elif rule == "classVarDec" or rule == "varDec":
+            # ('static' | 'field' | 'var') type varName (',' varName)* ';'
+            kind = node.terminals[0][1].upper()
+            for _, name in node.terminals[2:-1:2]:
+                self.symbols.define(name, node.terminals[1][1], kind)
+        elif rule == "parameterList":
+            # ((type varName) (',' type varName)*)?
+            for index in range(0, len(node.terminals), 3):
+                self.symbols.define(node.terminals[index + 1][1],
+                                    node.terminals[index][1], "ARG")
+        elif rule == "class":
+            self.vm.close()
+
+    def terminal(self, kind: str, text: str) -> None:
+        node = self._stack[-1]
+        node.terminals.append((kind, text))
+        rule = node.rule
+        if rule == "term":
+            self._term_terminal(node, kind, text)
+        elif rule == "expression":
+            node.op = text  # written once the term after it is
+        elif rule == "letStatement":
+            if text == "[":
+                self._push_variable(node.terminals[1][1])
+                node.op = "array"
+            elif text == "]":
+                self.vm.write_arithmetic("add")
+            elif text == ";":
+                if node.op == "array":
+                    self.vm.write_pop("temp", 0)
+                    self.vm.write_pop("pointer", 1)
+                    self.vm.write_push("temp", 0)
+                    self.vm.write_pop("that", 0)
+                else:
+                    self._pop_variable(node.terminals[1][1])
+        elif rule == "doStatement":
+            if text == "(":
+                self._start_call(node, node.terminals[1:-1])
+            elif text == ")":
+                self.vm.write_call(node.label, node.count)
+            elif text == ";":
+                self.vm.write_pop("temp", 0)  # discard the returned value
+        elif rule == "ifStatement":
+            if text == "if":
+                node.label = self._new_label()
+            elif text == ")":
+                self.vm.write_arithmetic("not")
+                self.vm.write_if(f"IF_FALSE{node.label}")
+            elif text == "else" and node.op is None:
+                node.op = "else"
+                self.vm.write_goto(f"IF_END{node.label}")
+                self.vm.write_label(f"IF_FALSE{node.label}")
+        elif rule == "whileStatement":
+            if text == "while":
+                node.label = self._new_label()
+                self.vm.write_label(f"WHILE_EXP{node.label}")
+            elif text == ")":
+                self.vm.write_arithmetic("not")
+                self.vm.write_if(f"WHILE_END{node.label}")
+        elif rule == "returnStatement":
+            if text == ";":
+                if node.count == 0:
+                    self.vm.write_push("constant", 0)  # void
+                self.vm.write_return()
+        elif rule == "subroutineDec":
+            if len(node.terminals) == 1:
+                self.subroutine_kind = text
+            elif len(node.terminals) == 3:
+                self.subroutine_name = text
+        elif rule == "class" and kind == "identifier":
+            self.class_name = text
+
+    def _term_terminal(self, node: _Rule, kind: str, text: str) -> None:
+        if kind == "integerConstant":
+            self.vm.write_push("constant", int(text))
+        elif kind == "stringConstant":
+            self.vm.write_push("constant", len(text))
+            self.vm.write_call("String.new", 1)
+            for character in text:
+                self.vm.write_push("constant", ord(character))
+                self.vm.write_call("String.appendChar", 2)
+        elif kind == "keyword":
+            if text == "this":
+                self.vm.write_push("pointer", 0)
+            else:
+                self.vm.write_push("constant", 0)
+                if text == "true":
+                    self.vm.write_arithmetic("not")
+        elif kind == "symbol":
+            if len(node.terminals) == 1:
+                # a unary op, or the '(' of '(' expression ')'
+                node.op = UNARY_COMMANDS.get(text)
+            elif text == "[":
+                self._push_variable(node.terminals[0][1])
+            elif text == "]":
+                self.vm.write_arithmetic("add")
+                self.vm.write_pop("pointer", 1)
+                self.vm.write_push("that", 0)
+            elif text == "(":
+                self._start_call(node, node.terminals[:-1])
+            elif text == ")" and node.label is not None:
+                self.vm.write_call(node.label, node.count)
+
+    def _start_call(self, node: _Rule,
+                    names: typing.List[typing.Tuple[str, str]]) -> None:
+        """Pushes the object a subroutine call is made on, if any, and keeps
+        the name of the called function in node.label, and its number of
+        arguments so far in node.count.
+
+        :param node: The doStatement or term the call is in.
+        :param names: The terminals before the call's '(': subroutineName,
+            or (className | varName) '.' subroutineName.
+        """
+        if len(names) == 1:
+            # a method of this class, called on this object
+            self.vm.write_push("pointer", 0)
+            node.label = f"{self.class_name}.{names[0][1]}"
+            node.count = 1
+            return
+        receiver, subroutine = names[0][1], names[2][1]
+        entry = self.symbols.lookup(receiver)
+        if entry is None:
+            # a function or constructor of the named class
+            node.label = f"{receiver}.{subroutine}"
+            node.count = 0
+        else:
+            # a method, called on the object in the variable
+            self._push_variable(receiver)
+            node.label = f"{entry[0]}.{subroutine}"
+            node.count = 1
+
+    def _write_function(self) -> None:
+        self.vm.write_function(f"{self.class_name}.{self.subroutine_name}",
+                               self.symbols.var_count("VAR"))
+        if self.subroutine_kind == "constructor":
+            self.vm.write_push("constant", self.symbols.var_count("FIELD"))
+            self.vm.write_call("Memory.alloc", 1)
+            self.vm.write_pop("pointer", 0)
+        elif self.subroutine_kind == "method":
+            self.vm.write_push("argument", 0)
+            self.vm.write_pop("pointer", 0)
+
+    def _write_binary(self, op: str) -> None:
+        if op in BINARY_CALLS:
+            self.vm.write_call(BINARY_CALLS[op], 2)
+        else:
+            self.vm.write_arithmetic(BINARY_COMMANDS[op])
+
+    def _new_label(self) -> int:
+        self.labels += 1
+        return self.labels - 1
+
+    def _variable(self, name: str) -> typing.Tuple[str, int]:
+        """Returns the segment and the index of a variable."""
+        entry = self.symbols.lookup(name)
+        if entry is None:
+            raise ValueError(f"Undefined variable: {name}")
+        return SEGMENTS[entry[1]], entry[2]
+
+    def _push_variable(self, name: str) -> None:
+        self.vm.write_push(*self._variable(name))
+
+    def _pop_variable(self, name: str) -> None:
+        self.vm.write_pop(*self._variable(name))
@@ -0,0 +1,107 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import typing
+
+from XmlWriter import FLUSH_LINES
+
+
+class VMWriter:
+    """Writes VM commands into a file. Like the XmlWriter, it collects the
+    commands and writes them out in large blocks.
+    """
+
+    def __init__(self, output_stream: typing.TextIO) -> None:
+        """Creates a new file and prepares it for writing VM commands."""
+        self.output_file = output_stream
+        self._lines = []
+
+    def write_push(self, segment: str, index: int) -> None:
+        """Writes a VM push command.
+
+        Args:
+            segment (str): the segment to push from, can be "constant",
+            "argument", "local", "static", "this", "that", "pointer", "temp".
+            index (int): the index to push from.
+        """
+        self._write(f"push {segment} {index}\n")
+
+    def write_pop(self, segment: str, index: int) -> None:
+        """Writes a VM pop command.
+
+        Args:
+            segment (str): the segment to pop into, can be "argument",
+            "local", "static", "this", "that", "pointer", "temp".
+            index (int): the index to pop into.
+        """
+        self._write(f"pop {segment} {index}\n")
+
+    def write_arithmetic(self, command: str) -> None:
+        """Writes a VM arithmetic command.
+
+        Args:
+            command (str): the command to write, can be "add", "sub", "neg",
+            "eq", "gt", "lt", "and", "or", "not", "shiftleft", "shiftright".
+        """
+        self._write(command + "\n")
+
+    def write_label(self, label: str) -> None:
+        """Writes a VM label command.
+
+        Args:
+            label (str): the label to write.
+        """
+        self._write(f"label {label}\n")
+
+    def write_goto(self, label: str) -> None:
+        """Writes a VM goto command.
+
+        Args:
+            label (str): the label to go to.
+        """
+        self._write(f"goto {label}\n")
+
+    def write_if(self, label: str) -> None:
+        """Writes a VM if-goto command.
+
+        Args:
+            label (str): the label to go to.
+        """
+        self._write(f"if-goto {label}\n")
+
+    def write_call(self, name: str, n_args: int) -> None:
+        """Writes a VM call command.
+
+        Args:
+            name (str): the name of the function to call.
+            n_args (int): the number of arguments the function receives.
+        """
+        self._write(f"call {name} {n_args}\n")
+
+    def write_function(self, name: str, n_locals: int) -> None:
+        """Writes a VM function command.
+
+        Args:
+            name (str): the name of the function.
+            n_locals (int): the number of local variables the function uses.
+        """
+        self._write(f"function {name} {n_locals}\n")
+
+    def write_return(self) -> None:
+        """Writes a VM return command."""
+        self._write("return\n")
+
+    def close(self) -> None:
+        """Writes out every command collected so far."""
+        if self._lines:
+            self.output_file.write("".join(self._lines))
+            self._lines.clear()
+
+    def _write(self, line: str) -> None:
+        self._lines.append(line)
+        if len(self._lines) >= FLUSH_LINES:
+            self.close()
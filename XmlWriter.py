@@ -0,0 +1,110 @@
+"""
+This file is part of nand2tetris, as taught in The Hebrew University, and
+was written by Aviv Yaish. It is an extension to the specifications given
+[here](https://www.nand2tetris.org) (Shimon Schocken and Noam Nisan, 2017),
+as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
+Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
+"""
+import typing
+
+from JackTokenizer import (INT_CONST, KEYWORDS, STRING_CONST, SYMBOLS,
+                           SYMBOL_ESCAPES)
+from ParseHandler import ParseHandler
+
+# How many lines are collected before they are written out as one block.
+FLUSH_LINES = 4096
+
+# The tag of each kind of token, indexed by the JackTokenizer kind codes.
+TERMINAL_TAGS = (None, "keyword", "symbol", "integerConstant",
+                 "stringConstant", "identifier")
+# The complete, unindented line of every keyword and symbol.
+TERMINAL_LINES = {
+    **{keyword: f"<keyword> {keyword} </keyword>\n" for keyword in KEYWORDS},
+    **{symbol: f"<symbol> {SYMBOL_ESCAPES.get(symbol, symbol)} </symbol>\n"
+       for symbol in SYMBOLS},
+}
+
+
+class XmlWriter(ParseHandler):
+    """Emits the parsed structure of a Jack program as XML.
+
+    Lines are not written one at a time: they are collected in a list and
+    written out in large blocks, when FLUSH_LINES lines have been collected,
+    when the outermost rule ends, or when flush() is called.
+    """
+
+    def __init__(self, output_stream: typing.TextIO, indent: int = 0) -> None:
+        """
+        :param output_stream: The output stream.
+        :param indent: How many spaces each nesting level is indented by.
+            With the default of 0 every line starts at the first column.
+        """
+        self.output_file = output_stream
+        self.indent = indent
+        self.depth = 0
+        self._lines = []
+        # the indentation of every depth reached so far, so each line only
+        # looks its prefix up instead of building it
+        self._prefixes = [""]
+        self._prefix = ""
+
+    def start(self, rule: str) -> None:
+        """Opens the tag of a non-terminal, e.g. start("letStatement")."""
+        self._lines.append(f"{self._prefix}<{rule}>\n")
+        self.depth += 1
+        if self.depth == len(self._prefixes):
+            self._prefixes.append(" " * (self.indent * self.depth))
+        self._prefix = self._prefixes[self.depth]
+
+    def end(self, rule: str) -> None:
+        """Closes the tag of a non-terminal, e.g. end("letStatement")."""
+        self.depth -= 1
+        self._prefix = self._prefixes[self.depth]
+        self._lines.append(f"{self._prefix}</{rule}>\n")
+        if self.depth == 0 or len(self._lines) >= FLUSH_LINES:
+            self.flush()
+
+    def terminal(self, kind: str, text: str) -> None:
+        """Emits a terminal, e.g. terminal("symbol", "<").
+
+        :param kind: The terminal's tag: "keyword", "symbol", "identifier",
+            "integerConstant" or "stringConstant".
+        :param text: The terminal as it appears in the source. Symbols are
+            escaped here, so "<" is written as "&lt;".
+        """
+        if kind == "symbol":
+            text = SYMBOL_ESCAPES.get(text, text)
+        self._lines.append(f"{self._prefix}<{kind}> {text} </{kind}>\n")
+
+    def flush(self) -> None:
+        """Writes out everything collected so far."""
+        if self._lines:
+            self.output_file.write("".join(self._lines))
+            self._lines.clear()
+
+
+def write_tokens(tokenizer: typing.Iterable[typing.Tuple[str, int]], output_file: typing.TextIO) -> None:
+    """Writes the tokens a tokenizer produces as a <tokens> XML stream, like
+    the *T.xml files, without parsing them.
+
+    Args:
+        tokenizer (typing.Iterable[typing.Tuple[str, int]]): the tokens
+            to write with their kind codes, e.g. a JackTokenizer.
+        output_file (typing.TextIO): writes all output to this file.
+    """
+    lines = ["<tokens>\n"]
+    for token, kind in tokenizer:
+        line = TERMINAL_LINES.get(token)  # keywords and symbols
+        if line is None:
+            if kind == STRING_CONST:
+                token = token[1:-1]
+            elif kind == INT_CONST:
+                token = str(int(token))
+            tag = TERMINAL_TAGS[kind]
+            line = f"<{tag}> {token} </{tag}>\n"
+        lines.append(line)
+        if len(lines) >= FLUSH_LINES:
+            output_file.write("".join(lines))
+            lines.clear()
+    lines.append("</tokens>\n")
+    output_file.write("".join(lines))
@@ -0,0 +1,4 @@
+"""
+Benchmarks for the Jack analyzer. Run them from the repository root, e.g.:
+python3 -m benchmarks.classification
+"""
@@ -0,0 +1,74 @@
+"""
+Compares the binary parse tree format (JackAnalyzer --binary) with the XML
+output on a generated corpus: the size of the files, and how long loading
+them takes - the XML with xml.etree.ElementTree, the binary files both by
+walking them (BinaryTreeReader.replay) and by building the trees
+(BinaryTreeReader.classes).
+
+Usage: python3 -m benchmarks.binary_tree [--repeat N] [options]
+"""
+import argparse
+import os
+import tempfile
+import time
+import typing
+import xml.etree.ElementTree
+
+import JackAnalyzer
+from BinaryParseTree import BinaryTreeReader
+from ParseHandler import ParseHandler
+from benchmarks import generator
+
+
+def best_time(load: typing.Callable[[str], typing.Any],
+              paths: typing.List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            load(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def walk(path: str) -> None:
+    with BinaryTreeReader(path) as reader:
+        reader.replay(ParseHandler())
+
+
+def build(path: str) -> None:
+    with BinaryTreeReader(path) as reader:
+        reader.classes()
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Compares the binary parse tree format with XML.")
+    parser.add_argument("--repeat", type=int, default=3)
+    generator.add_arguments(parser)
+    parser.set_defaults(classes=20, subroutines=40)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generator.generate_corpus(
+            directory, arguments.classes, arguments.subroutines,
+            arguments.depth, arguments.expression_length, arguments.seed)
+        for path in paths:
+            assert JackAnalyzer.analyze_path(path) is None
+            assert JackAnalyzer.analyze_path(path, binary=True) is None
+        xml_paths = [os.path.splitext(path)[0] + ".xml" for path in paths]
+        binary_paths = [os.path.splitext(path)[0] + ".jpt" for path in paths]
+        xml_bytes = sum(map(os.path.getsize, xml_paths))
+        binary_bytes = sum(map(os.path.getsize, binary_paths))
+        print(f"corpus: {len(paths)} files")
+        print(f"{'XML':<26}{xml_bytes:>12} bytes")
+        print(f"{'binary':<26}{binary_bytes:>12} bytes"
+              f"{xml_bytes / binary_bytes:>8.1f}x smaller")
+        xml_seconds = best_time(xml.etree.ElementTree.parse, xml_paths,
+                                arguments.repeat)
+        print(f"{'load XML (ElementTree)':<26}{xml_seconds:>10.3f} s")
+        for name, load in (("walk binary (replay)", walk),
+                           ("load binary (classes)", build)):
+            seconds = best_time(load, binary_paths, arguments.repeat)
+            print(f"{name:<26}{seconds:>10.3f} s"
+                  f"{xml_seconds / seconds:>10.1f}x faster")
@@ -0,0 +1,112 @@
+"""
+Measures how much time token classification costs while analyzing the
+sample programs, comparing the original per-call classification (which
+rebuilt the keyword and symbol sets on every call) to the kind codes that
+JackTokenizer now computes once at lex time.
+
+Usage: python3 -m benchmarks.classification [corpus directory ...]
+"""
+import io
+import os
+import sys
+import timeit
+import typing
+
+from CompilationEngine import CompilationEngine
+from JackTokenizer import JackTokenizer
+
+DEFAULT_CORPORA = ["Square", "ExpressionLessSquare"]
+CLASSIFYING_METHODS = ("token_type", "keyword", "symbol", "identifier",
+                       "int_val", "string_val")
+
+
+def legacy_token_type(token: str) -> str:
+    """The classification JackTokenizer.token_type() used to run per call."""
+    KEYWORD_SET = {
+        'class', 'constructor', 'function', 'method', 'field',
+        'static', 'var', 'int', 'char', 'boolean', 'void', 'true',
+        'false', 'null', 'this', 'let', 'do', 'if', 'else',
+        'while', 'return'
+    }
+    SYMBOL_SET = {
+        '{', '}', '(', ')', '[', ']', '.', ',', ';', '+',
+        '-', '*', '/', '&', '|', '<', '>', '=', '~', '^', '#'
+    }
+    if token in KEYWORD_SET:
+        return 'KEYWORD'
+    if token in SYMBOL_SET:
+        return 'SYMBOL'
+    if token.isdigit():
+        return 'INT_CONST'
+    if token[0] == '"' and token[-1] == '"':
+        return 'STRING_CONST'
+    return 'IDENTIFIER'
+
+
+class CountingTokenizer(JackTokenizer):
+    """A tokenizer that counts the classifying calls made on it."""
+
+    def __init__(self, input_stream: typing.TextIO) -> None:
+        super().__init__(input_stream)
+        self.classifications = 0
+
+    def __getattribute__(self, name: str):
+        if name in CLASSIFYING_METHODS:
+            object.__setattr__(self, "classifications",
+                               object.__getattribute__(self, "classifications") + 1)
+        return object.__getattribute__(self, name)
+
+
+def count_classifications(source: str) -> typing.Tuple[int, int]:
+    """Analyzes a source and returns its token count and the number of
+    classifying calls the compilation engine made.
+    """
+    tokenizer = CountingTokenizer(io.StringIO(source))
+    engine = CompilationEngine(tokenizer, io.StringIO())
+    engine.compile_classes()
+    return len(tokenizer.tokens), tokenizer.classifications
+
+
+def time_per_call(source: str, repeat: int = 5) -> typing.Tuple[float, float]:
+    """Returns the best time of one classification of a token of the source,
+    in seconds, with the legacy classification and with the kind codes.
+    """
+    tokenizer = JackTokenizer(io.StringIO(source))
+    tokens = tokenizer.tokens
+
+    def legacy() -> None:
+        for token in tokens:
+            legacy_token_type(token)
+
+    def precomputed() -> None:
+        for kind in tokenizer.token_kinds:
+            tokenizer.current_kind = kind
+            tokenizer.token_type()
+
+    legacy_time = min(timeit.repeat(legacy, number=20, repeat=repeat))
+    precomputed_time = min(timeit.repeat(precomputed, number=20, repeat=repeat))
+    calls = 20 * len(tokens)
+    return legacy_time / calls, precomputed_time / calls
+
+
+def main(corpora: typing.List[str]) -> None:
+    print(f"{'corpus':<24}{'tokens':>8}{'calls':>8}"
+          f"{'legacy us':>12}{'kinds us':>12}{'speedup':>9}")
+    for corpus in corpora:
+        sources = []
+        for filename in sorted(os.listdir(corpus)):
+            if filename.endswith(".jack"):
+                with open(os.path.join(corpus, filename)) as input_file:
+                    sources.append(input_file.read())
+        source = "".join(sources)
+        tokens, calls = count_classifications(source)
+        legacy, precomputed = time_per_call(source)
+        legacy_total = calls * legacy * 1e6
+        precomputed_total = calls * precomputed * 1e6
+        speedup = legacy_total / precomputed_total if precomputed_total else float("inf")
+        print(f"{os.path.basename(os.path.normpath(corpus)):<24}{tokens:>8}{calls:>8}"
+              f"{legacy_total:>12.1f}{precomputed_total:>12.1f}{speedup:>8.1f}x")
+
+
+if "__main__" == __name__:
+    main(sys.argv[1:] or DEFAULT_CORPORA)
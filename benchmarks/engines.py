@@ -0,0 +1,92 @@
+"""
+Compares the recursive CompilationEngine with IterativeCompilationEngine:
+their speed on a generated corpus, and how deeply nested code each one can
+compile (parenthesized expressions and while statements nested N levels
+deep). Both must produce the same XML.
+
+Usage: python3 -m benchmarks.engines [--nesting N] [--repeat N] [options]
+"""
+import argparse
+import io
+import random
+import time
+import typing
+
+from CompilationEngine import CompilationEngine
+from IterativeCompilationEngine import IterativeCompilationEngine
+from JackTokenizer import JackTokenizer
+from benchmarks import generator
+
+ENGINES = {"recursive": CompilationEngine,
+           "iterative": IterativeCompilationEngine}
+
+
+def compile_source(engine_class: type, source: str) -> str:
+    output = io.StringIO()
+    tokenizer = JackTokenizer(io.StringIO(source))
+    engine = engine_class(tokenizer, output)
+    engine.compile_classes()
+    return output.getvalue()
+
+
+def time_engine(engine_class: type, sources: typing.List[str],
+                repeat: int) -> float:
+    """Returns the fastest of several runs over the sources, in seconds,
+    leaving out tokenization.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        tokenizers = [JackTokenizer(io.StringIO(source)) for source in sources]
+        start = time.perf_counter()
+        for tokenizer in tokenizers:
+            engine = engine_class(tokenizer, io.StringIO())
+            engine.compile_classes()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def nested_source(depth: int) -> str:
+    """A class whose code is nested depth levels deep, both in statements
+    and in expressions.
+    """
+    return ("class Deep {\n  function int run() {\n    var int x;\n" +
+            "    while (x < 1) {\n" * depth +
+            "    let x = " + "(" * depth + "x" + ")" * depth + ";\n" +
+            "    }\n" * depth +
+            "    return x;\n  }\n}\n")
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Compares the recursive and the iterative engines.")
+    parser.add_argument("--nesting", type=int, default=5000,
+                        help="how deeply the deep source is nested")
+    parser.add_argument("--repeat", type=int, default=3)
+    generator.add_arguments(parser)
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    sources = [generator.ClassGenerator(
+                   rng, f"Generated{index:04d}", arguments.subroutines,
+                   arguments.depth, arguments.expression_length
+               ).generate() for index in range(arguments.classes)]
+    tokens = sum(len(JackTokenizer(io.StringIO(source)).tokens)
+                 for source in sources)
+    results = {name: compile_source(engine_class, "".join(sources))
+               for name, engine_class in ENGINES.items()}
+    assert results["recursive"] == results["iterative"], "different output"
+
+    print(f"corpus: {len(sources)} classes, {tokens} tokens")
+    for name, engine_class in ENGINES.items():
+        seconds = time_engine(engine_class, sources, arguments.repeat)
+        print(f"{name:<10}{seconds:>8.3f} s {tokens / seconds:>10.0f} tokens/s")
+
+    deep = nested_source(arguments.nesting)
+    print(f"nested {arguments.nesting} levels deep:")
+    for name, engine_class in ENGINES.items():
+        try:
+            start = time.perf_counter()
+            compile_source(engine_class, deep)
+            print(f"{name:<10}{time.perf_counter() - start:>8.3f} s")
+        except RecursionError:
+            print(f"{name:<10}RecursionError")
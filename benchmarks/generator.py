@@ -0,0 +1,202 @@
+"""
+Generates large, valid Jack programs for benchmarking. The output only
+depends on the parameters and the seed, so a corpus can be regenerated
+exactly on another machine or commit.
+
+Usage: python3 -m benchmarks.generator <output directory> [options]
+"""
+import argparse
+import os
+import random
+import typing
+
+OPERATIONS = ['+', '-', '*', '/', '&', '|', '<', '>', '=']
+UNARY_OPERATIONS = ['-', '~', '^', '#']
+KEYWORD_CONSTANTS = ['true', 'false', 'null']
+PRIMITIVE_TYPES = ['int', 'char', 'boolean']
+CLASS_TYPES = ['Array', 'String']
+
+
+class ClassGenerator:
+    """Writes the source of one random Jack class."""
+
+    def __init__(self, rng: random.Random, name: str, subroutines: int,
+                 depth: int, expression_length: int) -> None:
+        """
+        :param rng: The random source; all randomness comes from it.
+        :param name: The class name.
+        :param subroutines: How many subroutines the class declares.
+        :param depth: How deeply if and while statements are nested.
+        :param expression_length: How many terms a top-level expression has.
+        """
+        self.rng = rng
+        self.name = name
+        self.subroutines = subroutines
+        self.depth = depth
+        self.expression_length = expression_length
+        self.lines = []
+        self.variables = []
+        # the parameters of a class type, which methods are called on
+        self.objects = []
+
+    def generate(self) -> str:
+        """Returns the source of the class."""
+        self.lines.append(f"/** Generated benchmark class {self.name}. */")
+        self.lines.append(f"class {self.name} {{")
+        self.lines.append("    field int size, count;")
+        self.lines.append("    static boolean ready;")
+        self.lines.append("    field Array cells;")
+        self.lines.append("")
+        self.lines.append(f"    constructor {self.name} new(int initial) {{")
+        self.lines.append("        let size = initial;")
+        self.lines.append("        let count = 0;")
+        self.lines.append("        let cells = Array.new(initial);")
+        self.lines.append("        return this;")
+        self.lines.append("    }")
+        for index in range(self.subroutines):
+            self.subroutine(index)
+        self.lines.append("}")
+        return "\n".join(self.lines) + "\n"
+
+    def subroutine(self, index: int) -> None:
+        kind = self.rng.choice(["function", "method"])
+        returns_value = self.rng.random() < 0.7
+        return_type = self.rng.choice(PRIMITIVE_TYPES) if returns_value \
+            else "void"
+        parameters = [f"p{number}" for number in range(self.rng.randint(0, 3))]
+        types = [self.rng.choice(["int", "int"] + CLASS_TYPES + [self.name])
+                 for _ in parameters]
+        parameter_list = ", ".join(
+            f"{type_name} {parameter}"
+            for type_name, parameter in zip(types, parameters))
+        self.lines.append("")
+        self.lines.append(f"    // subroutine number {index}")
+        self.lines.append(f"    {kind} {return_type} run{index}"
+                          f"({parameter_list}) {{")
+        self.lines.append("        var int i, j, total;")
+        self.lines.append("        var Array buffer;")
+        self.variables = ["i", "j", "total"] + parameters
+        self.objects = [parameter for type_name, parameter
+                        in zip(types, parameters) if type_name != "int"]
+        if kind == "method":
+            self.variables += ["size", "count"]
+        self.statements(2, self.depth)
+        if returns_value:
+            self.lines.append(f"        return {self.expression(1)};")
+        else:
+            self.lines.append("        return;")
+        self.lines.append("    }")
+
+    def statements(self, indent: int, depth: int) -> None:
+        for _ in range(self.rng.randint(2, 5)):
+            self.statement(indent, depth)
+
+    def statement(self, indent: int, depth: int) -> None:
+        prefix = "    " * indent
+        choice = self.rng.random()
+        if depth > 0 and choice < 0.2:
+            self.lines.append(f"{prefix}if ({self.expression(1)}) {{")
+            self.statements(indent + 1, depth - 1)
+            if self.rng.random() < 0.5:
+                self.lines.append(f"{prefix}}} else {{")
+                self.statements(indent + 1, depth - 1)
+            self.lines.append(f"{prefix}}}")
+        elif depth > 0 and choice < 0.35:
+            self.lines.append(f"{prefix}while ({self.expression(1)}) {{")
+            self.statements(indent + 1, depth - 1)
+            self.lines.append(f"{prefix}}}")
+        elif self.objects and choice < 0.42:
+            self.lines.append(f"{prefix}do {self.rng.choice(self.objects)}"
+                              f".dispose();")
+        elif choice < 0.5:
+            self.lines.append(f"{prefix}do Output.printString"
+                              f"(\"value of {self.rng.choice(self.variables)}\");")
+        elif choice < 0.6:
+            self.lines.append(f"{prefix}do Output.printInt"
+                              f"({self.expression(1)});")
+        elif choice < 0.7:
+            self.lines.append(f"{prefix}let buffer[{self.expression(2)}] = "
+                              f"{self.expression(1)};  // store")
+        else:
+            self.lines.append(f"{prefix}let {self.rng.choice(self.variables)}"
+                              f" = {self.expression(1)};")
+
+    def expression(self, level: int) -> str:
+        length = max(1, self.expression_length // level)
+        parts = [self.term(level)]
+        for _ in range(length - 1):
+            parts.append(self.rng.choice(OPERATIONS))
+            parts.append(self.term(level))
+        return " ".join(parts)
+
+    def term(self, level: int) -> str:
+        choice = self.rng.random()
+        nested = level < 3
+        if choice < 0.27:
+            return str(self.rng.randint(0, 32767))
+        if choice < 0.5:
+            return self.rng.choice(self.variables)
+        if choice < 0.55:
+            return self.rng.choice(KEYWORD_CONSTANTS)
+        if choice < 0.6:
+            return f"\"text {self.rng.randint(0, 99)}\""
+        if nested and choice < 0.68:
+            return f"({self.expression(level + 1)})"
+        if nested and choice < 0.8:
+            return f"{self.rng.choice(UNARY_OPERATIONS)}{self.term(level + 1)}"
+        if nested and choice < 0.9:
+            return f"buffer[{self.expression(level + 1)}]"
+        if nested:
+            return f"Math.max({self.expression(level + 1)}, " \
+                   f"{self.term(level + 1)})"
+        return self.rng.choice(self.variables)
+
+
+def generate_corpus(directory: str, classes: int = 10, subroutines: int = 20,
+                    depth: int = 3, expression_length: int = 6,
+                    seed: int = 0) -> typing.List[str]:
+    """Writes a corpus of generated classes, one .jack file per class.
+
+    Args:
+        directory (str): where to write the files; created if needed.
+        classes (int): how many classes to generate.
+        subroutines (int): how many subroutines each class declares.
+        depth (int): how deeply if and while statements are nested.
+        expression_length (int): how many terms a top-level expression has.
+        seed (int): the random seed.
+
+    Returns:
+        typing.List[str]: the paths of the written files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for index in range(classes):
+        name = f"Generated{index:04d}"
+        source = ClassGenerator(rng, name, subroutines, depth,
+                                expression_length).generate()
+        path = os.path.join(directory, name + ".jack")
+        with open(path, 'w') as output_file:
+            output_file.write(source)
+        paths.append(path)
+    return paths
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the corpus shape options to a command line parser."""
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--subroutines", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--expression-length", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Generates a corpus of valid Jack classes.")
+    parser.add_argument("directory")
+    add_arguments(parser)
+    arguments = parser.parse_args()
+    generate_corpus(arguments.directory, arguments.classes,
+                    arguments.subroutines, arguments.depth,
+                    arguments.expression_length, arguments.seed)
@@ -0,0 +1,74 @@
+"""
+Compares the ParseHandler backends of the engine on a generated corpus: the
+same parse reported to XmlWriter, JsonWriter, ParseTree.TreeBuilder,
+BinaryTreeWriter, CountingHandler and to a ParseHandler that ignores it.
+The last one measures the parse alone; the difference to it is what each
+backend costs.
+
+Usage: python3 -m benchmarks.handlers [--repeat N] [options]
+"""
+import argparse
+import io
+import random
+import time
+import typing
+
+from BinaryParseTree import BinaryTreeWriter
+from CompilationEngine import CompilationEngine
+from JackTokenizer import JackTokenizer
+from JsonWriter import JsonWriter
+from ParseHandler import CountingHandler, ParseHandler
+from ParseTree import TreeBuilder
+from XmlWriter import XmlWriter
+from benchmarks import generator
+
+
+# Creates a fresh handler of each backend for every run.
+HANDLERS = {
+    "xml": lambda: XmlWriter(io.StringIO()),
+    "json": lambda: JsonWriter(io.StringIO()),
+    "tree": TreeBuilder,
+    "binary": lambda: BinaryTreeWriter(io.BytesIO()),
+    "counting": CountingHandler,
+    "no-op": ParseHandler,
+}
+
+
+def time_handler(create: typing.Callable[[], ParseHandler],
+                 sources: typing.List[str], repeat: int) -> float:
+    """Returns the fastest of several runs over the sources, in seconds,
+    leaving out tokenization.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        tokenizers = [JackTokenizer(io.StringIO(source)) for source in sources]
+        start = time.perf_counter()
+        for tokenizer in tokenizers:
+            engine = CompilationEngine(tokenizer, None, writer=create())
+            engine.compile_classes()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Compares the backends the engine reports its parse to.")
+    parser.add_argument("--repeat", type=int, default=3)
+    generator.add_arguments(parser)
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    sources = [generator.ClassGenerator(
+                   rng, f"Generated{index:04d}", arguments.subroutines,
+                   arguments.depth, arguments.expression_length
+               ).generate() for index in range(arguments.classes)]
+    tokens = sum(len(JackTokenizer(io.StringIO(source)).tokens)
+                 for source in sources)
+
+    print(f"corpus: {len(sources)} classes, {tokens} tokens")
+    results = {name: time_handler(create, sources, arguments.repeat)
+               for name, create in HANDLERS.items()}
+    baseline = results["no-op"]
+    for name, seconds in results.items():
+        print(f"{name:<10}{seconds:>8.3f} s {tokens / seconds:>10.0f} tokens/s"
+              f"{seconds / baseline:>8.2f}x the parse alone")
@@ -0,0 +1,50 @@
+"""
+Measures how long IncrementalParser takes to update the parse tree of a
+large class after a small edit inside one of its subroutines, next to
+parsing the edited class from scratch.
+
+Usage: python3 -m benchmarks.incremental [--subroutines N] [--edits N]
+"""
+import argparse
+import random
+import re
+import time
+
+from IncrementalParser import IncrementalParser
+from benchmarks.generator import ClassGenerator
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Times incremental re-parsing of a large class.")
+    parser.add_argument("--subroutines", type=int, default=250,
+                        help="subroutines in the generated class "
+                             "(250 make about 10k lines)")
+    parser.add_argument("--edits", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    source = ClassGenerator(rng, "Large", arguments.subroutines, 3, 6).generate()
+    start = time.perf_counter()
+    parse = IncrementalParser(source)
+    full_time = time.perf_counter() - start
+
+    # rename a variable in a random statement: the edit stays within a
+    # subroutine and keeps the class valid
+    targets = [match.start(1) for match in
+               re.finditer(r"let (i|j|total) = ", source)]
+    incremental = 0
+    start = time.perf_counter()
+    for _ in range(arguments.edits):
+        offset = rng.choice(targets)
+        name = parse.source[offset]
+        replacement = rng.choice([other for other in "ij" if other != name])
+        if parse.edit(offset, offset + 1, replacement) is not None:
+            incremental += 1
+    edit_time = (time.perf_counter() - start) / arguments.edits
+
+    print(f"class: {source.count(chr(10))} lines, "
+          f"{arguments.subroutines} subroutines")
+    print(f"full parse: {full_time * 1000:.1f} ms")
+    print(f"edit: {edit_time * 1000:.2f} ms on average, "
+          f"{incremental} of {arguments.edits} re-parsed incrementally")
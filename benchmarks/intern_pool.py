@@ -0,0 +1,90 @@
+"""
+Reports how much memory a shared InternPool saves when the tokens or the
+parse trees of every file of a generated corpus are held at once: trees
+parsed without and with a pool, and token lists without a pool, with one,
+and as IDs in the pool (token_ids). The pool itself is counted.
+
+Usage: python3 -m benchmarks.intern_pool [options]
+"""
+import argparse
+import io
+import random
+import time
+import tracemalloc
+import typing
+
+import ParseTree
+from JackTokenizer import InternPool, JackTokenizer
+from benchmarks import generator
+
+
+Loader = typing.Callable[[str, typing.Optional[InternPool]], typing.Any]
+
+
+def load_all(load: Loader, sources: typing.List[str], shared: bool
+             ) -> typing.Tuple[list, typing.Optional[InternPool]]:
+    """Loads every source, with a pool shared by all of them if asked to."""
+    pool = InternPool() if shared else None
+    return [load(source, pool) for source in sources], pool
+
+
+def held_bytes(load: Loader, sources: typing.List[str], shared: bool
+               ) -> typing.Tuple[int, float, int]:
+    """Loads every source, keeping all the results.
+
+    Returns:
+        typing.Tuple[int, float, int]: how many bytes the results and the
+        pool take, how long loading took in seconds (timed without
+        tracemalloc), and the pool's size.
+    """
+    start = time.perf_counter()
+    results = load_all(load, sources, shared)
+    seconds = time.perf_counter() - start
+    del results
+    tracemalloc.start()
+    results, pool = load_all(load, sources, shared)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del results
+    return size, seconds, len(pool) if shared else 0
+
+
+# What is held of every file: (name, loader, the name of the loader its
+# pooled runs are compared with)
+LOADERS = (
+    ("trees", lambda source, pool: ParseTree.parse(io.StringIO(source), pool),
+     "trees"),
+    ("tokens", lambda source, pool: JackTokenizer(
+        io.StringIO(source), pool=pool).tokens, "tokens"),
+    ("token IDs", lambda source, pool: JackTokenizer(
+        io.StringIO(source), pool=pool, token_ids=True).token_ids,
+     "tokens"),
+)
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Reports the memory a shared intern pool saves.")
+    generator.add_arguments(parser)
+    parser.set_defaults(classes=200, subroutines=5)
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    sources = [generator.ClassGenerator(
+                   rng, f"Generated{index:04d}", arguments.subroutines,
+                   arguments.depth, arguments.expression_length
+               ).generate() for index in range(arguments.classes)]
+    tokens = sum(len(JackTokenizer(io.StringIO(source)).tokens)
+                 for source in sources)
+    print(f"corpus: {len(sources)} files, {tokens} tokens")
+    print(f"{'held':<12}{'pool':>6}{'bytes':>14}{'bytes/token':>13}"
+          f"{'saved':>8}{'seconds':>9}")
+    unshared = {}
+    for name, load, compared_with in LOADERS:
+        # token IDs only exist in a pool
+        for shared in (False, True) if name == compared_with else (True,):
+            size, seconds, pool_size = held_bytes(load, sources, shared)
+            baseline = unshared.setdefault(compared_with, size)
+            print(f"{name:<12}{pool_size if shared else '-':>6}{size:>14}"
+                  f"{size / tokens:>13.1f}{1 - size / baseline:>8.1%}"
+                  f"{seconds:>9.3f}")
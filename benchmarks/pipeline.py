@@ -0,0 +1,78 @@
+"""
+Measures how well the asyncio pipeline (JackAnalyzer --io-threads) hides
+the latency of a slow disk: every file opened for reading or writing first
+waits a simulated round trip, as on a network file system. Reports the
+CPU-bound time (no latency), the time of analyzing the files one after the
+other with latency, and that of the pipeline with latency.
+
+Usage: python3 -m benchmarks.pipeline [--latency MS] [--io-threads N ...]
+"""
+import argparse
+import builtins
+import tempfile
+import time
+import typing
+
+import AnalysisPipeline
+import JackAnalyzer
+from benchmarks import generator
+
+
+def slow_open(latency: float) -> typing.Callable:
+    def open_after_round_trip(*args, **kwargs):
+        time.sleep(latency)
+        return builtins.open(*args, **kwargs)
+    return open_after_round_trip
+
+
+def set_latency(latency: float) -> None:
+    """Makes the analyzer wait latency seconds whenever it opens a file."""
+    for module in (JackAnalyzer, AnalysisPipeline):
+        if latency:
+            module.open = slow_open(latency)
+        elif hasattr(module, "open"):
+            del module.open
+
+
+def time_serial(paths: typing.List[str]) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        assert JackAnalyzer.analyze_path(path) is None
+    return time.perf_counter() - start
+
+
+def time_pipeline(paths: typing.List[str], io_threads: int,
+                  jobs: int) -> float:
+    start = time.perf_counter()
+    errors = JackAnalyzer.analyze_paths_pipelined(paths, jobs, io_threads)
+    assert not any(errors)
+    return time.perf_counter() - start
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Measures the I/O pipeline on a simulated slow disk.")
+    parser.add_argument("--latency", type=float, default=20,
+                        help="milliseconds each open of a file takes")
+    parser.add_argument("--io-threads", type=int, nargs="+",
+                        default=[1, 4, 16, 64])
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    generator.add_arguments(parser)
+    parser.set_defaults(classes=200, subroutines=5)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generator.generate_corpus(
+            directory, arguments.classes, arguments.subroutines,
+            arguments.depth, arguments.expression_length, arguments.seed)
+        print(f"corpus: {len(paths)} files, {arguments.latency:g} ms per "
+              f"open, {arguments.jobs} analysis jobs")
+        cpu_bound = time_serial(paths)
+        print(f"{'no latency':<22}{cpu_bound:>8.3f} s")
+        set_latency(arguments.latency / 1000)
+        print(f"{'one after the other':<22}{time_serial(paths):>8.3f} s")
+        for io_threads in arguments.io_threads:
+            seconds = time_pipeline(paths, io_threads, arguments.jobs)
+            print(f"{f'pipeline, {io_threads} threads':<22}{seconds:>8.3f} s"
+                  f"{cpu_bound / seconds:>8.0%} of CPU-bound throughput")
+        set_latency(0)
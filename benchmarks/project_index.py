@@ -0,0 +1,72 @@
+"""
+Measures ProjectIndex on a generated project: indexing it from scratch,
+updating the index when nothing changed and when a single file changed,
+and how long go-to-definition and find-callers queries take.
+
+Usage: python3 -m benchmarks.project_index [--queries N] [options]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from ProjectIndex import ProjectIndex
+from benchmarks import generator
+
+
+def timed(function, *arguments):
+    """Returns what a function returned, and how long it took in seconds."""
+    start = time.perf_counter()
+    result = function(*arguments)
+    return result, time.perf_counter() - start
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Measures building and querying the project index.")
+    parser.add_argument("--queries", type=int, default=1000,
+                        help="how many queries of each kind to time")
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    generator.add_arguments(parser)
+    parser.set_defaults(classes=2000, subroutines=5)
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generator.generate_corpus(
+            directory, arguments.classes, arguments.subroutines,
+            arguments.depth, arguments.expression_length, arguments.seed)
+        index_path = os.path.join(directory, "index.sqlite")
+        with ProjectIndex(index_path) as index:
+            (scanned, _), seconds = timed(index.update, directory,
+                                          arguments.jobs)
+            print(f"index {len(scanned)} files{seconds:>16.3f} s")
+            (scanned, _), seconds = timed(index.update, directory)
+            print(f"update, nothing changed{seconds:>12.3f} s")
+            with open(paths[0], 'a') as changed_file:
+                changed_file.write("// changed\n")
+            os.utime(paths[0], ns=(0, 0))
+            (scanned, _), seconds = timed(index.update, directory)
+            assert len(scanned) == 1
+            print(f"update, one file changed{seconds:>11.3f} s")
+            print(f"index database{os.path.getsize(index_path):>21} bytes")
+
+            names = [(f"Generated{rng.randrange(arguments.classes):04d}."
+                      f"run{rng.randrange(arguments.subroutines)}")
+                     for _ in range(arguments.queries)]
+            start = time.perf_counter()
+            for name in names:
+                assert len(index.definitions(name)) == 1
+            seconds = time.perf_counter() - start
+            print(f"go-to-definition{seconds / len(names) * 1000:>16.3f} ms "
+                  f"per query")
+            start = time.perf_counter()
+            for name in names:
+                index.callers(name)
+            seconds = time.perf_counter() - start
+            print(f"find-callers{seconds / len(names) * 1000:>20.3f} ms "
+                  f"per query")
+            callers, seconds = timed(index.callers, "Output.printInt")
+            print(f"find-callers of Output.printInt{seconds * 1000:>9.3f} ms "
+                  f"for {len(callers)} calls")
@@ -0,0 +1,191 @@
+"""
+Measures the analyzer's throughput on a corpus, phase by phase:
+
+- tokenize: constructing a JackTokenizer for every source.
+- compile: CompilationEngine.compile_class over already built tokenizers.
+- analyze: the whole analyze_file run, from the .jack file to the .xml file.
+
+Every phase runs in a fresh interpreter, so the peak RSS it reports is its
+own. The results are written as JSON; pass an earlier result file with
+--compare to see how throughput changed since then.
+
+Usage: python3 -m benchmarks.run [corpus directory] [options]
+With no corpus directory, a corpus is generated (see benchmarks.generator).
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+from benchmarks import generator
+
+PHASES = ("tokenize", "compile", "analyze")
+
+
+def jack_files(directory: str) -> typing.List[str]:
+    return [os.path.join(directory, filename)
+            for filename in sorted(os.listdir(directory))
+            if filename.endswith(".jack")]
+
+
+def peak_rss_kb() -> int:
+    """Returns the peak resident set size of this process, in kilobytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_phase(phase: str, directory: str, repeat: int) -> dict:
+    """Runs one phase over a corpus and returns its measurements. Meant to
+    be called in a fresh interpreter, see measure_phase.
+    """
+    import JackAnalyzer
+    from CompilationEngine import CompilationEngine
+    from JackTokenizer import JackTokenizer
+
+    paths = jack_files(directory)
+    sources = []
+    for path in paths:
+        with open(path) as input_file:
+            sources.append(input_file.read())
+    tokens = sum(len(JackTokenizer(io.StringIO(source)).tokens)
+                 for source in sources)
+    rss_before = peak_rss_kb()
+
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as output_directory:
+        for _ in range(repeat):
+            if phase == "tokenize":
+                start = time.perf_counter()
+                for source in sources:
+                    JackTokenizer(io.StringIO(source))
+            elif phase == "compile":
+                tokenizers = [JackTokenizer(io.StringIO(source))
+                              for source in sources]
+                start = time.perf_counter()
+                for tokenizer in tokenizers:
+                    engine = CompilationEngine(tokenizer, io.StringIO())
+                    engine.compile_classes()
+            else:
+                start = time.perf_counter()
+                for path in paths:
+                    output_path = os.path.join(
+                        output_directory, os.path.basename(path) + ".xml")
+                    with open(path, 'r') as input_file, \
+                            open(output_path, 'w') as output_file:
+                        JackAnalyzer.analyze_file(input_file, output_file)
+            best = min(best, time.perf_counter() - start)
+
+    source_bytes = sum(len(source.encode()) for source in sources)
+    return {
+        "seconds": best,
+        "tokens_per_sec": tokens / best,
+        "bytes_per_sec": source_bytes / best,
+        "rss_before_kb": rss_before,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def measure_phase(phase: str, directory: str, repeat: int) -> dict:
+    """Runs a phase in a fresh interpreter and returns its measurements."""
+    repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--phase", phase,
+         "--repeat", str(repeat), directory],
+        cwd=repository, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout)
+
+
+def current_commit() -> typing.Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def benchmark(directory: str, repeat: int, corpus: dict) -> dict:
+    from JackTokenizer import JackTokenizer
+
+    paths = jack_files(directory)
+    corpus = dict(corpus, files=len(paths), bytes=0, tokens=0)
+    for path in paths:
+        with open(path) as input_file:
+            source = input_file.read()
+        corpus["bytes"] += len(source.encode())
+        corpus["tokens"] += len(JackTokenizer(io.StringIO(source)).tokens)
+    return {
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "corpus": corpus,
+        "phases": {phase: measure_phase(phase, directory, repeat)
+                   for phase in PHASES},
+    }
+
+
+def report(results: dict, previous: typing.Optional[dict]) -> None:
+    corpus = results["corpus"]
+    print(f"corpus: {corpus['files']} files, {corpus['bytes']} bytes, "
+          f"{corpus['tokens']} tokens")
+    print(f"{'phase':<10}{'seconds':>10}{'tokens/s':>12}{'MB/s':>8}"
+          f"{'peak RSS MB':>13}" + ("  vs previous" if previous else ""))
+    for phase, result in results["phases"].items():
+        line = f"{phase:<10}{result['seconds']:>10.3f}" \
+               f"{result['tokens_per_sec']:>12.0f}" \
+               f"{result['bytes_per_sec'] / 1e6:>8.2f}" \
+               f"{result['peak_rss_kb'] / 1024:>13.1f}"
+        if previous and phase in previous["phases"]:
+            ratio = result["tokens_per_sec"] / \
+                previous["phases"][phase]["tokens_per_sec"]
+            line += f"  {ratio:.2f}x throughput"
+        print(line)
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Measures analyzer throughput on a Jack corpus.")
+    parser.add_argument("directory", nargs="?",
+                        help="corpus to measure; generated if omitted")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="runs per phase; the fastest one is reported")
+    parser.add_argument("--output", default="bench_output.json",
+                        help="where to write the JSON results")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    parser.add_argument("--phase", choices=PHASES, help=argparse.SUPPRESS)
+    generator.add_arguments(parser)
+    arguments = parser.parse_args()
+
+    if arguments.phase:
+        print(json.dumps(run_phase(arguments.phase, arguments.directory,
+                                   arguments.repeat)))
+        sys.exit()
+
+    previous = None
+    if arguments.compare:
+        with open(arguments.compare) as previous_file:
+            previous = json.load(previous_file)
+    if arguments.directory:
+        results = benchmark(arguments.directory, arguments.repeat,
+                            {"directory": arguments.directory})
+    else:
+        shape = {"classes": arguments.classes,
+                 "subroutines": arguments.subroutines,
+                 "depth": arguments.depth,
+                 "expression_length": arguments.expression_length,
+                 "seed": arguments.seed}
+        with tempfile.TemporaryDirectory() as directory:
+            generator.generate_corpus(directory, **shape)
+            results = benchmark(directory, arguments.repeat,
+                                {"generated": shape})
+    with open(arguments.output, 'w') as output_file:
+        json.dump(results, output_file, indent=2)
+    report(results, previous)
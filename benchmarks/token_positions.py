@@ -0,0 +1,91 @@
+"""
+Measures what recording token positions costs JackTokenizer on a generated
+corpus: lexing time and the memory the tokens take, compared with lexing
+the same source into tokens and kinds only, and how long looking up the
+line and column of a token takes.
+
+Usage: python3 -m benchmarks.token_positions [--repeat N] [options]
+"""
+import argparse
+import io
+import random
+import time
+import tracemalloc
+import typing
+from array import array
+
+from JackTokenizer import JackTokenizer, TOKEN_PATTERN
+from benchmarks import generator
+
+
+def lex_without_positions(source: str) -> typing.Tuple[list, array]:
+    """Lexes a source like JackTokenizer, but keeps no positions."""
+    tokens = []
+    kinds = array('B')
+    append_token = tokens.append
+    append_kind = kinds.append
+    for match in TOKEN_PATTERN.finditer(source):
+        group = match.lastindex
+        if group:
+            append_token(match.group(group))
+            append_kind(group)
+    return tokens, kinds
+
+
+def lex_with_positions(source: str) -> JackTokenizer:
+    return JackTokenizer(io.StringIO(source))
+
+
+def measure(lex: typing.Callable[[str], typing.Any], source: str,
+            repeat: int) -> typing.Tuple[float, int]:
+    """Returns the fastest of several runs in seconds, and how many bytes
+    what the lexer returned holds on to.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        lex(source)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    result = lex(source)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return best, size
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(
+        description="Measures the cost of recording token positions.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--lookups", type=int, default=100000,
+                        help="how many token positions to look up")
+    generator.add_arguments(parser)
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    source = "".join(generator.ClassGenerator(
+                         rng, f"Generated{index:04d}", arguments.subroutines,
+                         arguments.depth, arguments.expression_length
+                     ).generate() for index in range(arguments.classes))
+    without_seconds, without_bytes = measure(lex_without_positions, source,
+                                             arguments.repeat)
+    with_seconds, with_bytes = measure(lex_with_positions, source,
+                                       arguments.repeat)
+    tokenizer = lex_with_positions(source)
+    tokens = len(tokenizer.tokens)
+    print(f"corpus: {len(source)} characters, {tokens} tokens")
+    print(f"{'':<18}{'seconds':>10}{'tokens/s':>12}{'bytes':>12}")
+    print(f"{'without positions':<18}{without_seconds:>10.3f}"
+          f"{tokens / without_seconds:>12.0f}{without_bytes:>12}")
+    print(f"{'with positions':<18}{with_seconds:>10.3f}"
+          f"{tokens / with_seconds:>12.0f}{with_bytes:>12}")
+    print(f"overhead: {with_seconds / without_seconds - 1:+.1%} time, "
+          f"{with_bytes / without_bytes - 1:+.1%} memory "
+          f"({(with_bytes - without_bytes) / tokens:.2f} bytes per token)")
+    indices = [rng.randrange(tokens) for _ in range(arguments.lookups)]
+    start = time.perf_counter()
+    for index in indices:
+        tokenizer.position(index)
+    seconds = time.perf_counter() - start
+    print(f"position(): {seconds / len(indices) * 1e6:.2f} us per lookup")
@@ -0,0 +1,81 @@
+"""
+Measures how much memory parse trees take per token, and compares building
+a tree once and serializing it several times with re-parsing the source
+for every consumer.
+
+Without arguments, it measures the Square and ExpressionLessSquare samples,
+and then SquareGame.jack repeated 300 times: the figures TreeBuilder
+documents.
+
+Usage: python3 -m benchmarks.tree_memory [.jack file or directory ...]
+"""
+import io
+import os
+import sys
+import time
+import tracemalloc
+import typing
+
+import JackAnalyzer
+import ParseTree
+from JackTokenizer import JackTokenizer
+
+DEFAULT_CORPORA = ["Square", "ExpressionLessSquare"]
+# a larger default workload: this file, this many times over
+REPEATED_FILE = os.path.join("Square", "SquareGame.jack")
+REPEATS = 300
+CONSUMERS = 3
+
+
+def read_sources(paths: typing.List[str]) -> typing.List[str]:
+    """Returns the contents of every .jack file among the given paths."""
+    file_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            file_paths.extend(os.path.join(path, filename)
+                              for filename in sorted(os.listdir(path))
+                              if filename.endswith(".jack"))
+        else:
+            file_paths.append(path)
+    sources = []
+    for file_path in file_paths:
+        with open(file_path) as input_file:
+            sources.append(input_file.read())
+    return sources
+
+
+def measure(name: str, sources: typing.List[str]) -> None:
+    tokens = sum(len(JackTokenizer(io.StringIO(source)).tokens)
+                 for source in sources)
+    tracemalloc.start()
+    trees = [ParseTree.parse(io.StringIO(source)) for source in sources]
+    tree_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for _ in range(CONSUMERS):
+        for source in sources:
+            JackAnalyzer.analyze_file(io.StringIO(source), io.StringIO())
+    reparse_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    trees = [ParseTree.parse(io.StringIO(source)) for source in sources]
+    for _ in range(CONSUMERS):
+        for classes in trees:
+            for node in classes:
+                ParseTree.write_xml(node, io.StringIO())
+    tree_time = time.perf_counter() - start
+
+    print(f"{name}: tokens: {tokens}, tree memory: {tree_bytes} bytes "
+          f"({tree_bytes / tokens:.0f} bytes/token)")
+    print(f"{CONSUMERS} consumers: re-parse {reparse_time * 1000:.1f} ms, "
+          f"parse once + serialize {tree_time * 1000:.1f} ms")
+
+
+if "__main__" == __name__:
+    if sys.argv[1:]:
+        measure(" ".join(sys.argv[1:]), read_sources(sys.argv[1:]))
+    else:
+        measure(" ".join(DEFAULT_CORPORA), read_sources(DEFAULT_CORPORA))
+        measure(f"{REPEATED_FILE} x {REPEATS}",
+                read_sources([REPEATED_FILE]) * REPEATS)
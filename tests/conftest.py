@@ -0,0 +1,25 @@
+"""
+The analyzer's modules live at the top of the repository, next to the
+sample directories the tests compare against.
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY not in sys.path:
+    sys.path.insert(0, REPOSITORY)
+
+
+@pytest.fixture
+def sample_copy(tmp_path):
+    """A copy of the Square sample without its golden files."""
+    directory = tmp_path / "Square"
+    directory.mkdir()
+    for filename in os.listdir(os.path.join(REPOSITORY, "Square")):
+        if filename.endswith(".jack"):
+            shutil.copy(os.path.join(REPOSITORY, "Square", filename),
+                        directory)
+    return directory
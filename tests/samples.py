@@ -0,0 +1,49 @@
+"""
+The sample programs next to the analyzer, and the XML the default,
+streaming analysis writes for them, which every other mode is compared with.
+"""
+import io
+import os
+import typing
+
+import JackAnalyzer
+from JackTokenizer import JackTokenizer
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES = ["Square", "ExpressionLessSquare", "ArrayTest"]
+JACK_FILES = sorted(
+    os.path.join(sample, filename) for sample in SAMPLES
+    for filename in os.listdir(os.path.join(REPOSITORY, sample))
+    if filename.endswith(".jack"))
+
+
+def read(path: str) -> str:
+    with open(os.path.join(REPOSITORY, path), 'r') as input_file:
+        return input_file.read()
+
+
+def expected_xml(jack_file: str) -> str:
+    """The XML of the default, streaming analysis."""
+    output = io.StringIO()
+    with open(os.path.join(REPOSITORY, jack_file), 'r') as input_file:
+        JackAnalyzer.analyze_file(input_file, output)
+    return output.getvalue()
+
+
+def compiled(tokenizer: JackTokenizer, **options) -> str:
+    output = io.StringIO()
+    JackAnalyzer.compile_tokens(tokenizer, output, **options)
+    return output.getvalue()
+
+
+def written_xml(directory) -> typing.Dict[str, str]:
+    """The .xml files in a directory, by name."""
+    return {path.name: path.read_text() for path in directory.glob("*.xml")}
+
+
+def square_xml() -> typing.Dict[str, str]:
+    """The .xml files analyzing the Square sample writes, by name."""
+    return {filename[:-len(".jack")] + ".xml":
+            expected_xml(os.path.join("Square", filename))
+            for filename in os.listdir(os.path.join(REPOSITORY, "Square"))
+            if filename.endswith(".jack")}
@@ -0,0 +1,70 @@
+import os
+import threading
+import time
+
+import JackAnalyzer
+from AnalysisCache import AnalysisCache
+from samples import square_xml, written_xml
+
+
+def test_keys_depend_on_source_variant_and_analyzer(tmp_path):
+    cache = AnalysisCache(str(tmp_path))
+    key = cache.key(b"class Main { }")
+    assert cache.key(b"class Main { }") == key
+    assert cache.key(b"class Main {  }") != key
+    assert cache.key(b"class Main { }", "tokens") != key
+    cache.fingerprint = "a changed analyzer"
+    assert cache.key(b"class Main { }") != key
+
+
+def test_get_and_put(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    key = cache.key(b"source")
+    assert cache.get(key) is None
+    cache.put(key, "<tokens>\r\n</tokens>\n")
+    assert cache.get(key) == "<tokens>\r\n</tokens>\n"
+
+
+def test_concurrent_puts_of_the_same_key(tmp_path):
+    cache = AnalysisCache(str(tmp_path))
+    result = "x" * 1_000_000
+    threads = [threading.Thread(target=cache.put, args=("key", result))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.get("key") == result
+    assert os.listdir(str(tmp_path)) == ["key.xml"]
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = AnalysisCache(str(tmp_path), max_bytes=250)
+    for key in ("old", "used", "new"):
+        cache.put(key, "x" * 100)
+    past = time.time() - 100
+    for age, key in enumerate(("old", "used", "new")):
+        os.utime(str(tmp_path / f"{key}.xml"), (past + age, past + age))
+    cache.get("used")  # touches it
+    cache.prune()
+    assert sorted(os.listdir(str(tmp_path))) == ["new.xml", "used.xml"]
+
+
+def test_analyze_path_cached(sample_copy):
+    input_paths = JackAnalyzer.list_jack_files(str(sample_copy))
+    cache = JackAnalyzer.default_cache(str(sample_copy))
+    for _ in range(2):  # a miss, and then a hit
+        for input_path in input_paths:
+            assert JackAnalyzer.analyze_path(input_path, cache) is None
+        assert written_xml(sample_copy) == square_xml()
+    assert len(os.listdir(cache.directory)) == len(input_paths)
+
+
+def test_changed_source_is_analyzed_again(sample_copy):
+    input_path = str(sample_copy / "Main.jack")
+    cache = JackAnalyzer.default_cache(str(sample_copy))
+    assert JackAnalyzer.analyze_path(input_path, cache) is None
+    (sample_copy / "Main.jack").write_text("class Main { }\n")
+    assert JackAnalyzer.analyze_path(input_path, cache) is None
+    assert (sample_copy / "Main.xml").read_text() == \
+        JackAnalyzer.analyze_source("class Main { }\n")
@@ -0,0 +1,36 @@
+import pytest
+
+import JackAnalyzer
+from samples import JACK_FILES, expected_xml, read
+
+
+def test_analyze_source():
+    assert JackAnalyzer.analyze_source(read(JACK_FILES[0])) == \
+        expected_xml(JACK_FILES[0])
+
+
+@pytest.mark.parametrize("jobs", [1, 2, 0])
+def test_analyze_sources(jobs):
+    sources = {jack_file: read(jack_file) for jack_file in JACK_FILES}
+    results = JackAnalyzer.analyze_sources(sources, jobs)
+    assert list(results) == list(sources)
+    assert results == {jack_file: expected_xml(jack_file)
+                       for jack_file in JACK_FILES}
+
+
+def test_iter_analyze_sources_reports_each_error():
+    results = list(JackAnalyzer.iter_analyze_sources(
+        {"good": read(JACK_FILES[0]), "broken": "class {"}))
+    assert [(name, xml is None, error is None)
+            for name, xml, error in results] == \
+        [("good", False, True), ("broken", True, False)]
+
+
+def test_analyze_sources_raises_on_errors():
+    with pytest.raises(ValueError, match="broken"):
+        JackAnalyzer.analyze_sources({"broken": "class {"})
+
+
+def test_negative_jobs():
+    with pytest.raises(ValueError):
+        JackAnalyzer.analyze_sources({}, jobs=-1)
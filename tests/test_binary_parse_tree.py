@@ -0,0 +1,76 @@
+import io
+
+import pytest
+
+import JackAnalyzer
+import ParseTree
+from BinaryParseTree import BinaryTreeReader, MAGIC, write_binary
+from samples import JACK_FILES, expected_xml, read
+UNICODE_SOURCE = '''class Main {
+    function void main() {
+        do Output.printString("héllo wörld ✓");
+        do Output.printString("");
+        return;
+    }
+}
+'''
+
+
+def parsed(source: str):
+    return ParseTree.parse(io.StringIO(source))
+
+
+def as_xml(classes) -> str:
+    output = io.StringIO()
+    for node in classes:
+        ParseTree.write_xml(node, output)
+    return output.getvalue()
+
+
+def written(tmp_path, classes) -> str:
+    path = str(tmp_path / "trees.jpt")
+    with open(path, 'wb') as output_file:
+        write_binary(classes, output_file)
+    return path
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_round_trip(tmp_path, jack_file):
+    classes = parsed(read(jack_file))
+    with BinaryTreeReader(written(tmp_path, classes)) as reader:
+        output = io.StringIO()
+        reader.write_xml(output)
+        assert output.getvalue() == as_xml(classes)
+        assert as_xml(reader.classes()) == as_xml(classes)
+
+
+def test_replay_through_tree_builder(tmp_path):
+    classes = parsed(UNICODE_SOURCE)
+    builder = ParseTree.TreeBuilder()
+    with BinaryTreeReader(written(tmp_path, classes)) as reader:
+        reader.replay(builder)
+    assert as_xml(builder.classes) == as_xml(classes)
+
+
+def test_several_classes(tmp_path):
+    classes = parsed(UNICODE_SOURCE) + parsed("class Other { }")
+    with BinaryTreeReader(written(tmp_path, classes)) as reader:
+        assert [node.children[1].text for node in reader.classes()] == \
+            ["Main", "Other"]
+
+
+@pytest.mark.parametrize("content", [b"", MAGIC, b"<class>\n" * 10])
+def test_rejects_other_files(tmp_path, content):
+    path = tmp_path / "other.jpt"
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        BinaryTreeReader(str(path))
+
+
+def test_analyze_path_binary(sample_copy):
+    input_path = str(sample_copy / "Main.jack")
+    assert JackAnalyzer.analyze_path(input_path, binary=True) is None
+    with BinaryTreeReader(str(sample_copy / "Main.jpt")) as reader:
+        output = io.StringIO()
+        reader.write_xml(output)
+    assert output.getvalue() == expected_xml("Square/Main.jack")
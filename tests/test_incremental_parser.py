@@ -0,0 +1,94 @@
+import io
+
+import pytest
+
+import ParseTree
+from IncrementalParser import IncrementalParser
+from samples import JACK_FILES, expected_xml, read
+
+SOURCE = '''class Counter {
+    field int count;
+
+    method void increment() {
+        let count = count + 1;
+        return;
+    }
+
+    method int get() {
+        return count;
+    }
+}
+'''
+
+
+def full_parse_xml(source: str) -> str:
+    output = io.StringIO()
+    for node in ParseTree.parse(io.StringIO(source)):
+        ParseTree.write_xml(node, output)
+    return output.getvalue()
+
+
+def tree_xml(parser: IncrementalParser) -> str:
+    output = io.StringIO()
+    parser.write_xml(output)
+    return output.getvalue()
+
+
+def edit(parser: IncrementalParser, old: str, new: str):
+    start = parser.source.index(old)
+    return parser.edit(start, start + len(old), new)
+
+
+def test_edit_within_a_subroutine():
+    parser = IncrementalParser(SOURCE)
+    node = edit(parser, "count + 1", "count + 2 * count")
+    assert node is not None and node.rule == "subroutineDec"
+    assert tree_xml(parser) == full_parse_xml(parser.source)
+
+
+def test_edits_shift_later_subroutines():
+    parser = IncrementalParser(SOURCE)
+    assert edit(parser, "let count = count + 1;",
+                "let count = count + 1;\n        do Output.println();") \
+        is not None
+    node = edit(parser, "return count;", "return count + 1;")
+    assert node is not None
+    assert tree_xml(parser) == full_parse_xml(parser.source)
+
+
+def test_edit_outside_subroutines_reparses_everything():
+    parser = IncrementalParser(SOURCE)
+    assert edit(parser, "field int count;", "field int count, limit;") \
+        is None
+    assert tree_xml(parser) == full_parse_xml(parser.source)
+
+
+def test_comment_reaching_past_the_subroutine():
+    parser = IncrementalParser(SOURCE)
+    edit(parser, "let count = count + 1;", "/* let count = count + 1;")
+    edit(parser, "return count;", "*/ return count;")
+    assert tree_xml(parser) == full_parse_xml(parser.source)
+
+
+def test_out_of_bounds():
+    parser = IncrementalParser(SOURCE)
+    with pytest.raises(ValueError):
+        parser.edit(10, 5, "")
+    with pytest.raises(ValueError):
+        parser.edit(0, len(SOURCE) + 1, "")
+    assert parser.source == SOURCE
+
+
+def test_unparsable_edit_is_applied_and_recovered_from():
+    parser = IncrementalParser(SOURCE)
+    with pytest.raises(ValueError):
+        edit(parser, "count + 1;", "count + 1; let")
+    assert "count + 1; let" in parser.source
+    edit(parser, "count + 1; let", "count - 1;")
+    assert tree_xml(parser) == full_parse_xml(parser.source)
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_samples(jack_file):
+    parser = IncrementalParser(read(jack_file))
+    assert tree_xml(parser) == expected_xml(jack_file)
@@ -0,0 +1,51 @@
+import io
+
+import pytest
+
+import ParseTree
+from JackTokenizer import InternPool, JackTokenizer
+from samples import JACK_FILES, compiled, expected_xml, read
+
+
+@pytest.mark.parametrize("token_ids", [False, True])
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_same_xml(jack_file, token_ids):
+    tokenizer = JackTokenizer(io.StringIO(read(jack_file)),
+                              pool=InternPool(), token_ids=token_ids)
+    assert compiled(tokenizer) == expected_xml(jack_file)
+
+
+def test_streaming_with_a_pool():
+    jack_file = JACK_FILES[0]
+    tokenizer = JackTokenizer(io.StringIO(read(jack_file)), streaming=True,
+                              pool=InternPool())
+    assert compiled(tokenizer) == expected_xml(jack_file)
+
+
+def test_texts_are_shared_between_files():
+    pool = InternPool()
+    first = JackTokenizer(io.StringIO("class A { field Array cells; }"),
+                          pool=pool)
+    second = JackTokenizer(io.StringIO("class B { field Array other; }"),
+                           pool=pool)
+    assert first.tokens[4] == "Array" and first.tokens[4] is second.tokens[4]
+
+
+def test_token_ids():
+    pool = InternPool()
+    tokenizer = JackTokenizer(io.StringIO("class A { }"), pool=pool,
+                              token_ids=True)
+    assert tokenizer.tokens is None
+    assert [pool.texts[token_id] for token_id in tokenizer.token_ids] == \
+        ["class", "A", "{", "}"]
+    assert pool.intern("A") is pool.texts[tokenizer.token_ids[1]]
+
+
+def test_trees_share_texts():
+    pool = InternPool()
+    first = ParseTree.parse(io.StringIO("class A { field Array x; }"), pool)
+    second = ParseTree.parse(io.StringIO("class B { field Array y; }"),
+                             pool)
+    array_terminal = first[0].children[3].children[1]
+    assert array_terminal.text == "Array"
+    assert array_terminal.text is second[0].children[3].children[1].text
@@ -0,0 +1,29 @@
+import io
+
+import pytest
+
+from IterativeCompilationEngine import IterativeCompilationEngine
+from JackTokenizer import JackTokenizer
+from samples import JACK_FILES, compiled, expected_xml, read
+
+
+def iterative_xml(source: str) -> str:
+    return compiled(JackTokenizer(io.StringIO(source), streaming=True),
+                    engine_class=IterativeCompilationEngine)
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_samples(jack_file):
+    assert iterative_xml(read(jack_file)) == expected_xml(jack_file)
+
+
+def test_deep_nesting():
+    depth = 5000
+    statements = "while (true) { " * depth + "} " * depth
+    expression = "(" * depth + "1" + ")" * depth
+    source = f"class Main {{ function void main() {{ {statements} " \
+             f"return {expression}; }} }}"
+    xml = iterative_xml(source)
+    assert xml.count("<whileStatement>") == depth
+    # each while condition, and the returned expression and its nesting
+    assert xml.count("<expression>") == 2 * depth + 1
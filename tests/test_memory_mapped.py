@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+import JackAnalyzer
+from JackTokenizer import JackTokenizer
+from samples import (JACK_FILES, REPOSITORY, compiled, expected_xml,
+                     square_xml, written_xml)
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_memory_mapped(jack_file):
+    tokenizer = JackTokenizer.memory_mapped(
+        os.path.join(REPOSITORY, jack_file))
+    assert compiled(tokenizer) == expected_xml(jack_file)
+
+
+def test_non_ascii_source(tmp_path):
+    path = tmp_path / "Main.jack"
+    path.write_text('class Main { function void main() { '
+                    'do Output.printString("grüße ✓"); return; } }\n',
+                    encoding="utf-8")
+    assert compiled(JackTokenizer.memory_mapped(str(path))) == \
+        JackAnalyzer.analyze_source(path.read_text(encoding="utf-8"))
+
+
+def test_analyze_path_bypasses_the_cache(sample_copy, monkeypatch):
+    monkeypatch.setattr(JackAnalyzer, "MMAP_THRESHOLD", 0)
+    cache = JackAnalyzer.default_cache(str(sample_copy))
+    for input_path in JackAnalyzer.list_jack_files(str(sample_copy)):
+        assert JackAnalyzer.analyze_path(input_path, cache) is None
+    assert written_xml(sample_copy) == square_xml()
+    assert not os.path.exists(cache.directory)
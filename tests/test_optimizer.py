@@ -0,0 +1,92 @@
+import io
+
+import pytest
+
+import JackAnalyzer
+import Optimizer
+import ParseTree
+from JackTokenizer import JackTokenizer
+from samples import JACK_FILES, expected_xml, read
+
+
+def program(expression: str) -> str:
+    return f"class Main {{ function void main() {{ do f({expression}); " \
+           f"return; }} }}"
+
+
+def folded(expression: str, level: int = 1):
+    """The XML of a program whose constants were folded, and how many."""
+    classes = ParseTree.parse(io.StringIO(program(expression)))
+    count = Optimizer.fold_constants(classes[0], level)
+    output = io.StringIO()
+    ParseTree.write_xml(classes[0], output)
+    return output.getvalue(), count
+
+
+def unchanged(expression: str) -> str:
+    output = io.StringIO()
+    ParseTree.write_xml(ParseTree.parse(io.StringIO(program(expression)))[0],
+                        output)
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("expression, result", [
+    ("2 + 3 * 4", "20"),  # Jack applies ops left to right
+    ("7 / 2", "3"),
+    ("1 - 6", "-5"),
+    ("-7 / 2", "-3"),  # rounds towards zero, like Math.divide
+    ("32767 + 2", "-32767"),  # wraps around, like Hack arithmetic
+    ("(2 + 3)", "5"),
+    ("-(4)", "-4"),
+    ("1 < 2", "true"),
+    ("true & false", "false"),
+    ("~5", "-6"),
+    ("^3", "6"),
+    ("#9", "4"),
+])
+def test_folds(expression, result):
+    xml, count = folded(expression)
+    assert count > 0
+    assert xml == unchanged(result)
+
+
+def test_keeps_ops_after_a_variable():
+    xml, count = folded("x + 2 + 3")
+    assert count == 0
+    assert xml == unchanged("x + 2 + 3")
+
+
+def test_folds_a_prefix_before_a_variable():
+    xml, _ = folded("2 * 3 + x")
+    assert xml == unchanged("6 + x")
+
+
+def test_keeps_the_folded_prefix_before_a_division_by_zero():
+    xml, count = folded("2 + 3 * 0 / 0 + 1")
+    assert count == 1
+    assert xml == unchanged("0 / 0 + 1")
+
+
+def test_leaves_a_division_by_zero_alone():
+    xml, count = folded("1 / 0")
+    assert count == 0
+    assert xml == unchanged("1 / 0")
+
+
+def test_leaves_values_it_cannot_write_alone():
+    # -32768 has no integerConstant for its magnitude
+    xml, count = folded("32767 + 1")
+    assert count == 0
+    assert xml == unchanged("32767 + 1")
+
+
+def test_leaves_negative_literals_alone():
+    assert folded("-5") == (unchanged("-5"), 0)
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_level_zero_changes_nothing(jack_file):
+    output = io.StringIO()
+    JackAnalyzer.compile_optimized(
+        JackTokenizer(io.StringIO(read(jack_file))), output, level=0)
+    assert output.getvalue() == expected_xml(jack_file)
@@ -0,0 +1,32 @@
+import io
+
+import pytest
+
+import ParseTree
+from samples import JACK_FILES, expected_xml, read
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_write_xml(jack_file):
+    output = io.StringIO()
+    for node in ParseTree.parse(io.StringIO(read(jack_file))):
+        ParseTree.write_xml(node, output)
+    assert output.getvalue() == expected_xml(jack_file)
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_replay_rebuilds_the_tree(jack_file):
+    classes = ParseTree.parse(io.StringIO(read(jack_file)))
+    builder = ParseTree.TreeBuilder()
+    for node in classes:
+        ParseTree.replay(node, builder)
+    output = io.StringIO()
+    for node in builder.classes:
+        ParseTree.write_xml(node, output)
+    assert output.getvalue() == expected_xml(jack_file)
+
+
+def test_one_node_per_class():
+    classes = ParseTree.parse(io.StringIO("class A { } class B { }"))
+    assert [node.rule for node in classes] == ["class", "class"]
+    assert [node.children[1].text for node in classes] == ["A", "B"]
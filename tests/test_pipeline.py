@@ -0,0 +1,22 @@
+import JackAnalyzer
+from samples import square_xml, written_xml
+
+
+def test_analyze_paths_pipelined(sample_copy):
+    input_paths = JackAnalyzer.list_jack_files(str(sample_copy))
+    errors = JackAnalyzer.analyze_paths_pipelined(input_paths, 1, 2)
+    assert errors == [None] * len(input_paths)
+    assert written_xml(sample_copy) == square_xml()
+
+
+def test_cached_and_failed_files(sample_copy):
+    (sample_copy / "Broken.jack").write_text("class {")
+    input_paths = JackAnalyzer.list_jack_files(str(sample_copy))
+    cache = JackAnalyzer.default_cache(str(sample_copy))
+    for _ in range(2):  # a miss, and then a hit
+        errors = JackAnalyzer.analyze_paths_pipelined(input_paths, 1, 2,
+                                                      cache)
+        assert [error is None for error in errors] == \
+            [not input_path.endswith("Broken.jack")
+             for input_path in input_paths]
+        assert written_xml(sample_copy) == square_xml()
@@ -0,0 +1,46 @@
+import functools
+import json
+import os
+import shutil
+
+import JackAnalyzer
+import Profiler
+
+
+def test_report_is_labelled_as_an_approximation(sample_copy, tmp_path):
+    records = [Profiler.profile_path(str(path))
+               for path in sorted(sample_copy.glob("*.jack"))]
+    report_path = str(tmp_path / "report.json")
+    Profiler.write_report(records, report_path)
+    with open(report_path) as report_file:
+        report = json.load(report_file)
+    assert report["note"] == Profiler.APPROXIMATION_NOTE
+    assert [record["file"] for record in report["files"]] == \
+        [record["file"] for record in records]
+    csv_path = str(tmp_path / "report.csv")
+    Profiler.write_report(records, csv_path)
+    with open(csv_path) as report_file:
+        assert report_file.readline().startswith("# ")
+
+
+def test_dump_slowest_profiles_the_run_per_relative_path(sample_copy,
+                                                         tmp_path):
+    other = sample_copy / "other"
+    other.mkdir()
+    shutil.copy(str(sample_copy / "Main.jack"), str(other))
+    input_paths = [str(sample_copy / "Main.jack"), str(other / "Main.jack")]
+    records = [Profiler.profile_path(path, suffix=".vm", vm=True)
+               for path in input_paths]
+    for path in input_paths:
+        os.remove(os.path.splitext(path)[0] + ".vm")
+    dumps = Profiler.dump_slowest(
+        records, 2, str(tmp_path / "dumps"),
+        functools.partial(JackAnalyzer.analyze_path, vm=True),
+        str(sample_copy))
+    assert sorted(dumps) == sorted([
+        str(tmp_path / "dumps" / "Main.jack.prof"),
+        str(tmp_path / "dumps" / "other" / "Main.jack.prof")])
+    assert all(os.path.getsize(dump) for dump in dumps)
+    # the dumps come from analyzing with the run's options, here into VM code
+    assert all(os.path.exists(os.path.splitext(path)[0] + ".vm")
+               for path in input_paths)
@@ -0,0 +1,88 @@
+import concurrent.futures
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import JackAnalyzerClient
+from JackAnalyzerClient import make_private_directory, request, socket_path
+from JackAnalyzerServer import handle_request
+from samples import REPOSITORY, read
+
+TRUNCATED_SOURCE = "class A { function void f() { return"
+
+
+def handled(message: dict) -> dict:
+    """Serves a request, failing instead of hanging if it never ends."""
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        return executor.submit(handle_request, message).result(timeout=10)
+
+
+def test_source():
+    reply = handled({"source": read("Square/Main.jack")})
+    assert reply["error"] is None and reply["xml"].startswith("<class>")
+
+
+def test_truncated_source():
+    reply = handled({"source": TRUNCATED_SOURCE})
+    assert reply == {"xml": None,
+                     "error": "ValueError: Unexpected end of input"}
+
+
+def test_truncated_file(sample_copy):
+    (sample_copy / "Truncated.jack").write_text(TRUNCATED_SOURCE)
+    reply = handled({"path": str(sample_copy)})
+    assert reply["files"] == 4
+    assert reply["errors"] == [[str(sample_copy / "Truncated.jack"),
+                                "ValueError: Unexpected end of input"]]
+
+
+def test_truncated_request_over_the_socket(tmp_path):
+    path = str(tmp_path / "server.sock")
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(REPOSITORY, "JackAnalyzerServer.py"),
+         "--socket", path])
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(path):
+            assert server.poll() is None and time.monotonic() < deadline
+            time.sleep(0.02)
+        reply = request({"source": TRUNCATED_SOURCE}, path)
+        assert reply["error"] == "ValueError: Unexpected end of input"
+        # the server is still serving
+        assert request({"source": "class A { }"}, path)["error"] is None
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def test_socket_path(monkeypatch, tmp_path):
+    monkeypatch.delenv("JACK_ANALYZER_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert socket_path() == str(tmp_path / "jackanalyzer.sock")
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    assert socket_path() == os.path.join(
+        JackAnalyzerClient.PRIVATE_DIRECTORY, "jackanalyzer.sock")
+    monkeypatch.setenv("JACK_ANALYZER_SOCKET", "/elsewhere.sock")
+    assert socket_path() == "/elsewhere.sock"
+
+
+def test_private_directory(tmp_path):
+    directory = tmp_path / "private"
+    make_private_directory(str(directory))
+    assert directory.stat().st_mode & 0o777 == 0o700
+    make_private_directory(str(directory))  # already there
+    directory.chmod(0o777)
+    with pytest.raises(PermissionError):
+        make_private_directory(str(directory))
+
+
+def test_refuses_sockets_of_other_users(monkeypatch, tmp_path):
+    path = tmp_path / "server.sock"
+    path.touch()
+    monkeypatch.setattr(JackAnalyzerClient, "USER_ID",
+                        path.stat().st_uid + 1)
+    with pytest.raises(PermissionError):
+        request({"source": "class A { }"}, str(path))
@@ -0,0 +1,49 @@
+"""
+Checks the default, streaming analysis against the golden files next to the
+samples, and that lexing the whole buffer at once gives the same tokens and
+XML. Some golden files are indented and the analyzer writes no indentation,
+so they are compared ignoring whitespace; the others byte for byte.
+"""
+import io
+import os
+
+import pytest
+
+import JackTokenizer as tokenizer_module
+from JackTokenizer import JackTokenizer
+from samples import JACK_FILES, compiled, expected_xml, read
+
+
+def without_whitespace(text: str) -> str:
+    return "".join(text.split())
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_default_output_matches_golden(jack_file):
+    golden = read(jack_file[:-len(".jack")] + ".xml")
+    xml = expected_xml(jack_file)
+    assert without_whitespace(xml) == without_whitespace(golden)
+    if jack_file.startswith("Square" + os.sep):
+        assert xml == golden
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_streaming_matches_whole_buffer_tokens(jack_file):
+    whole = JackTokenizer(io.StringIO(read(jack_file)))
+    streaming = JackTokenizer(io.StringIO(read(jack_file)), streaming=True)
+    assert list(streaming) == list(zip(whole.tokens, whole.token_kinds))
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_whole_buffer_lexing(jack_file):
+    tokenizer = JackTokenizer(io.StringIO(read(jack_file)))
+    assert compiled(tokenizer) == expected_xml(jack_file)
+
+
+def test_streaming_across_chunks(monkeypatch):
+    # tokens, strings and comments that straddle the chunk boundaries
+    monkeypatch.setattr(tokenizer_module, "STREAM_CHUNK_SIZE", 7)
+    for jack_file in JACK_FILES:
+        streaming = JackTokenizer(io.StringIO(read(jack_file)),
+                                  streaming=True)
+        assert compiled(streaming) == expected_xml(jack_file)
@@ -0,0 +1,22 @@
+import io
+
+import pytest
+
+import JackAnalyzer
+from JackTokenizer import JackTokenizer
+from samples import JACK_FILES, read
+
+
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_tokens_match_golden(jack_file):
+    output = io.StringIO()
+    JackAnalyzer.write_tokens(
+        JackTokenizer(io.StringIO(read(jack_file)), streaming=True), output)
+    assert output.getvalue() == read(jack_file[:-len(".jack")] + "T.xml")
+
+
+def test_analyze_path_writes_the_token_file(sample_copy):
+    input_path = str(sample_copy / "Main.jack")
+    assert JackAnalyzer.analyze_path(input_path, tokens_only=True) is None
+    assert (sample_copy / "MainT.xml").read_text() == read("Square/MainT.xml")
+    assert not (sample_copy / "Main.xml").exists()
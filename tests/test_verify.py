@@ -0,0 +1,38 @@
+import os
+import shutil
+
+import pytest
+
+import JackAnalyzer
+from samples import JACK_FILES, REPOSITORY
+
+
+@pytest.mark.parametrize("iterative", [False, True])
+@pytest.mark.parametrize("jack_file", JACK_FILES)
+def test_samples_match_their_goldens(jack_file, iterative):
+    results = JackAnalyzer.verify_path(os.path.join(REPOSITORY, jack_file),
+                                       iterative)
+    assert len(results) == 2
+    for golden_path, difference in results:
+        assert difference is None, golden_path
+
+
+def test_reports_the_first_difference(tmp_path):
+    for filename in ("Main.jack", "Main.xml", "MainT.xml"):
+        shutil.copy(os.path.join(REPOSITORY, "Square", filename), tmp_path)
+    golden = tmp_path / "Main.xml"
+    golden.write_text(golden.read_text().replace(
+        "<identifier> game </identifier>", "<identifier> gamer </identifier>",
+        1))
+    results = dict(JackAnalyzer.verify_path(str(tmp_path / "Main.jack")))
+    assert results[str(tmp_path / "MainT.xml")] is None
+    assert "gamer" in results[str(golden)]
+
+
+def test_find_jack_files_skips_the_cache(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "A.jack").write_text("class A { }")
+    (tmp_path / ".jackcache").mkdir()
+    (tmp_path / ".jackcache" / "B.jack").write_text("class B { }")
+    assert JackAnalyzer.find_jack_files(str(tmp_path)) == \
+        [str(tmp_path / "sub" / "A.jack")]
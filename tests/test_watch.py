@@ -0,0 +1,55 @@
+import os
+import queue
+import subprocess
+import sys
+import threading
+
+from samples import REPOSITORY, read
+
+TRUNCATED_SOURCE = "class A { function void f() { return"
+
+
+def stderr_lines(process: subprocess.Popen) -> queue.Queue:
+    """Collects the lines a process writes to stderr as they come."""
+    lines = queue.Queue()
+
+    def collect():
+        for line in process.stderr:
+            lines.put(line.rstrip("\n"))
+
+    threading.Thread(target=collect, daemon=True).start()
+    return lines
+
+
+def wait_for(lines: queue.Queue, prefix: str) -> list:
+    """The lines up to the first one starting with prefix, which fails the
+    test if it does not come within 10 seconds."""
+    seen = []
+    while not seen or not seen[-1].startswith(prefix):
+        seen.append(lines.get(timeout=10))
+    return seen
+
+
+def test_truncated_save_does_not_stop_the_watch(sample_copy):
+    watcher = subprocess.Popen(
+        [sys.executable, os.path.join(REPOSITORY, "JackAnalyzer.py"),
+         str(sample_copy), "--watch", "--interval", "0.05", "--debounce",
+         "0.05", "--no-cache"],
+        stderr=subprocess.PIPE, text=True)
+    try:
+        lines = stderr_lines(watcher)
+        wait_for(lines, "watching")
+        input_path = sample_copy / "Main.jack"
+        input_path.write_text(TRUNCATED_SOURCE)
+        seen = wait_for(lines, "analyzed")
+        assert seen[-2:] == [
+            f"{input_path}: ValueError: Unexpected end of input",
+            "analyzed 1 changed files, 1 failed"]
+        # the next save is analyzed as usual
+        input_path.write_text(read("Square/Main.jack"))
+        assert wait_for(lines, "analyzed") == \
+            ["analyzed 1 changed files, 0 failed"]
+        assert (sample_copy / "Main.xml").exists()
+    finally:
+        watcher.terminate()
+        watcher.wait(10)